@@ -1,14 +1,42 @@
+import os
+import shutil
+import sys
+import tempfile
+from enum import Enum
 from pathlib import Path
 from typing import Optional
 
+import click
+import polars as pl
 import typer
 from rich.console import Console
 from textual.theme import BUILTIN_THEMES
+from typer.core import TyperGroup
 
-from .ui import CSVEditorApp
+from .diff import diff_files
+from .formats import format_for_path, spool_stream
+from .memory import parse_size
+from .remote import is_url, url_path
+from .ui import CSVEditorApp, DiffApp
 
-console = Console()
-csv_ve_cli = typer.Typer()
+
+class DefaultCommandGroup(TyperGroup):
+    """
+    Commands with a default: `csv-ve file.csv` runs `csv-ve open file.csv`,
+    `csv-ve diff a.csv b.csv` runs the diff command
+    """
+
+    default_command = "open"
+
+    def parse_args(self, ctx: click.Context, args: list[str]) -> list[str]:
+        group_options = {opt for param in self.get_params(ctx) for opt in param.opts}
+        if not args or (args[0] not in self.commands and args[0] not in group_options):
+            args = [self.default_command, *args]
+        return super().parse_args(ctx, args)
+
+
+console = Console(soft_wrap=True)  # keep file paths on one line in error messages
+csv_ve_cli = typer.Typer(cls=DefaultCommandGroup)
 
 # use theme aliases instead of textual themes names for default dark and light themes
 THEME_ALIASES = {
@@ -27,42 +55,204 @@ def resolve_theme(theme_input: Optional[str]) -> str:
     return THEME_ALIASES.get(theme_input.lower(), theme_input)
 
 
-@csv_ve_cli.command()
+def check_theme(theme: Optional[str]) -> None:
+    """Exit with the available themes if the theme doesn't exist"""
+    if theme is None:
+        return
+    available_themes = list(BUILTIN_THEMES.keys())
+    custom_theme_aliases = list(THEME_ALIASES.keys())
+    if theme not in available_themes and theme not in custom_theme_aliases:
+        console.print(f"[red]Error: Theme '{theme}' not found[/red]")
+        console.print(
+            f"[yellow]Available themes:[/yellow] {', '.join(sorted(available_themes + custom_theme_aliases))}"
+        )
+        raise typer.Exit(1)
+
+
+def check_file(file: str) -> None:
+    """Exit if the file doesn't exist or isn't a supported format"""
+    if is_url(file):
+        # remote files are checked when they are opened
+        if format_for_path(url_path(file)) is None:
+            console.print(
+                f"[red]Error: '{file}' is not a CSV file or a supported format[/red]"
+            )
+            raise typer.Exit(1)
+        return
+    file_path = Path(file)
+
+    if not file_path.exists():
+        console.print(f"[red]Error: File '{file}' not found[/red]")
+        raise typer.Exit(1)
+    # besides plain csv: compressed csv, parquet, arrow ipc and ndjson files
+    if file_path.suffix.lower() != ".csv" and format_for_path(file_path) is None:
+        console.print(
+            f"[red]Error: '{file}' is not a CSV file or a supported format[/red]"
+        )
+        raise typer.Exit(1)
+
+
+# file argument/ output for stdin/ stdout
+STD_STREAM = "-"
+
+
+def read_stdin(directory: Path) -> Path:
+    """
+    Copy the piped stdin to a file in `directory`, then read the keyboard
+    from the terminal: the app needs a tty as stdin
+    """
+    path = spool_stream(sys.stdin.buffer, directory / "stdin")
+    reattach_terminal()
+    return path
+
+
+def reattach_terminal() -> None:
+    """Point stdin back to the terminal after piped data was read from it"""
+    try:
+        tty = os.open("/dev/tty", os.O_RDONLY)
+    except OSError:
+        return  # no controlling terminal
+    os.dup2(tty, sys.__stdin__.fileno())
+    os.close(tty)
+
+
+def write_output(file: str, output: str) -> None:
+    """Copy the (saved) file to `output`, '-' for stdout"""
+    if output != STD_STREAM:
+        shutil.copyfile(file, output)
+        return
+    with open(file, "rb") as f:
+        shutil.copyfileobj(f, sys.stdout.buffer)
+    sys.stdout.flush()
+
+
+@csv_ve_cli.command("open")
 def main(
-    file: str = typer.Argument(..., help="CSV file to open"),
+    files: list[str] = typer.Argument(
+        ...,
+        help="File(s) to open, several files open as tabs: CSV (can be compressed: .csv.gz, .csv.zst...), Parquet, Arrow IPC or NDJSON. '-' reads stdin",
+    ),
     theme: Optional[str] = typer.Option(
         None,
         "-t",
         "--theme",
         help="light, dark or any Textual theme name. Can change the theme inside the app",
     ),
+    output: Optional[str] = typer.Option(
+        None,
+        "-o",
+        "--output",
+        help="Write the file, as last saved, to this path when the app closes. '-' writes to stdout (ex: curl ... | csv-ve - -o - | gzip)",
+    ),
+    max_memory: Optional[str] = typer.Option(
+        None,
+        "-m",
+        "--max-memory",
+        help="Memory budget (ex: 512M, 2G, default 2G). Beyond it, inactive tabs then the open file are read from disk and the undo history is dropped",
+    ),
 ):
     """
-    csv-ve command line
+    csv-ve command line: open file(s) in the editor (default command)
     """
-    if theme is not None:
-        available_themes = list(BUILTIN_THEMES.keys())
-        custom_theme_aliases = list(THEME_ALIASES.keys())
-        if theme not in available_themes and theme not in custom_theme_aliases:
-            console.print(f"[red]Error: Theme '{theme}' not found[/red]")
-            console.print(
-                f"[yellow]Available themes:[/yellow] {', '.join(sorted(available_themes + custom_theme_aliases))}"
-            )
+    check_theme(theme)
+    resolved_theme = resolve_theme(theme)
+
+    if files.count(STD_STREAM) > 1:
+        console.print("[red]Error: stdin ('-') can only be opened once[/red]")
+        raise typer.Exit(1)
+    if output is not None and len(files) > 1:
+        console.print("[red]Error: --output needs a single file[/red]")
+        raise typer.Exit(1)
+    budget = {}
+    if max_memory is not None:
+        try:
+            budget["memory_budget"] = parse_size(max_memory)
+        except ValueError as e:
+            console.print(f"[red]Error: {e}[/red]")
             raise typer.Exit(1)
 
-    resolved_theme = resolve_theme(theme)
+    with tempfile.TemporaryDirectory(prefix="csv-ve-") as spool_dir:
+        if STD_STREAM in files:
+            stdin_path = str(read_stdin(Path(spool_dir)))
+            files = [stdin_path if file == STD_STREAM else file for file in files]
 
-    file_path = Path(file)
+        for file in files:
+            check_file(file)
 
-    if not file_path.exists():
-        console.print(f"[red]Error: File '{file}' not found[/red]")
-        raise typer.Exit(1)
-    if not file_path.suffix.lower() == ".csv":
-        console.print(f"[red]Error: '{file}' is not a CSV file[/red]")
+        app = CSVEditorApp(
+            csv_path=files[0] if len(files) == 1 else files,
+            theme=resolved_theme,
+            **budget,
+        )
+        app.run()
+
+        if output is not None:
+            write_output(files[0], output)
+
+
+class DiffFormat(str, Enum):
+    tui = "tui"
+    csv = "csv"
+    json = "json"
+
+
+@csv_ve_cli.command("diff")
+def diff(
+    old: str = typer.Argument(..., help="Old version of the file"),
+    new: str = typer.Argument(..., help="New version of the file"),
+    key: Optional[list[str]] = typer.Option(
+        None,
+        "-k",
+        "--key",
+        help="Key column(s) to match the rows (repeat for several). Without a key, whole rows are compared",
+    ),
+    output_format: DiffFormat = typer.Option(
+        DiffFormat.tui,
+        "-f",
+        "--format",
+        help="tui: browse the differences, csv/ json: write them to stdout (json: one object per line)",
+    ),
+    theme: Optional[str] = typer.Option(None, "-t", "--theme", help="Theme of the tui"),
+):
+    """
+    Differences between two files: inserted, deleted and modified rows.
+    The files are scanned lazily and the diff runs on the streaming engine.
+    """
+    check_theme(theme)
+    for file in (old, new):
+        check_file(file)
+
+    try:
+        # sunk to stdout as they come: not sorted by row
+        rows, added, deleted = diff_files(
+            old, new, key, ordered=output_format is DiffFormat.tui
+        )
+    except (KeyError, ValueError) as e:
+        message = e.args[0] if isinstance(e, KeyError) else str(e)
+        console.print(f"[red]Error: {message}[/red]")
         raise typer.Exit(1)
 
-    app = CSVEditorApp(csv_path=file, theme=resolved_theme)
-    app.run()
+    if output_format is DiffFormat.tui:
+        DiffApp(old, new, key, theme=resolve_theme(theme)).run()
+        return
+
+    if added or deleted:
+        # rows only compare the common columns
+        print(
+            f"Added columns: {', '.join(added) or '-'}"
+            f" | Deleted columns: {', '.join(deleted) or '-'}",
+            file=sys.stderr,
+        )
+    try:
+        if output_format is DiffFormat.csv:
+            rows.with_columns(pl.col("changed_columns").list.join(";")).sink_csv(
+                sys.stdout
+            )
+        else:
+            rows.sink_ndjson(sys.stdout)
+    except pl.exceptions.PolarsError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,91 @@
+import bz2
+import gzip
+import lzma
+from pathlib import Path
+from typing import IO, Optional
+
+# Compression of a file from its last suffix (e.g. data.csv.gz)
+COMPRESSION_SUFFIXES = {
+    ".gz": "gzip",
+    ".bz2": "bz2",
+    ".xz": "xz",
+    ".zst": "zstd",
+}
+
+# Compressions Polars decompresses by itself when reading a file
+NATIVE_COMPRESSIONS = {"gzip", "zstd"}
+
+_MAGIC_BYTES = {
+    b"\x1f\x8b": "gzip",
+    b"BZh": "bz2",
+    b"\xfd7zXZ\x00": "xz",
+    b"\x28\xb5\x2f\xfd": "zstd",
+}
+
+
+def detect_compression(file_path: str | Path) -> Optional[str]:
+    """Compression of a file from its suffix, or from its first bytes for unknown suffixes"""
+    file_path = Path(file_path)
+    compression = COMPRESSION_SUFFIXES.get(file_path.suffix.lower())
+    if compression is not None or not file_path.is_file():
+        return compression
+
+    with open(file_path, "rb") as f:
+        return compression_from_bytes(f.read(8))
+
+
+def compression_from_bytes(head: bytes) -> Optional[str]:
+    """Compression of a stream from its first bytes"""
+    for magic, compression in _MAGIC_BYTES.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def _zstandard():
+    """zstandard is optional: only needed to stream or write .zst files"""
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError(
+            "zstd streams require the 'zstandard' package (pip install csv-ve[zstd])"
+        ) from None
+    return zstandard
+
+
+def open_decompressed(
+    file_path: str | Path | IO[bytes], compression: Optional[str]
+) -> IO[bytes]:
+    """
+    Binary stream of the decompressed content, decompressed chunk by chunk while reading.
+    `file_path` can also be a binary stream (compressed streams don't close it)
+    """
+    if compression is None:
+        return open(file_path, "rb")
+    if compression == "gzip":
+        return gzip.open(file_path, "rb")
+    if compression == "bz2":
+        return bz2.open(file_path, "rb")
+    if compression == "xz":
+        return lzma.open(file_path, "rb")
+    if compression == "zstd":
+        return _zstandard().open(file_path, "rb")
+    raise ValueError(f"Unknown compression: {compression}")
+
+
+def open_compressed(file_path: str | Path, compression: Optional[str]) -> IO[bytes]:
+    """Binary stream that compresses what is written to the file"""
+    if compression is None:
+        return open(file_path, "wb")
+    if compression == "gzip":
+        return gzip.open(file_path, "wb")
+    if compression == "bz2":
+        return bz2.open(file_path, "wb")
+    if compression == "xz":
+        return lzma.open(file_path, "wb")
+    if compression == "zstd":
+        zstandard = _zstandard()
+        # threads=-1: compress with one thread per core
+        compressor = zstandard.ZstdCompressor(threads=-1)
+        return zstandard.open(file_path, "wb", cctx=compressor)
+    raise ValueError(f"Unknown compression: {compression}")
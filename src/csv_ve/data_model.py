@@ -1,60 +1,724 @@
+import os
+import tempfile
+from bisect import bisect_left
+from functools import wraps
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Optional, Sequence
 
 import polars as pl
 
+from .edit_log import EditLog
+from .formats import FileFormat, IPCFormat, format_for_path, write_atomic
+from .diff import Diff, column_changes, diff_lazy
+from .indexes import (
+    CellVersions,
+    ColorBins,
+    DataIndex,
+    DuplicateIndex,
+    RowIds,
+    ValueIndex,
+)
+from .remote import RemoteFile, is_url, url_path
+
+# Parse a String series into a typed series, invalid values become null
+Parser = Callable[[pl.Series], pl.Series]
+
+# key column of the diff with the file
+ROW_ID = "__row_id__"
+
+# name of the data in SQL queries
+SQL_TABLE_NAME = "data"
+
+# aggregations of the group-by summary (polars expression methods)
+SUMMARY_AGGREGATIONS = {"sum", "mean", "median", "min", "max", "std", "n_unique"}
+
+_BOOLEAN_VALUES = {"true": True, "false": False, "1": True, "0": False}
+
+# types of cast_column, by name
+COLUMN_TYPES: dict[str, pl.DataType] = {
+    "str": pl.String(),
+    "int": pl.Int64(),
+    "float": pl.Float64(),
+    "bool": pl.Boolean(),
+    "date": pl.Date(),
+    "datetime": pl.Datetime("us"),
+    "time": pl.Time(),
+}
+
+
+def _build_parser(dtype: pl.DataType) -> Parser:
+    """Build the function that converts raw strings to the column dtype"""
+    if dtype == pl.String or dtype == pl.Null:
+        return lambda raw: raw
+    if dtype == pl.Boolean:
+        return lambda raw: (
+            raw.str.strip_chars()
+            .str.to_lowercase()
+            .replace_strict(_BOOLEAN_VALUES, default=None, return_dtype=pl.Boolean)
+        )
+    if dtype == pl.Date:
+        return lambda raw: raw.str.strip_chars().str.to_date(strict=False)
+    if isinstance(dtype, pl.Datetime):
+        return lambda raw: raw.str.strip_chars().str.to_datetime(
+            time_unit=dtype.time_unit, time_zone=dtype.time_zone, strict=False
+        )
+    if dtype == pl.Time:
+        return lambda raw: raw.str.strip_chars().str.to_time(strict=False)
+    if dtype.is_nested():
+        # lists and structs are written as JSON, ex: [1, 2] or {"a": 1}
+        return lambda raw: raw.str.json_decode(dtype)
+    return lambda raw: raw.str.strip_chars().cast(dtype, strict=False)
+
+
+# Operations written to the edit log, and the only ones that can be replayed from it
+_LOGGED_OPERATIONS: set[str] = set()
+
+
+def _logged(method: Callable) -> Callable:
+    """
+    Record a successful edit in the edit log of the model and bump its version.
+    Only the outermost call is recorded (e.g. set_cell but not the paste_values it calls).
+    """
+    _LOGGED_OPERATIONS.add(method.__name__)
+
+    @wraps(method)
+    def wrapper(self: "CSVDataModel", *args: Any, **kwargs: Any) -> Any:
+        self._edit_depth += 1
+        try:
+            result = method(self, *args, **kwargs)
+        finally:
+            self._edit_depth -= 1
+        if self._edit_depth == 0:
+            self.version += 1
+            if self.edit_log is not None and not self._replaying:
+                self.edit_log.append(method.__name__, args, kwargs)
+        return result
+
+    return wrapper
+
 
 class CSVDataModel:
     """
     Data model for managing CSV files with Polars
-    Handles loading, editing, and saving CSV data
+    Handles loading, editing, and saving CSV data.
+    http(s):// and s3:// URLs are opened read-only, see remote.py
     """
 
-    def __init__(self, file_path: str):
-        self.file_path = Path(file_path)
-        self.df: Optional[pl.DataFrame] = None
+    def __init__(self, file_path: str | Path, edit_log: bool = False):
+        self.url = str(file_path) if is_url(file_path) else None
+        # the path part of a URL for remote files: its name and extension
+        self.file_path = Path(url_path(self.url)) if self.url else Path(file_path)
+        self.remote: Optional[RemoteFile] = None
+        self._df: Optional[pl.DataFrame] = None
+        self._col_index: dict[str, int] = {}  # column name -> column index
+        self._parsers: dict[tuple[str, pl.DataType], Parser] = {}
         self.modified = False
         self.has_header = True
+        # bumped by every change of the data, caches derived from the data compare it
+        self.version = 0
+        # indexes kept in sync with the data by the edits, see add_index
+        self.row_ids = RowIds()  # stable row ids for diffs with the file
+        self.cell_versions = CellVersions()  # for the rendered cells cache of the table
+        self.indexes: list[DataIndex] = [self.row_ids, self.cell_versions]
+        # size and mtime of the file when it was loaded or saved
+        self._file_fingerprint: Optional[tuple[int, int | str]] = None
+        # column name -> SQL expression of the computed columns, see insert_computed_column
+        self.computed_columns: dict[str, str] = {}
+        self._computed_exprs: dict[str, pl.Expr] = {}
+        # last undoable edit: (version after the edit, description, column -> (rows, old values))
+        self._undo: Optional[
+            tuple[int, str, dict[str, tuple[pl.Series, pl.Series]]]
+        ] = None
+        # replacements found by replace_all for the edit that applies them
+        self._found_replacements: Optional[
+            tuple[int, pl.DataFrame, dict[str, tuple[pl.Series, pl.Series]]]
+        ] = None
+        # group-by columns -> (version, group key -> row indices), see group_rows
+        self._group_rows: dict[tuple[str, ...], tuple[int, dict[tuple, list[int]]]] = {}
+        # reader/ writer of the file (csv, parquet, arrow ipc, ndjson)
+        self.file_format: Optional[FileFormat] = None
+        # options to write the file back the way it was read (e.g. its compression)
+        self.write_options: dict[str, Any] = {}
+
+        # crash recovery: every edit is written to a log next to the file until saved
+        self.edit_log: Optional[EditLog] = (
+            EditLog(self.file_path) if edit_log and self.url is None else None
+        )
+        self._edit_depth = 0
+        self._replaying = False
+
+        # memory budget: the frame of an inactive tab can be moved to an arrow ipc file
+        self._spill_path: Optional[Path] = None
+        self._owns_spill_file = False
+        # directory of the spill files, edits of spilled data are written there too
+        self._spill_dir: Optional[Path] = None
+        # (rows, columns) of the spilled data, read without reading it back
+        self._spilled_shape = (0, 0)
 
         self.load()
 
+    @property
+    def df(self) -> Optional[pl.DataFrame]:
+        """The data, read back in memory first if it was spilled to disk"""
+        if self._df is None and self._spill_path is not None:
+            self.rehydrate()
+        return self._df
+
+    @df.setter
+    def df(self, df: Optional[pl.DataFrame]) -> None:
+        """
+        Replace the whole dataframe from outside of the model.
+        The column index is rebuilt and the data is marked as modified.
+        Internal edits update `_df` and `_col_index` directly.
+        """
+        self._set_df(df)
+        self.modified = True
+
+    def _set_df(self, df: Optional[pl.DataFrame]) -> None:
+        self._drop_spill_file()
+        self._df = df
+        # new data: its columns are plain values
+        self.computed_columns.clear()
+        self._computed_exprs.clear()
+        self.version += 1
+        self._columns_changed(rebuild=True)
+        self._col_index = (
+            {} if df is None else {name: i for i, name in enumerate(df.columns)}
+        )
+
+    @property
+    def compression(self) -> Optional[str]:
+        """Compression of the file (.csv.gz, .csv.zst...), it is saved with the same one"""
+        return self.write_options.get("compression")
+
     # ---basic operations--- #
     def load(self) -> None:
-        """Load csv with polars"""
-        if not self.file_path.exists():
+        """
+        Load the file with polars.
+        CSV (plain or compressed: .csv.gz, .csv.zst, .csv.bz2, .csv.xz), Parquet,
+        Arrow IPC and NDJSON files are supported, see formats.py
+        """
+        if self.url is None and not self.file_path.exists():
             raise FileNotFoundError(f"CSV file not found: {self.file_path}")
 
+        self.file_format = format_for_path(self.file_path)
+        if self.file_format is None:
+            raise ValueError(f"Unsupported file format: {self.file_path}")
+
         try:
-            # Try loading with header first
-            self.df = pl.read_csv(
-                self.file_path,
-                has_header=True,
-                infer_schema_length=1000,
-            )
+            df, self.write_options = self._read_file()
         except Exception as e:
             raise Exception(f"Failed to load CSV: {e}") from e
 
+        self._set_df(df)
+        self._file_fingerprint = self._fingerprint()
+        dialect = self.write_options.get("dialect")
+        self.has_header = dialect.has_header if dialect is not None else True
+
         self.modified = False
 
+    def _read_file(self) -> tuple[pl.DataFrame, dict[str, Any]]:
+        assert self.file_format is not None
+        if self.url is None:
+            return self.file_format.load(self.file_path)
+        if self.remote is None:
+            self.remote = RemoteFile(self.url)
+        else:
+            self.remote.refresh()
+        return self.file_format.load_remote(self.remote)
+
+    @property
+    def read_only(self) -> bool:
+        """Remote files can be edited but not saved"""
+        return self.url is not None
+
     def reload(self) -> None:
+        """Reload the file from disk, unsaved edits are dropped"""
         self.load()
+        if self.edit_log is not None:
+            self.edit_log.discard()
 
     def save(self) -> None:
         """
-        Save the data back to the original file
+        Save the data back to the original file, in its format and compression
 
         Raises:
-            RuntimeError: If no data is loaded
+            RuntimeError: If no data is loaded or the file is remote
         """
         if self.df is None:
             raise RuntimeError("No data to save")
-        self.df.write_csv(self.file_path)
+        if self.read_only:
+            raise RuntimeError(f"Remote files are read-only: {self.url}")
+        assert self.file_format is not None
+        write_atomic(self.file_format, self.df, self.file_path, **self.write_options)
         self.modified = False
+        # the rows of the file are the rows of the data now
+        self.row_ids.build(self.df)
+        self._file_fingerprint = self._fingerprint()
+
+        # the edits are in the file now
+        if self.edit_log is not None:
+            self.edit_log.discard()
+
+    def _fingerprint(self) -> tuple[int, int | str]:
+        if self.remote is not None:
+            self.remote.refresh()
+            return self.remote.size, self.remote.etag
+        stat = self.file_path.stat()
+        return stat.st_size, stat.st_mtime_ns
+
+    def diff_with_disk(self) -> Diff:
+        """
+        Changes of the data compared to the file on disk (what `save` would write).
+        Rows are matched by their stable row id when the file didn't change since
+        it was loaded, else by row hashes: a modified row then shows as deleted + inserted.
+
+        Raises:
+            RuntimeError: If no data is loaded
+        """
+        if self.df is None:
+            raise RuntimeError("No data loaded")
+        assert self.file_format is not None
+
+        if self.remote is not None:
+            disk = self.file_format.load_remote(self.remote)[0].lazy()
+        else:
+            disk = self.file_format.scan(self.file_path)
+        added, deleted = column_changes(disk.collect_schema().names(), self.df.columns)
+        data = self.df.lazy()
+        on = None
+        if self._file_fingerprint == self._fingerprint():
+            disk = disk.with_row_index(ROW_ID).with_columns(
+                pl.col(ROW_ID).cast(pl.UInt64)
+            )
+            data = data.with_columns(self.row_ids.ids.alias(ROW_ID))
+            on = [ROW_ID]
+
+        rows = diff_lazy(disk, data, on).drop(ROW_ID, strict=False)
+        return Diff(rows.collect(engine="streaming"), added, deleted)
+
+    # ---crash recovery--- #
+    def pending_edits(self) -> int:
+        """Number of edits left in the edit log by a previous session"""
+        return 0 if self.edit_log is None else len(self.edit_log.pending())
+
+    def replay_edit_log(self) -> int:
+        """
+        Apply the edits left in the edit log by a previous session.
+
+        Returns:
+            The number of replayed edits
+        """
+        if self.edit_log is None:
+            return 0
+
+        records = self.edit_log.pending()
+        self._replaying = True  # the edits are already in the log
+        try:
+            for operation, args, kwargs in records:
+                if operation not in _LOGGED_OPERATIONS:
+                    raise ValueError(f"Unknown operation in edit log: {operation}")
+                getattr(self, operation)(*args, **kwargs)
+        finally:
+            self._replaying = False
+        return len(records)
+
+    def close(self) -> None:
+        """Write the edits still buffered in the edit log, release the spill and remote files"""
+        if self.edit_log is not None:
+            self.edit_log.close()
+        self._drop_spill_file()
+        if self.remote is not None:
+            self.remote.close()
+            self.remote = None
+
+    # ---memory budget--- #
+    @property
+    def spilled(self) -> bool:
+        """True when the data is on disk (see `spill`) rather than in memory"""
+        return self._df is None and self._spill_path is not None
+
+    def estimated_size(self) -> int:
+        """Memory used by the data in bytes (0 when spilled)"""
+        return 0 if self._df is None else self._df.estimated_size()
+
+    def index_size(self) -> int:
+        """Memory used by the indexes in bytes, estimated"""
+        return sum(index.estimated_size() for index in self.indexes)
+
+    def undo_size(self) -> int:
+        """Memory used by the undo journal (old values of the last undoable edit) in bytes"""
+        if self._undo is None:
+            return 0
+        return sum(
+            rows.estimated_size() + values.estimated_size()
+            for rows, values in self._undo[2].values()
+        )
+
+    def drop_undo(self) -> None:
+        """Free the undo journal: the last edit can't be undone anymore"""
+        self._undo = None
+
+    def spill(self, directory: str | Path) -> None:
+        """
+        Free the memory of the data until it is used again.
+        Unmodified Arrow IPC files are read back from the file itself (lazy),
+        anything else is written to an Arrow IPC file in `directory`.
+        """
+        if self._df is None:
+            return
+        self._spill_dir = Path(directory)
+        if (
+            isinstance(self.file_format, IPCFormat)
+            and not self.modified
+            and self.url is None
+        ):
+            self._spill_path, self._owns_spill_file = self.file_path, False
+        else:
+            fd, name = tempfile.mkstemp(
+                prefix=f"{self.file_path.stem}.", suffix=".arrow", dir=directory
+            )
+            os.close(fd)
+            self._df.write_ipc(name)
+            self._spill_path, self._owns_spill_file = Path(name), True
+        self._spilled_shape = self._df.shape
+        self._df = None
+
+    def rehydrate(self) -> None:
+        """Read spilled data back in memory"""
+        if self._spill_path is None:
+            return
+        self._df = pl.read_ipc(self._spill_path)
+        self._drop_spill_file()
+
+    def lazy(self) -> pl.LazyFrame:
+        """Lazy frame over the data, spilled data is scanned without reading it back"""
+        if self._df is None and self._spill_path is not None:
+            return pl.scan_ipc(self._spill_path)
+        if self._df is None:
+            return pl.LazyFrame()
+        return self._df.lazy()
+
+    def _edits_spilled(self) -> bool:
+        """
+        True if an edit of the columns is applied to the spilled data without reading
+        it back: no index reads the values (e.g. duplicates), only the columns.
+        """
+        return self.spilled and not any(index.reads_values for index in self.indexes)
+
+    def _sink_spilled(self, lf: pl.LazyFrame) -> None:
+        """Replace the spilled data by a lazy frame over it, streamed to a new spill file"""
+        assert self._spill_path is not None and self._spill_dir is not None
+        fd, name = tempfile.mkstemp(
+            prefix=f"{self.file_path.stem}.", suffix=".arrow", dir=self._spill_dir
+        )
+        os.close(fd)
+        try:
+            lf.sink_ipc(name)
+        except pl.exceptions.PolarsError:
+            Path(name).unlink(missing_ok=True)
+            raise
+        self._drop_spill_file()
+        self._spill_path, self._owns_spill_file = Path(name), True
+        self._spilled_shape = (self._spilled_shape[0], len(lf.collect_schema()))
+
+    def _index_frame(self) -> Optional[pl.DataFrame]:
+        """Frame given to the index hooks: the data, or only the columns of spilled data"""
+        if self.spilled:
+            return pl.DataFrame(schema=self.lazy().collect_schema())
+        return self._df
+
+    def _drop_spill_file(self) -> None:
+        if self._spill_path is not None and self._owns_spill_file:
+            self._spill_path.unlink(missing_ok=True)
+        self._spill_path, self._owns_spill_file = None, False
+
+    # ---indexes--- #
+    def add_index(self, index: DataIndex) -> DataIndex:
+        """Build an index over the data and keep it up to date with the edits"""
+        if self.df is not None:
+            index.build(self.df)
+        self.indexes.append(index)
+        return index
+
+    def remove_index(self, index: DataIndex) -> None:
+        self.indexes.remove(index)
+
+    def duplicate_index(
+        self, columns: Optional[Sequence[str]] = None
+    ) -> DuplicateIndex:
+        """
+        Hash index of duplicate rows (or duplicate keys in `columns`).
+        It is built once then kept up to date by the edits.
+
+        Raises:
+            KeyError: If a column does not exist
+        """
+        for col_name in columns or ():
+            self.column_index(col_name)
+        key = tuple(columns) if columns is not None else None
+        for index in self.indexes:
+            if isinstance(index, DuplicateIndex) and index.columns == key:
+                return index
+        index = self.add_index(DuplicateIndex(columns))
+        assert isinstance(index, DuplicateIndex)
+        return index
+
+    def color_bins(
+        self, column: str, thresholds: Optional[Sequence[float]] = None
+    ) -> ColorBins:
+        """
+        Color bins of the values of a column (quantiles, or fixed `thresholds`) for a heatmap.
+        They are computed once then kept up to date by the edits.
+
+        Raises:
+            KeyError: If the column does not exist
+        """
+        self.column_index(column)
+        edges = sorted(thresholds) if thresholds is not None else None
+        for index in self.indexes:
+            if (
+                isinstance(index, ColorBins)
+                and index.columns == (column,)
+                and index.thresholds == edges
+            ):
+                return index
+        index = self.add_index(ColorBins(column, thresholds=thresholds))
+        assert isinstance(index, ColorBins)
+        return index
+
+    def value_index(self, column: str) -> ValueIndex:
+        """
+        Hash index of the values of a column, to find rows by value.
+        It is built on the first lookup then kept up to date by the edits.
+
+        Raises:
+            KeyError: If the column does not exist
+        """
+        self.column_index(column)
+        for index in self.indexes:
+            if isinstance(index, ValueIndex) and index.columns == (column,):
+                return index
+        index = self.add_index(ValueIndex(column))
+        assert isinstance(index, ValueIndex)
+        return index
+
+    def find_value(self, column: str, value: str, after: int = -1) -> Optional[int]:
+        """
+        First row after the row `after` (from the top past the last row) where
+        `column` has `value`, in O(log n) with the index of the column (see value_index).
+        The value is parsed to the column dtype like an edit (ex: '2024-01-31' for a date).
+
+        Returns:
+            The row index, None if no row has the value
+
+        Raises:
+            KeyError: If the column does not exist
+            ValueError: If the value is empty or invalid for the column dtype
+        """
+        parsed = self.parse_values(self.column_index(column), [value])
+        if parsed.null_count():
+            raise ValueError("Enter a value to find")
+        return self.value_index(column).next_row(parsed[0], after)
+
+    def _columns_changed(self, rebuild: bool = False) -> None:
+        """
+        Update the indexes after a change of columns (or of the whole frame with `rebuild`),
+        the indexes that lost one of their columns are dropped.
+        """
+        df = self._index_frame()
+        if df is None:
+            return
+        columns = set(df.columns)
+        self.indexes = [
+            index
+            for index in self.indexes
+            if index.columns is None or set(index.columns) <= columns
+        ]
+        for index in self.indexes:
+            if rebuild:
+                index.build(df)
+            else:
+                index.columns_changed(df)
+        # computed columns that lost one of their columns become plain values
+        for col_name, expr in list(self._computed_exprs.items()):
+            if not {col_name, *expr.meta.root_names()} <= columns:
+                del self._computed_exprs[col_name]
+                del self.computed_columns[col_name]
+
+    # ---queries--- #
+    def query(self, sql: str) -> pl.LazyFrame:
+        """
+        SQL query over the data, the table is named `data` (ex: SELECT city, count(*) FROM data GROUP BY city).
+        The query is lazy: nothing is computed before the result is collected.
+
+        Raises:
+            polars.exceptions.SQLInterfaceError, SQLSyntaxError: If the query is invalid
+        """
+        with pl.SQLContext(frames={SQL_TABLE_NAME: self.lazy()}) as context:
+            return context.execute(sql, eager=False)
+
+    def summarize(
+        self,
+        by: Sequence[str],
+        aggregations: Sequence[tuple[str, str]] = (),
+    ) -> pl.DataFrame:
+        """
+        Group-by summary: one row per group with its row count and the aggregations.
+        Computed with the streaming engine so it works on spilled (lazy) data too.
+
+        Args:
+            by: Columns to group by
+            aggregations: (column, aggregation) pairs, see SUMMARY_AGGREGATIONS
+
+        Raises:
+            KeyError: If a column does not exist
+            ValueError: If an aggregation is unknown or no group-by column is given
+        """
+        if not by:
+            raise ValueError("At least one group-by column is needed")
+        for col_name in [*by, *(col_name for col_name, _ in aggregations)]:
+            self.column_index(col_name)
+
+        exprs = [pl.len().alias("count")]
+        for col_name, aggregation in aggregations:
+            if aggregation not in SUMMARY_AGGREGATIONS:
+                raise ValueError(
+                    f"Unknown aggregation '{aggregation}' "
+                    f"(one of {', '.join(sorted(SUMMARY_AGGREGATIONS))})"
+                )
+            expr = getattr(pl.col(col_name), aggregation)()
+            exprs.append(expr.alias(f"{col_name}_{aggregation}"))
+
+        return (
+            self.lazy()
+            .group_by(by)
+            .agg(exprs)
+            .sort(by, nulls_last=True)
+            .collect(engine="streaming")
+        )
+
+    def group_rows(self, by: Sequence[str], key: Sequence[Any]) -> list[int]:
+        """
+        Indices of the rows of a group (rows where the `by` columns equal `key`).
+        The row indices of every group are computed once and cached until the data changes.
+        """
+        by = tuple(by)
+        cached = self._group_rows.get(by)
+        if cached is None or cached[0] != self.version:
+            groups = (
+                self.lazy()
+                .select(by)
+                .with_row_index("__row__")
+                .group_by(by)
+                .agg(pl.col("__row__").sort())
+                .collect(engine="streaming")
+            )
+            rows = {tuple(group[:-1]): group[-1] for group in groups.iter_rows()}
+            cached = self._group_rows[by] = (self.version, rows)
+        return cached[1].get(tuple(key), [])
+
+    # ---read cells--- #
+    def column_index(self, col_name: str) -> int:
+        """
+        Get the index of a column from its name in O(1).
+
+        Raises:
+            KeyError: If the column does not exist
+        """
+        try:
+            return self._col_index[col_name]
+        except KeyError:
+            raise KeyError(f"Column '{col_name}' not found") from None
+
+    def get_cell(self, row_idx: int, col_idx: int) -> Any:
+        """
+        Get the typed value at a specific cell (None for empty cells).
+
+        Args:
+            row_idx: Row index (0-based)
+            col_idx: Column index (0-based)
+
+        Raises:
+            RunTimeError: If there is no data
+            IndexError: If indices are out of bounds
+        """
+        if self.spilled:
+            # lazy mode, see get_range
+            return self.get_range(row_idx, row_idx + 1, col_idx, col_idx + 1).item()
+
+        if self.df is None:
+            raise RuntimeError("No data loaded")
+
+        if row_idx < 0 or row_idx >= len(self.df):
+            raise IndexError(f"Row index {row_idx} out of bounds")
+
+        if col_idx < 0 or col_idx >= len(self.df.columns):
+            raise IndexError(f"Column index {col_idx} out of bounds")
+
+        return self.df[row_idx, col_idx]
+
+    # ---type coercion--- #
+    def _parser(self, col_name: str, dtype: pl.DataType) -> Parser:
+        """Cached parser for a column, rebuilt only when the column dtype changes"""
+        key = (col_name, dtype)
+        parser = self._parsers.get(key)
+        if parser is None:
+            parser = self._parsers[key] = _build_parser(dtype)
+        return parser
+
+    def parse_values(self, col_idx: int, values: Sequence[Any]) -> pl.Series:
+        """
+        Coerce raw values (usually strings typed by the user) to the column dtype.
+        The whole block is parsed with one vectorized cast, empty strings become null.
+
+        Args:
+            col_idx: Column index (0-based)
+            values: Values to parse
+
+        Returns:
+            A series with the dtype of the column
+
+        Raises:
+            RunTimeError: If there is no data
+            IndexError: If index is out of bounds
+            ValueError: If a value can't be converted to the column dtype
+        """
+        if self.df is None:
+            raise RuntimeError("No data loaded")
+
+        if col_idx < 0 or col_idx >= len(self.df.columns):
+            raise IndexError(f"Column index {col_idx} out of bounds")
+
+        col_name = self.df.columns[col_idx]
+        dtype = self.df.schema[col_name]
+
+        if not all(v is None or isinstance(v, str) for v in values):
+            values = [None if v is None else str(v) for v in values]
+        raw = pl.Series(col_name, values, dtype=pl.String).replace("", None)
+        try:
+            parsed = self._parser(col_name, dtype)(raw)
+        except pl.exceptions.PolarsError as e:
+            # ex: invalid JSON for a list column
+            message = str(e).splitlines()[0]
+            raise ValueError(
+                f"Invalid value for column '{col_name}' ({dtype}): {message}"
+            ) from None
+
+        invalid = raw.is_not_null() & parsed.is_null()
+        if invalid.any():
+            bad_value = raw.filter(invalid)[0]
+            raise ValueError(
+                f"Invalid value '{bad_value}' for column '{col_name}' ({dtype})"
+            )
+        return parsed.alias(col_name)
 
     # ---edit cells--- #
+    @_logged
     def set_cell(self, row_idx: int, col_idx: int, value: Any) -> None:
         """
         Set the value at a specific cell.
+        The value is coerced to the dtype of the column.
 
         Args:
             row_idx: Row index (0-based)
@@ -64,6 +728,7 @@ class CSVDataModel:
         Raises:
             RunTimeError: If there is no data
             IndexError: If indices are out of bounds
+            ValueError: If the value can't be converted to the column dtype
         """
         if self.df is None:
             raise RuntimeError("No data loaded")
@@ -71,29 +736,350 @@ class CSVDataModel:
         if row_idx < 0 or row_idx >= len(self.df):
             raise IndexError(f"Row index {row_idx} out of bounds")
 
-        if col_idx < 0 or col_idx >= len(self.df.columns):
-            raise IndexError(f"Column index {col_idx} out of bounds")
+        self.paste_values(row_idx, col_idx, [value])
 
-        col_name = self.df.columns[col_idx]
+    @_logged
+    def paste_values(self, row_idx: int, col_idx: int, values: Sequence[Any]) -> None:
+        """
+        Bulk paste: write values down a column starting at `row_idx`.
+        Values are parsed with one vectorized cast and written with one scatter.
 
-        # Create a new dataframe with the updated value
-        # We use a workaround: update the column with a when-then-otherwise expression
-        self.df = self.df.with_columns(
-            pl.when(pl.int_range(pl.len()) == row_idx)
-            .then(pl.lit(value))
-            .otherwise(pl.col(col_name))
-            .alias(col_name)
+        Args:
+            row_idx: Row index of the first value (0-based)
+            col_idx: Column index (0-based)
+            values: New values for the cells
+
+        Raises:
+            RunTimeError: If there is no data
+            IndexError: If indices are out of bounds
+            ValueError: If a value can't be converted to the column dtype
+        """
+        if self.df is None:
+            raise RuntimeError("No data loaded")
+
+        if row_idx < 0 or row_idx + len(values) > len(self.df):
+            raise IndexError(f"Row index {row_idx} out of bounds")
+
+        parsed = self.parse_values(col_idx, values)
+        self._write_block(row_idx, {col_idx: parsed})
+
+    # ---edit ranges--- #
+    def _check_range(
+        self, row_start: int, row_stop: int, col_start: int, col_stop: int
+    ) -> None:
+        """Validate a rectangular range (stop indices are exclusive)"""
+        if self._df is None and not self.spilled:
+            raise RuntimeError("No data loaded")
+
+        if row_start < 0 or row_stop > self.row_count() or row_start >= row_stop:
+            raise IndexError(f"Row range {row_start}:{row_stop} out of bounds")
+
+        if col_start < 0 or col_stop > self.column_count() or col_start >= col_stop:
+            raise IndexError(f"Column range {col_start}:{col_stop} out of bounds")
+
+    def _write_block(self, row_idx: int, columns: dict[int, pl.Series]) -> None:
+        """
+        Write already parsed values starting at `row_idx`.
+        Each column is updated with one scatter and the frame with one `with_columns`.
+        """
+        assert self.df is not None
+        updated, retyped = [], []
+        for col_idx, values in columns.items():
+            column = self.df.to_series(col_idx)
+            if column.dtype == pl.Null:
+                # Empty new columns have no type yet: they become text columns
+                column = column.cast(pl.String)
+                retyped.append(column.name)
+            if column.dtype.is_nested():
+                # scatter doesn't write lists and structs: splice the values in
+                column = pl.concat(
+                    [
+                        column.slice(0, row_idx),
+                        values.alias(column.name),
+                        column.slice(row_idx + len(values)),
+                    ]
+                )
+            else:
+                column.scatter(range(row_idx, row_idx + len(values)), values)
+            updated.append(column)
+        self._df = self.df.with_columns(updated)
+
+        # a retyped column changed in every row (not the other columns: not a rebuild,
+        # that would also renumber the row ids)
+        row_stop = row_idx + max(len(values) for values in columns.values())
+        col_names = [column.name for column in updated if column.name not in retyped]
+        for index in self.indexes:
+            if retyped:
+                index.rows_updated(self._df, 0, len(self._df), retyped)
+            if col_names:
+                index.rows_updated(self._df, row_idx, row_stop, col_names)
+        self._update_computed([column.name for column in updated])
+
+        self.modified = True
+
+    def get_range(
+        self, row_start: int, row_stop: int, col_start: int, col_stop: int
+    ) -> pl.DataFrame:
+        """
+        Get a rectangular block of cells as a dataframe (stop indices are exclusive).
+
+        Raises:
+            RuntimeError: If no data is loaded
+            IndexError: If the range is out of bounds
+        """
+        self._check_range(row_start, row_stop, col_start, col_stop)
+        if self.spilled:
+            # lazy mode: read the block from the spill file, not the whole data
+            return (
+                self.lazy()
+                .slice(row_start, row_stop - row_start)
+                .select(pl.nth(range(col_start, col_stop)))
+                .collect()
+            )
+        assert self.df is not None
+        return self.df[row_start:row_stop, col_start:col_stop]
+
+    @_logged
+    def set_range(
+        self, row_idx: int, col_idx: int, rows: Sequence[Sequence[Any]]
+    ) -> None:
+        """
+        Write a block of values (a list of rows) with its top-left cell at (row_idx, col_idx).
+        Every column of the block is parsed with one vectorized cast before anything is written.
+
+        Args:
+            row_idx: Row index of the top-left cell (0-based)
+            col_idx: Column index of the top-left cell (0-based)
+            rows: Rows of values, all of the same length
+
+        Raises:
+            RuntimeError: If no data is loaded
+            IndexError: If the block does not fit in the table
+            ValueError: If the rows have different lengths or a value can't be converted
+        """
+        if not rows or not rows[0]:
+            return
+        width = len(rows[0])
+        if any(len(row) != width for row in rows):
+            raise ValueError("All rows of the block must have the same length")
+
+        self._check_range(row_idx, row_idx + len(rows), col_idx, col_idx + width)
+
+        columns = {
+            col_idx + offset: self.parse_values(col_idx + offset, values)
+            for offset, values in enumerate(zip(*rows))
+        }
+        self._write_block(row_idx, columns)
+
+    @_logged
+    def fill_range(
+        self,
+        row_start: int,
+        row_stop: int,
+        col_start: int,
+        col_stop: int,
+        value: Any,
+    ) -> None:
+        """
+        Set every cell of a rectangular range to the same value (stop indices are exclusive).
+        The value is parsed once per column.
+
+        Raises:
+            RuntimeError: If no data is loaded
+            IndexError: If the range is out of bounds
+            ValueError: If the value can't be converted to a column dtype
+        """
+        self._check_range(row_start, row_stop, col_start, col_stop)
+
+        height = row_stop - row_start
+        columns = {
+            col: self.parse_values(col, [value]).new_from_index(0, height)
+            for col in range(col_start, col_stop)
+        }
+        self._write_block(row_start, columns)
+
+    @_logged
+    def clear_range(
+        self, row_start: int, row_stop: int, col_start: int, col_stop: int
+    ) -> None:
+        """
+        Empty every cell of a rectangular range (stop indices are exclusive).
+
+        Raises:
+            RuntimeError: If no data is loaded
+            IndexError: If the range is out of bounds
+        """
+        self.fill_range(row_start, row_stop, col_start, col_stop, None)
+
+    # ---find and replace--- #
+    def replace_all(
+        self,
+        pattern: str,
+        replacement: str,
+        regex: bool = False,
+        row_start: int = 0,
+        row_stop: Optional[int] = None,
+        col_start: int = 0,
+        col_stop: Optional[int] = None,
+    ) -> int:
+        """
+        Replace every match of `pattern` in the text columns of a range (the whole data by default)
+        with one vectorized `str.replace_all` per column, in a single `with_columns`.
+        The edit can be undone with `undo`: the old values of the changed cells are kept.
+        A replace that changes nothing is not an edit: the last edit can still be undone.
+
+        Args:
+            pattern: Text to find, or a regular expression with `regex`
+            replacement: Replacement ($1... for the groups of a regex)
+            regex: Is `pattern` a regular expression
+            row_start, row_stop, col_start, col_stop: Range of the replace (stops are exclusive)
+
+        Returns:
+            Number of replacements
+
+        Raises:
+            RuntimeError: If no data is loaded
+            IndexError: If the range is out of bounds
+            ValueError: If the pattern is empty or an invalid regular expression
+        """
+        args = (pattern, replacement, regex, row_start, row_stop, col_start, col_stop)
+        found = self._find_replacements(*args)
+        if not found[2]:
+            return 0
+        self._found_replacements = found
+        try:
+            return self._replace_matches(*args)
+        finally:
+            self._found_replacements = None
+
+    def _find_replacements(
+        self,
+        pattern: str,
+        replacement: str,
+        regex: bool,
+        row_start: int,
+        row_stop: Optional[int],
+        col_start: int,
+        col_stop: Optional[int],
+    ) -> tuple[int, pl.DataFrame, dict[str, tuple[pl.Series, pl.Series]]]:
+        """(number of replacements, replaced data, column -> (changed rows, old values))"""
+        if self.df is None:
+            raise RuntimeError("No data loaded")
+        if not pattern:
+            raise ValueError("Nothing to find")
+        row_stop = len(self.df) if row_stop is None else row_stop
+        col_stop = len(self.df.columns) if col_stop is None else col_stop
+        self._check_range(row_start, row_stop, col_start, col_stop)
+
+        col_names = [
+            col_name
+            for col_name in self.df.columns[col_start:col_stop]
+            if self.df.schema[col_name] == pl.String
+        ]
+        in_range = pl.int_range(pl.len()).is_between(row_start, row_stop - 1)
+        try:
+            counts = self.df.select(
+                pl.col(col_name)
+                .str.count_matches(pattern, literal=not regex)
+                .filter(in_range)
+                .sum()
+                for col_name in col_names
+            ).row(0)
+            replaced = self.df.with_columns(
+                pl.when(in_range)
+                # empty cells are null, like typed values
+                .then(
+                    pl.col(col_name)
+                    .str.replace_all(pattern, replacement, literal=not regex)
+                    .replace("", None)
+                )
+                .otherwise(pl.col(col_name))
+                for col_name in col_names
+            )
+        except pl.exceptions.PolarsError as e:
+            raise ValueError(f"Invalid pattern '{pattern}': {e}") from None
+
+        changes = {}
+        for col_name in col_names:
+            old = self.df.get_column(col_name)
+            rows = old.ne_missing(replaced.get_column(col_name)).arg_true()
+            if not rows.is_empty():
+                changes[col_name] = (rows, old.gather(rows))
+        return sum(counts), replaced, changes
+
+    @_logged
+    def _replace_matches(
+        self,
+        pattern: str,
+        replacement: str,
+        regex: bool,
+        row_start: int,
+        row_stop: Optional[int],
+        col_start: int,
+        col_stop: Optional[int],
+    ) -> int:
+        """The edit of replace_all, with the replacements it found (found again when replayed)"""
+        count, replaced, changes = self._found_replacements or self._find_replacements(
+            pattern, replacement, regex, row_start, row_stop, col_start, col_stop
         )
+        if not changes:
+            return 0
+        self._df = replaced
+        self._cells_changed(changes)
+        # the version once the edit is done (see _logged), undo checks nothing came after
+        self._undo = (self.version + 1, f"replace '{pattern}'", changes)
+        return count
 
+    def _cells_changed(self, changes: dict[str, tuple[pl.Series, pl.Series]]) -> None:
+        """Update the indexes and computed columns after cells were changed in place"""
+        assert self._df is not None
+        for col_name, (rows, _) in changes.items():
+            for index in self.indexes:
+                index.rows_updated(self._df, rows[0], rows[-1] + 1, [col_name])
+        self._update_computed(list(changes))
         self.modified = True
 
+    def can_undo(self) -> bool:
+        """True if the last edit can be undone"""
+        return self._undo is not None and self._undo[0] == self.version
+
+    @_logged
+    def undo(self) -> str:
+        """
+        Undo the last edit, if it is undoable (replace_all) and nothing was edited since.
+        Only the changed cells are written back.
+
+        Returns:
+            Description of the undone edit
+
+        Raises:
+            RuntimeError: If there is nothing to undo
+        """
+        if not self.can_undo():
+            self._undo = None
+            raise RuntimeError("Nothing to undo")
+        assert self._undo is not None and self.df is not None
+        _, description, changes = self._undo
+        columns = []
+        for col_name, (rows, old_values) in changes.items():
+            columns.append(self.df.get_column(col_name).scatter(rows, old_values))
+        self._df = self.df.with_columns(columns)
+        self._cells_changed(changes)
+        self._undo = None
+        return description
+
     # ---add new row or column--- #
     def row_count(self) -> int:
+        if self.spilled:
+            return self._spilled_shape[0]
         return 0 if self.df is None else len(self.df)
 
     def column_count(self) -> int:
+        if self.spilled:
+            return self._spilled_shape[1]
         return 0 if self.df is None else len(self.df.columns)
 
+    @_logged
     def insert_row(self, row_idx: int, values: Optional[list[Any]] = None) -> None:
         """
         Insert a row at the given index (aka. below the cursor).
@@ -105,24 +1091,43 @@ class CSVDataModel:
             RuntimeError: If no data is loaded
             IndexError: If index is out of bounds
         """
+        self.insert_rows(row_idx, 1)
+
+    @_logged
+    def insert_rows(self, at: int, count: int = 1) -> None:
+        """
+        Insert `count` empty rows at the given index in one operation.
+
+        Args:
+            at: Index where the first new row will be inserted
+            count: Number of rows to insert
+
+        Raises:
+            RuntimeError: If no data is loaded
+            IndexError: If index is out of bounds
+            ValueError: If count is not positive
+        """
         if self.df is None:
             raise RuntimeError("No data loaded")
 
-        if row_idx < 0 or row_idx > len(self.df):
-            raise IndexError(f"Row index {row_idx} out of bounds")
-
-        num_cols = len(self.df.columns)
+        if at < 0 or at > len(self.df):
+            raise IndexError(f"Row index {at} out of bounds")
 
-        values = [None] * num_cols  # empty rows
+        if count < 1:
+            raise ValueError("Number of rows to insert must be positive")
 
-        new_row = pl.DataFrame([values], schema=self.df.schema, orient="row")
+        new_rows = self.df.clear(count)  # empty rows with the same schema
 
-        top = self.df.slice(0, row_idx)
-        bottom = self.df.slice(row_idx)
+        top = self.df.slice(0, at)
+        bottom = self.df.slice(at)
 
-        self.df = pl.concat([top, new_row, bottom])
+        self._df = pl.concat([top, new_rows, bottom])
+        for index in self.indexes:
+            index.rows_inserted(self._df, at, count)
+        self._update_computed(self._df.columns)
         self.modified = True
 
+    @_logged
     def insert_column(
         self,
         col_idx: int,
@@ -146,42 +1151,243 @@ class CSVDataModel:
         if col_idx < 0 or col_idx > len(self.df.columns):
             raise IndexError(f"Column index {col_idx} out of bounds")
 
-        num_rows = len(self.df)
-
-        # Generate a unique column name if not provided
         if col_name is None:
-            existing_cols = set(self.df.columns)
-            counter = 1
+            col_name = self._new_column_name()
+        self._insert_column(col_idx, col_name, pl.lit(None))
+
+    def _new_column_name(self) -> str:
+        """Unique name for a new column: Column_1, Column_2..."""
+        existing_cols = set(self._col_index)
+        counter = 1
+        col_name = f"Column_{counter}"
+        while col_name in existing_cols:
+            counter += 1
             col_name = f"Column_{counter}"
-            while col_name in existing_cols:
-                counter += 1
-                col_name = f"Column_{counter}"
-
-        values = [None] * num_rows  # empty cols
-
-        # Create new column dataframe
-        new_col_df = pl.DataFrame({col_name: values})
-
-        # Split the dataframe and insert the new column
-        if col_idx == 0:
-            # Insert at the beginning
-            self.df = pl.concat([new_col_df, self.df], how="horizontal")
-        elif col_idx >= len(self.df.columns):
-            # Insert at the end
-            self.df = pl.concat([self.df, new_col_df], how="horizontal")
+        return col_name
+
+    def _insert_column(self, col_idx: int, col_name: str, expr: pl.Expr) -> None:
+        """
+        Insert a column computed by an expression (vectorized, no list of values).
+        Spilled data is streamed from its spill file to a new one (see `_edits_spilled`).
+        """
+        if col_name in self._col_index:
+            raise ValueError(f"Column '{col_name}' already exists")
+        if self._edits_spilled():
+            lf = self.lazy()
+            columns = lf.collect_schema().names()
+            self._sink_spilled(
+                lf.with_columns(expr.alias(col_name)).select(
+                    [*columns[:col_idx], col_name, *columns[col_idx:]]
+                )
+            )
         else:
-            # Insert in the middle
-            left_cols = self.df.columns[:col_idx]
-            right_cols = self.df.columns[col_idx:]
+            assert self.df is not None
+            columns = self.df.columns
+            self._df = self.df.with_columns(expr.alias(col_name)).select(
+                [*columns[:col_idx], col_name, *columns[col_idx:]]
+            )
+
+        # shift the columns on the right of the new one
+        for name, idx in self._col_index.items():
+            if idx >= col_idx:
+                self._col_index[name] = idx + 1
+        self._col_index[col_name] = col_idx
+        self._columns_changed()
+
+        self.modified = True
+
+    # ---computed columns and types--- #
+    def _expression(self, expression: str) -> pl.Expr:
+        """
+        Parse a SQL expression over the columns (ex: price * qty, upper("first name"))
+
+        Raises:
+            ValueError: If the expression is invalid
+            KeyError: If a column of the expression does not exist
+        """
+        try:
+            expr = pl.sql_expr(expression)
+        except pl.exceptions.PolarsError as e:
+            raise ValueError(f"Invalid expression '{expression}': {e}") from None
+        for col_name in expr.meta.root_names():
+            self.column_index(col_name)
+        return expr
+
+    @_logged
+    def insert_computed_column(
+        self, col_idx: int, col_name: Optional[str], expression: str
+    ) -> None:
+        """
+        Insert a column computed from the other columns with a SQL expression
+        (ex: price * qty). The expression is evaluated vectorized, and again when
+        the columns it uses are edited (see `computed_columns`).
+        Spilled data is not read back in memory (see `_edits_spilled`).
+
+        Args:
+            col_idx: Index where the column will be inserted
+            col_name: Name of the new column, None for a generated name
+            expression: SQL expression over the columns
 
-            left_df = self.df.select(left_cols)
-            right_df = self.df.select(right_cols)
+        Raises:
+            RuntimeError: If no data is loaded
+            IndexError: If index is out of bounds
+            ValueError: If the expression is invalid or the column already exists
+            KeyError: If a column of the expression does not exist
+        """
+        if not self._edits_spilled() and self.df is None:
+            raise RuntimeError("No data loaded")
 
-            self.df = pl.concat([left_df, new_col_df, right_df], how="horizontal")
+        if col_idx < 0 or col_idx > self.column_count():
+            raise IndexError(f"Column index {col_idx} out of bounds")
 
+        expr = self._expression(expression)
+        if col_name is None:
+            col_name = self._new_column_name()
+        try:
+            self._insert_column(col_idx, col_name, expr)
+        except pl.exceptions.PolarsError as e:
+            raise ValueError(f"Invalid expression '{expression}': {e}") from None
+        self.computed_columns[col_name] = expression
+        self._computed_exprs[col_name] = expr
+
+    @_logged
+    def cast_column(self, col_idx: int, dtype: str) -> None:
+        """
+        Convert a column to another type with one vectorized cast.
+        Text is parsed like typed values (ex: '2024-01-31' to a date).
+        Spilled data is not read back in memory (see `_edits_spilled`).
+
+        Args:
+            col_idx: Column index (0-based)
+            dtype: Type name, see COLUMN_TYPES (ex: 'int', 'date')
+
+        Raises:
+            RuntimeError: If no data is loaded
+            IndexError: If index is out of bounds
+            ValueError: If the type is unknown or a value can't be converted
+        """
+        if not self._edits_spilled() and self.df is None:
+            raise RuntimeError("No data loaded")
+
+        if col_idx < 0 or col_idx >= self.column_count():
+            raise IndexError(f"Column index {col_idx} out of bounds")
+
+        target = COLUMN_TYPES.get(dtype.strip().lower())
+        if target is None:
+            raise ValueError(
+                f"Unknown type '{dtype}', expected one of: {', '.join(COLUMN_TYPES)}"
+            )
+        if self._edits_spilled():
+            self._cast_spilled(col_idx, target, dtype)
+            return
+        assert self.df is not None
+        column = self.df.to_series(col_idx)
+        if column.dtype == target:
+            return
+        if column.dtype == pl.String:
+            converted = self._parser(column.name, target)(column.replace("", None))
+        else:
+            try:
+                converted = column.cast(target, strict=False)
+            except pl.exceptions.PolarsError as e:
+                raise ValueError(
+                    f"Can't convert '{column.name}' ({column.dtype}) to {dtype}: {e}"
+                ) from None
+
+        invalid = column.is_not_null() & converted.is_null()
+        if column.dtype == pl.String:
+            invalid &= column != ""
+        if invalid.any():
+            bad_value = column.filter(invalid)[0]
+            raise ValueError(
+                f"Invalid value '{bad_value}' for column '{column.name}' ({target})"
+            )
+
+        self._df = self.df.with_columns(converted.alias(column.name))
+        for index in self.indexes:
+            index.rows_updated(self._df, 0, len(self._df), [column.name])
+        self._update_computed([column.name])
         self.modified = True
 
+    def _cast_spilled(self, col_idx: int, target: pl.DataType, dtype: str) -> None:
+        """cast_column of spilled data: checked by a scan, converted by a sink"""
+        lf = self.lazy()
+        schema = lf.collect_schema()
+        col_name = schema.names()[col_idx]
+        if schema[col_name] == target:
+            return
+        column = pl.col(col_name)
+        if schema[col_name] == pl.String:
+            converted = self._parser(col_name, target)(column.replace("", None))
+            invalid = column.is_not_null() & (column != "") & converted.is_null()
+        else:
+            converted = column.cast(target, strict=False)
+            invalid = column.is_not_null() & converted.is_null()
+        try:
+            bad_values = lf.filter(invalid).select(column).head(1).collect()
+        except pl.exceptions.PolarsError as e:
+            raise ValueError(
+                f"Can't convert '{col_name}' ({schema[col_name]}) to {dtype}: {e}"
+            ) from None
+        if len(bad_values):
+            raise ValueError(
+                f"Invalid value '{bad_values.item()}' for column '{col_name}' ({target})"
+            )
+
+        lf = lf.with_columns(converted.alias(col_name))
+        # the computed columns using it, in insertion order like _update_computed
+        updated = [col_name]
+        for name, expr in self._computed_exprs.items():
+            if not set(updated) & set(expr.meta.root_names()):
+                continue
+            recomputed = lf.with_columns(
+                expr.cast(schema[name], strict=False).alias(name)
+            )
+            try:
+                recomputed.collect_schema()
+            except pl.exceptions.PolarsError:
+                # its columns can't be used anymore (ex: changed to text), keep the values
+                continue
+            lf = recomputed
+            updated.append(name)
+        self._sink_spilled(lf)
+
+        df = self._index_frame()
+        assert df is not None
+        for index in self.indexes:
+            index.rows_updated(df, 0, self._spilled_shape[0], updated)
+        self.modified = True
+
+    def _update_computed(self, changed: Sequence[str]) -> None:
+        """
+        Evaluate again the computed columns that use the `changed` columns.
+        The whole column is evaluated (vectorized) so aggregations stay right,
+        the indexes only see the span of rows whose value changed.
+        """
+        assert self._df is not None
+        changed_columns = set(changed)
+        # in insertion order: a computed column can use the ones inserted before
+        for col_name, expr in self._computed_exprs.items():
+            if not changed_columns & set(expr.meta.root_names()):
+                continue
+            old = self._df.get_column(col_name)
+            try:
+                new = self._df.select(
+                    expr.cast(old.dtype, strict=False).alias(col_name)
+                ).to_series()
+            except pl.exceptions.PolarsError:
+                # its columns can't be used anymore (ex: changed to text), keep the values
+                continue
+            rows = old.ne_missing(new).arg_true()
+            if rows.is_empty():
+                continue
+            self._df = self._df.with_columns(new)
+            for index in self.indexes:
+                index.rows_updated(self._df, rows[0], rows[-1] + 1, [col_name])
+            changed_columns.add(col_name)
+
     # ---remove row or col--- #
+    @_logged
     def delete_row(self, row_idx: int) -> None:
         """
         Delete a row at the given index.
@@ -194,21 +1400,60 @@ class CSVDataModel:
             IndexError: If index is out of bounds
             ValueError: If trying to delete the last remaining row
         """
+        self.delete_rows(row_idx, row_idx + 1)
+
+    @_logged
+    def delete_rows(
+        self, start: int | Sequence[int], stop: Optional[int] = None
+    ) -> None:
+        """
+        Delete several rows in one operation.
+        Either a range: `delete_rows(start, stop)` (stop is exclusive)
+        or a list of indices: `delete_rows([1, 5, 8])`.
+
+        Raises:
+            RuntimeError: If no data is loaded
+            IndexError: If an index is out of bounds
+            ValueError: If trying to delete every remaining row
+        """
         if self.df is None:
             raise RuntimeError("No data loaded")
 
-        if row_idx < 0 or row_idx >= len(self.df):
-            raise IndexError(f"Row index {row_idx} out of bounds")
+        num_rows = len(self.df)
+
+        if isinstance(start, int):
+            stop = start + 1 if stop is None else stop
+            if start < 0 or start >= num_rows:
+                raise IndexError(f"Row index {start} out of bounds")
+            if stop <= start or stop > num_rows:
+                raise IndexError(f"Row index {stop - 1} out of bounds")
+            if stop - start == num_rows:
+                raise ValueError("Cannot delete the last remaining row")
 
-        if len(self.df) == 1:
-            raise ValueError("Cannot delete the last remaining row")
+            # slices are zero-copy
+            self._df = pl.concat([self.df.slice(0, start), self.df.slice(stop)])
+            deleted: Sequence[int] = range(start, stop)
+        else:
+            indices = set(start)
+            for row_idx in indices:
+                if row_idx < 0 or row_idx >= num_rows:
+                    raise IndexError(f"Row index {row_idx} out of bounds")
+            if not indices:
+                return
+            if len(indices) == num_rows:
+                raise ValueError("Cannot delete the last remaining row")
 
-        # Create a boolean mask for all rows except the one to delete
-        mask = pl.int_range(pl.len()) != row_idx
-        self.df = self.df.filter(mask)
+            mask = pl.int_range(pl.len()).is_in(list(indices)).not_()
+            self._df = self.df.filter(mask)
+            deleted = sorted(indices)
 
+        for index in self.indexes:
+            index.rows_deleted(self._df, deleted)
+        # aggregations (ex: price / sum(price)) change with the rows
+        self._update_computed(self._df.columns)
         self.modified = True
 
+    @_logged
     def delete_column(self, col_idx: int) -> None:
         """
         Delete a column at the given index.
@@ -221,16 +1466,44 @@ class CSVDataModel:
             IndexError: If index is out of bounds
             ValueError: If trying to delete the last remaining column
         """
+        self.delete_columns([col_idx])
+
+    @_logged
+    def delete_columns(self, indices: Sequence[int]) -> None:
+        """
+        Delete several columns in one operation.
+
+        Args:
+            indices: Indices of the columns to delete
+
+        Raises:
+            RuntimeError: If no data is loaded
+            IndexError: If an index is out of bounds
+            ValueError: If trying to delete every remaining column
+        """
         if self.df is None:
             raise RuntimeError("No data loaded")
 
-        if col_idx < 0 or col_idx >= len(self.df.columns):
-            raise IndexError(f"Column index {col_idx} out of bounds")
+        num_cols = len(self.df.columns)
+        indices = set(indices)
 
-        if len(self.df.columns) == 1:
+        for col_idx in indices:
+            if col_idx < 0 or col_idx >= num_cols:
+                raise IndexError(f"Column index {col_idx} out of bounds")
+        if not indices:
+            return
+        if len(indices) == num_cols:
             raise ValueError("Cannot delete the last remaining column")
 
-        col_name = self.df.columns[col_idx]
-        self.df = self.df.drop(col_name)
+        col_names = [self.df.columns[col_idx] for col_idx in indices]
+        self._df = self.df.drop(col_names)
+
+        # shift the remaining columns by the number of deleted columns on their left
+        deleted = sorted(indices)
+        for name in col_names:
+            del self._col_index[name]
+        for name, idx in self._col_index.items():
+            self._col_index[name] = idx - bisect_left(deleted, idx)
+        self._columns_changed()
 
         self.modified = True
@@ -0,0 +1,136 @@
+import codecs
+import csv
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from .compression import open_decompressed
+
+# Only the beginning of the file is read to detect its dialect
+SNIFF_SIZE = 256 * 1024
+# The delimiter, quote and header are sniffed from the first lines only:
+# csv.Sniffer's regexes take seconds on large samples with quoted values
+SNIFF_LINES = 50
+SNIFF_LINES_SIZE = 32 * 1024
+DELIMITERS = ",;\t|"
+
+_BOMS = [
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+]
+
+
+@dataclass(frozen=True)
+class Dialect:
+    """How a CSV file is written: what is needed to read it and to save it the same way"""
+
+    delimiter: str = ","
+    quote_char: str = '"'
+    has_header: bool = True
+    encoding: str = "utf-8"  # python codec name
+    bom: bool = False
+    line_terminator: str = "\n"
+
+
+# (path, size, mtime) -> dialect, a file is sniffed again only when it changes
+_DIALECT_CACHE: dict[tuple[str, int, int], Dialect] = {}
+
+
+def sniff_dialect(path: str | Path, compression: Optional[str] = None) -> Dialect:
+    """Detect the dialect of a CSV file from its first SNIFF_SIZE bytes (cached per file)"""
+    path = Path(path)
+    stat = path.stat()
+    key = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+    dialect = _DIALECT_CACHE.get(key)
+    if dialect is None:
+        try:
+            with open_decompressed(path, compression) as stream:
+                prefix = stream.read(SNIFF_SIZE)
+        except RuntimeError:
+            # e.g. zstd stream without the optional zstandard package
+            prefix = b""
+        dialect = _DIALECT_CACHE[key] = sniff_bytes(prefix)
+    return dialect
+
+
+def sniff_bytes(prefix: bytes) -> Dialect:
+    """Detect the dialect from the first bytes of a file"""
+    if not prefix:
+        return Dialect()
+
+    encoding, bom = _sniff_encoding(prefix)
+    prefix = prefix[len(bom) :]
+    # the prefix can end in the middle of a character
+    text = codecs.getincrementaldecoder(encoding)(errors="replace").decode(prefix)
+
+    # drop the last line, it is probably cut
+    lines = text.splitlines(keepends=True)
+    if len(lines) > 1 and len(prefix) >= SNIFF_SIZE:
+        lines = lines[:-1]
+    sample = "".join(lines)
+
+    line_terminator = "\r\n" if sample.count("\r\n") * 2 > sample.count("\n") else "\n"
+
+    # whole lines, at least the first one
+    sample_lines, size = lines[:1], sum(map(len, lines[:1]))
+    for line in lines[1:SNIFF_LINES]:
+        size += len(line)
+        if size > SNIFF_LINES_SIZE:
+            break
+        sample_lines.append(line)
+    sample = "".join(sample_lines)
+
+    try:
+        sniffed = csv.Sniffer().sniff(sample, delimiters=DELIMITERS)
+        delimiter, quote_char = sniffed.delimiter, sniffed.quotechar or '"'
+    except csv.Error:
+        # a single column (or nothing to compare): keep the defaults
+        delimiter, quote_char = ",", '"'
+
+    rows = list(
+        csv.reader(sample.splitlines(), delimiter=delimiter, quotechar=quote_char)
+    )
+    return Dialect(
+        delimiter=delimiter,
+        quote_char=quote_char,
+        has_header=_sniff_header(rows),
+        encoding=encoding,
+        bom=bool(bom),
+        line_terminator=line_terminator,
+    )
+
+
+def _sniff_encoding(prefix: bytes) -> tuple[str, bytes]:
+    """Encoding and BOM: from the BOM if any, else utf-8 if the bytes decode, else latin-1"""
+    for bom, encoding in _BOMS:
+        if prefix.startswith(bom):
+            return encoding, bom
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(prefix)
+    except UnicodeDecodeError:
+        return "latin-1", b""
+    return "utf-8", b""
+
+
+def _is_number(value: str) -> bool:
+    try:
+        float(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _sniff_header(rows: list[list[str]]) -> bool:
+    """
+    The first row is data (no header) when one of its values is a number
+    in a column where the other rows are numbers too. Header names are not numbers.
+    """
+    if len(rows) < 2:
+        return True
+    first, others = rows[0], rows[1:]
+    for col_idx, value in enumerate(first):
+        column = [row[col_idx] for row in others if col_idx < len(row) and row[col_idx]]
+        if _is_number(value) and column and all(_is_number(v) for v in column):
+            return False
+    return True
@@ -0,0 +1,277 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, Sequence
+
+import polars as pl
+
+from .formats import format_for_path
+from .remote import RemoteFile, is_url, url_path
+
+# change column of a diff
+INSERTED = "inserted"
+DELETED = "deleted"
+MODIFIED = "modified"
+
+_HASH = "__hash__"
+_OLD_COUNT = "__old_count__"
+_NEW_COUNT = "__new_count__"
+
+
+def _schema(lf: pl.LazyFrame) -> pl.Schema:
+    return lf.collect_schema()
+
+
+def diff_lazy(
+    old: pl.LazyFrame,
+    new: pl.LazyFrame,
+    on: Optional[Sequence[str]] = None,
+    ordered: bool = True,
+) -> pl.LazyFrame:
+    """
+    Rows that differ between two frames, as a lazy frame that can be collected
+    with the streaming engine or sunk to a file.
+
+    With key columns (`on`), rows are matched by key (the key must be unique
+    on each side) and a row with the same key but other values is `modified`.
+    Without a key, rows are matched by a hash of the whole row (rows can be
+    reordered), so a changed row is reported as deleted + inserted.
+
+    Only the columns present in both frames are compared, see `column_changes`.
+
+    Args:
+        ordered: Sort the changes by row. Sorting waits for the whole diff:
+            a sink to a stream can write the changes as they come without it
+
+    Returns:
+        Columns: change, old_row, new_row (row indices, null on the missing side),
+        changed_columns (list of the modified columns), then the compared columns
+        (new values, old values for deleted rows)
+    """
+    old_schema, new_schema = _schema(old), _schema(new)
+    columns = [name for name in new_schema if name in old_schema]
+    keys = list(on) if on else []
+    for key in keys:
+        if key not in columns:
+            raise KeyError(f"Key column '{key}' not found in both files")
+    values = [name for name in columns if name not in keys]
+
+    # values of different types (e.g. a column read as numbers on one side) are compared as text
+    casts = [
+        pl.col(name).cast(pl.String)
+        for name in columns
+        if old_schema[name] != new_schema[name]
+    ]
+    old = old.select(columns).with_columns(casts).with_row_index("old_row")
+    new = new.select(columns).with_columns(casts).with_row_index("new_row")
+
+    changes = (
+        _changes_by_key(old, new, keys, values)
+        if keys
+        else _changes_by_row(old, new, columns)
+    )
+    changes = changes.select(
+        "change",
+        "old_row",
+        "new_row",
+        "changed_columns",
+        *keys,
+        *values,
+    )
+    if ordered:
+        changes = changes.sort("new_row", "old_row", nulls_last=True)
+    return changes
+
+
+def _changes_by_key(
+    old: pl.LazyFrame, new: pl.LazyFrame, keys: list[str], values: list[str]
+) -> pl.LazyFrame:
+    """Rows inserted, deleted or modified, matched by key"""
+    row_hash = pl.struct(values).hash() if values else pl.lit(0, pl.UInt64)
+    joined = old.with_columns(row_hash.alias(_HASH)).join(
+        new.with_columns(row_hash.alias(_HASH)),
+        on=keys,
+        how="full",
+        coalesce=True,
+        suffix="_new",
+        validate="1:1",
+    )
+    new_name = {name: f"{name}_new" for name in values}
+
+    change = (
+        pl.when(pl.col("old_row").is_null())
+        .then(pl.lit(INSERTED))
+        .when(pl.col("new_row").is_null())
+        .then(pl.lit(DELETED))
+        .when(pl.col(_HASH) != pl.col(f"{_HASH}_new"))
+        .then(pl.lit(MODIFIED))
+    )
+    changed_columns = pl.concat_list(
+        [
+            pl.when(pl.col(name).ne_missing(pl.col(new_name[name]))).then(pl.lit(name))
+            for name in values
+        ]
+        or [pl.lit(None, pl.String)]
+    ).list.drop_nulls()
+    shown = [
+        pl.when(pl.col("new_row").is_null())
+        .then(pl.col(name))
+        .otherwise(pl.col(new_name[name]))
+        .alias(name)
+        for name in values
+    ]
+
+    return (
+        joined.with_columns(change.alias("change"))
+        .filter(pl.col("change").is_not_null())
+        .with_columns(
+            pl.when(pl.col("change") == MODIFIED)
+            .then(changed_columns)
+            .otherwise(pl.lit([], pl.List(pl.String)))
+            .alias("changed_columns"),
+            *shown,
+        )
+    )
+
+
+def _changes_by_row(
+    old: pl.LazyFrame, new: pl.LazyFrame, columns: list[str]
+) -> pl.LazyFrame:
+    """
+    Rows inserted or deleted, matched by a hash of the whole row.
+    The n-th occurrences of identical rows are matched together: a row differs when
+    its hash has more occurrences on its side, beyond the count of the other side.
+    Only the rows of these hashes are ranked (see `_surplus_rows`).
+    """
+    row_hash = pl.struct(columns).hash()
+    old = old.with_columns(row_hash.alias(_HASH))
+    new = new.with_columns(row_hash.alias(_HASH))
+    counts = (
+        old.group_by(_HASH)
+        .agg(pl.len().alias(_OLD_COUNT))
+        .join(
+            new.group_by(_HASH).agg(pl.len().alias(_NEW_COUNT)),
+            on=_HASH,
+            how="full",
+            coalesce=True,
+        )
+        .with_columns(pl.col(_OLD_COUNT, _NEW_COUNT).fill_null(0))
+    )
+    old_count, new_count = pl.col(_OLD_COUNT), pl.col(_NEW_COUNT)
+    inserted = _surplus_rows(
+        new.join(counts.filter(new_count > old_count), on=_HASH), "new_row", old_count
+    ).with_columns(pl.lit(INSERTED).alias("change"))
+    deleted = _surplus_rows(
+        old.join(counts.filter(old_count > new_count), on=_HASH), "old_row", new_count
+    ).with_columns(pl.lit(DELETED).alias("change"))
+    return pl.concat([inserted, deleted], how="diagonal").with_columns(
+        pl.lit([], pl.List(pl.String)).alias("changed_columns")
+    )
+
+
+def _surplus_rows(rows: pl.LazyFrame, row: str, other_count: pl.Expr) -> pl.LazyFrame:
+    """
+    Occurrences of each hash beyond `other_count`, the first ones being matched.
+    Sorted by hash and row, the occurrence of a row is its distance to the first
+    row of its hash: a running count instead of a window over the hashes.
+    """
+    index = pl.int_range(pl.len(), dtype=pl.UInt32)
+    first = (pl.col(_HASH) != pl.col(_HASH).shift(1)).fill_null(True)
+    first_index = pl.when(first).then(index).forward_fill()
+    return rows.sort(_HASH, row).filter(index - first_index >= other_count)
+
+
+def column_changes(
+    old_columns: Sequence[str], new_columns: Sequence[str]
+) -> tuple[list[str], list[str]]:
+    """(added, deleted) column names"""
+    added = [name for name in new_columns if name not in old_columns]
+    deleted = [name for name in old_columns if name not in new_columns]
+    return added, deleted
+
+
+def diff_files(
+    old_path: str | Path,
+    new_path: str | Path,
+    on: Optional[Sequence[str]] = None,
+    ordered: bool = True,
+) -> tuple[pl.LazyFrame, list[str], list[str]]:
+    """
+    Diff of two files, scanned lazily with their format reader (see formats.py)
+    so large files can be compared with the streaming engine. Remote files
+    (URLs) are read through range requests.
+
+    Returns:
+        The lazy diff of the rows (see `diff_lazy`), the added and the deleted columns
+
+    Raises:
+        ValueError: If a file format is not supported
+        KeyError: If a key column is not in both files
+    """
+    scans = []
+    for path in (old_path, new_path):
+        file_format = format_for_path(url_path(path) if is_url(path) else path)
+        if file_format is None:
+            raise ValueError(f"Unsupported file format: {path}")
+        if is_url(path):
+            with RemoteFile(str(path)) as remote:
+                scans.append(file_format.load_remote(remote)[0].lazy())
+        else:
+            scans.append(file_format.scan(Path(path)))
+    old, new = scans
+    added, deleted = column_changes(
+        old.collect_schema().names(), new.collect_schema().names()
+    )
+    return diff_lazy(old, new, on, ordered), added, deleted
+
+
+@dataclass
+class Diff:
+    """
+    Differences between two versions of a file.
+    The rows can be lazy (ex: scanned from the file a large diff was sunk to):
+    only the counts of the changes are collected, the rows are read when shown.
+    """
+
+    rows: pl.DataFrame | pl.LazyFrame  # see diff_lazy
+    added_columns: list[str] = field(default_factory=list)
+    deleted_columns: list[str] = field(default_factory=list)
+    # change -> number of rows, counted on first use
+    _counts: Optional[dict[str, int]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def count(self, change: str) -> int:
+        if self._counts is None:
+            counts = self.rows.lazy().group_by("change").agg(pl.len()).collect()
+            self._counts = dict(counts.iter_rows())
+        return self._counts.get(change, 0)
+
+    @property
+    def inserted(self) -> int:
+        return self.count(INSERTED)
+
+    @property
+    def deleted(self) -> int:
+        return self.count(DELETED)
+
+    @property
+    def modified(self) -> int:
+        return self.count(MODIFIED)
+
+    def new_row(self, index: int) -> Optional[int]:
+        """Row in the new version of the index-th change (None for a deleted row)"""
+        return self.rows.lazy().select("new_row").slice(index, 1).collect().item()
+
+    def is_empty(self) -> bool:
+        return (
+            not (self.inserted or self.deleted or self.modified)
+            and not self.added_columns
+            and not self.deleted_columns
+        )
+
+    def summary(self) -> str:
+        """ex: '2 inserted, 1 deleted, 3 modified rows | +1 -0 columns'"""
+        return (
+            f"{self.inserted} inserted, {self.deleted} deleted, {self.modified} modified rows"
+            f" | +{len(self.added_columns)} -{len(self.deleted_columns)} columns"
+        )
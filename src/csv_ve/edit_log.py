@@ -0,0 +1,193 @@
+import json
+import os
+import struct
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Optional
+
+# File layout:
+#   header: MAGIC + size and mtime (ns) of the edited file when the log was started
+#   records: payload length + crc32 of the payload + payload (json: [operation, args, kwargs])
+MAGIC = b"CSVVEWAL"
+_HEADER = struct.Struct("<8sqq")
+_RECORD = struct.Struct("<II")
+
+Record = tuple[str, list[Any], dict[str, Any]]
+
+
+def _to_json(value: Any) -> Any:
+    """Fallback for values json doesn't know (ranges, sets, dates...)"""
+    if isinstance(value, (range, set, frozenset)):
+        return list(value)
+    return str(value)
+
+
+class EditLog:
+    """
+    Write-ahead log of the edits made to a file, stored next to it.
+    Appending only buffers the record in memory: a background thread writes
+    and fsyncs the buffered records every `flush_interval` seconds.
+    When the log can't be written (read-only folder, full disk...), the records
+    stay in the buffer, `failed` is set and the next flushes try again.
+    """
+
+    def __init__(self, file_path: str | Path, flush_interval: float = 1.0):
+        self.file_path = Path(file_path)
+        self.path = self.file_path.with_name(f".{self.file_path.name}.csv-ve.wal")
+        self.flush_interval = flush_interval
+
+        self._buffer: list[bytes] = []
+        self._buffer_lock = threading.Lock()
+        self._file_lock = threading.Lock()
+        self._file = None
+        self._generation = 0  # bumped by discard() so in-flight flushes are dropped
+        self.error: Optional[OSError] = None  # of the last flush, if it failed
+
+        self._closed = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ---writing--- #
+    def append(self, operation: str, args: tuple, kwargs: dict) -> None:
+        """Buffer one edit, it is written to disk by the next flush"""
+        payload = json.dumps([operation, args, kwargs], default=_to_json).encode()
+        record = _RECORD.pack(len(payload), zlib.crc32(payload)) + payload
+
+        with self._buffer_lock:
+            self._buffer.append(record)
+            if self._thread is None:
+                self._closed.clear()
+                self._thread = threading.Thread(
+                    target=self._flush_periodically, name="csv-ve-wal", daemon=True
+                )
+                self._thread.start()
+
+    def _flush_periodically(self) -> None:
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    @property
+    def failed(self) -> bool:
+        """The last flush couldn't write the log: the edits are only in memory"""
+        return self.error is not None
+
+    def flush(self) -> None:
+        """Write the buffered records and fsync the log"""
+        with self._buffer_lock:
+            records, self._buffer = self._buffer, []
+            generation = self._generation
+        if not records:
+            return
+
+        with self._file_lock:
+            if generation != self._generation:
+                return  # the log was discarded in the meantime
+            start = None
+            try:
+                if self._file is None:
+                    self._file = self._open()
+                start = self._file.tell()
+                self._file.write(b"".join(records))
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            except OSError as e:
+                self._write_failed(records, generation, start, e)
+                return
+            self.error = None
+
+    def _write_failed(
+        self,
+        records: list[bytes],
+        generation: int,
+        start: Optional[int],
+        error: OSError,
+    ) -> None:
+        """Keep the records for the next flush, without the part of them written at `start`"""
+        if self._file is not None:
+            try:
+                if start is not None:
+                    self._file.truncate(start)
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+        with self._buffer_lock:
+            if generation == self._generation:
+                self._buffer[:0] = records
+        self.error = error
+
+    def _open(self):
+        """
+        Open the log for appending.
+        A log that doesn't match the file is replaced, a torn last record is cut off.
+        """
+        _, valid_length = self._scan()
+        if valid_length:
+            log_file = open(self.path, "r+b")
+            log_file.truncate(valid_length)
+            log_file.seek(valid_length)
+            return log_file
+        log_file = open(self.path, "wb")
+        log_file.write(_HEADER.pack(MAGIC, *self._fingerprint()))
+        return log_file
+
+    def _fingerprint(self) -> tuple[int, int]:
+        stat = self.file_path.stat()
+        return stat.st_size, stat.st_mtime_ns
+
+    def close(self) -> None:
+        """Stop the flush thread and write what is left in the buffer"""
+        self._closed.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+        self.flush()
+        with self._file_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def discard(self) -> None:
+        """Drop every edit (buffered or on disk), e.g. once they are saved to the file"""
+        with self._buffer_lock:
+            self._buffer = []
+            self._generation += 1
+        with self._file_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self.path.unlink(missing_ok=True)
+
+    # ---reading--- #
+    def pending(self) -> list[Record]:
+        """
+        Edits left by a previous session that can be replayed on the file.
+        A log written for another version of the file is ignored.
+        Reading stops at the first incomplete or corrupted record (e.g. a crash during a write).
+        """
+        records, _ = self._scan()
+        return records
+
+    def _scan(self) -> tuple[list[Record], int]:
+        """Valid records of the log on disk and the length of the valid part (0 if none)"""
+        if not self.path.exists() or not self.file_path.exists():
+            return [], 0
+
+        data = self.path.read_bytes()
+        if len(data) < _HEADER.size:
+            return [], 0
+        magic, size, mtime_ns = _HEADER.unpack_from(data)
+        if magic != MAGIC or (size, mtime_ns) != self._fingerprint():
+            return [], 0
+
+        records: list[Record] = []
+        offset = _HEADER.size
+        while offset + _RECORD.size <= len(data):
+            length, crc = _RECORD.unpack_from(data, offset)
+            payload = data[offset + _RECORD.size : offset + _RECORD.size + length]
+            if len(payload) != length or zlib.crc32(payload) != crc:
+                break
+            operation, args, kwargs = json.loads(payload)
+            records.append((operation, args, kwargs))
+            offset += _RECORD.size + length
+        return records, offset
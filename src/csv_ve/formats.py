@@ -0,0 +1,308 @@
+import io
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import IO, Any, Optional, Sequence
+
+import polars as pl
+
+from .compression import (
+    COMPRESSION_SUFFIXES,
+    NATIVE_COMPRESSIONS,
+    compression_from_bytes,
+    detect_compression,
+    open_compressed,
+    open_decompressed,
+)
+from .dialect import SNIFF_SIZE, Dialect, sniff_bytes, sniff_dialect
+
+
+class FileFormat:
+    """
+    Reader/ writer of a file format, registered by extension and magic bytes.
+    Subclasses implement `scan` (lazy read) and `write`.
+    """
+
+    name: str = ""
+    extensions: tuple[str, ...] = ()
+    magic: tuple[bytes, ...] = ()
+
+    def scan(self, path: Path) -> pl.LazyFrame:
+        """Lazy read of the file: projections and filters are pushed down to the reader"""
+        raise NotImplementedError
+
+    def read(
+        self,
+        path: Path,
+        columns: Optional[Sequence[str]] = None,
+        predicate: Optional[pl.Expr] = None,
+    ) -> pl.DataFrame:
+        """Read only the given columns and the rows matching the predicate"""
+        lf = self.scan(path)
+        if predicate is not None:
+            lf = lf.filter(predicate)
+        if columns is not None:
+            lf = lf.select(columns)
+        return lf.collect()
+
+    def load(self, path: Path) -> tuple[pl.DataFrame, dict[str, Any]]:
+        """
+        Read the whole file for editing.
+
+        Returns:
+            The data and the options `write` needs to save the file the same way
+        """
+        return self.read(path), {}
+
+    def load_remote(self, stream: IO[bytes]) -> tuple[pl.DataFrame, dict[str, Any]]:
+        """
+        Read a remote file (a seekable stream of range requests, see remote.py).
+        Same return value as `load`
+        """
+        stream.seek(0)
+        return self.read_stream(stream), {}
+
+    def read_stream(self, stream: IO[bytes]) -> pl.DataFrame:
+        raise NotImplementedError
+
+    def write(self, df: pl.DataFrame, path: Path, **options: Any) -> None:
+        raise NotImplementedError
+
+
+class CSVFormat(FileFormat):
+    """
+    CSV (and TSV) files, plain or compressed.
+    The dialect (delimiter, quoting, header, encoding, line endings) is sniffed
+    from the start of the file and the file is saved back with the same one.
+    """
+
+    name = "csv"
+    extensions = (".csv", ".tsv")
+
+    def scan(self, path: Path) -> pl.LazyFrame:
+        compression = detect_compression(path)
+        dialect = sniff_dialect(path, compression)
+        if compression is not None or dialect.encoding != "utf-8":
+            return self.load(path)[0].lazy()
+        return pl.scan_csv(path, **self._read_options(dialect))
+
+    def load(self, path: Path) -> tuple[pl.DataFrame, dict[str, Any]]:
+        compression = detect_compression(path)
+        dialect = sniff_dialect(path, compression)
+        options = self._read_options(dialect)
+        if compression is None or (
+            compression in NATIVE_COMPRESSIONS and options["encoding"] == "utf8"
+        ):
+            # Polars decompresses gzip and zstd by itself
+            df = pl.read_csv(path, **options)
+        elif options["encoding"] == "utf8":
+            with open_decompressed(path, compression) as stream:
+                df = pl.read_csv(stream, **options)
+        else:
+            # Polars decodes other encodings from the raw bytes: decompress them first
+            with open_decompressed(path, compression) as stream:
+                df = self._read_decoded(stream.read(), options)
+        return df, {"compression": compression, "dialect": dialect}
+
+    def load_remote(self, stream: IO[bytes]) -> tuple[pl.DataFrame, dict[str, Any]]:
+        # only the first block is fetched to detect the compression and the dialect
+        stream.seek(0)
+        compression = compression_from_bytes(stream.read(8))
+        dialect = sniff_bytes(self._read_remote(stream, compression, SNIFF_SIZE))
+        data = self._read_remote(stream, compression)
+        df = self._read_decoded(data, self._read_options(dialect))
+        return df, {"compression": compression, "dialect": dialect}
+
+    @staticmethod
+    def _read_decoded(data: bytes, options: dict[str, Any]) -> pl.DataFrame:
+        """Read decompressed bytes, decoded to utf-8 first if they are in another encoding"""
+        if options["encoding"] != "utf8":
+            data = data.decode(options["encoding"]).encode()
+            options = {**options, "encoding": "utf8"}
+        return pl.read_csv(data, **options)
+
+    @staticmethod
+    def _read_remote(
+        stream: IO[bytes], compression: Optional[str], size: int = -1
+    ) -> bytes:
+        stream.seek(0)
+        if compression is None:
+            return stream.read(size)
+        if size < 0:
+            # the whole file in one request rather than a request per chunk of the decompressor
+            stream = io.BytesIO(stream.read())
+        with open_decompressed(stream, compression) as decompressed:
+            return decompressed.read(size)
+
+    @staticmethod
+    def _read_options(dialect: Dialect) -> dict[str, Any]:
+        encoding = dialect.encoding
+        if encoding == "utf-8":
+            encoding = "utf8"  # polars reads utf-8 natively, other encodings are decoded by python
+        elif encoding.startswith("utf-16"):
+            encoding = "utf-16"  # strips the BOM
+        return {
+            "separator": dialect.delimiter,
+            "quote_char": dialect.quote_char,
+            "has_header": dialect.has_header,
+            "encoding": encoding,
+            "infer_schema_length": 1000,
+        }
+
+    def write(
+        self,
+        df: pl.DataFrame,
+        path: Path,
+        compression: Optional[str] = None,
+        dialect: Optional[Dialect] = None,
+    ) -> None:
+        dialect = dialect or Dialect()
+        options = {
+            "separator": dialect.delimiter,
+            "quote_char": dialect.quote_char,
+            "include_header": dialect.has_header,
+            "line_terminator": dialect.line_terminator,
+        }
+        stream = (
+            open(path, "wb")
+            if compression is None
+            else open_compressed(path, compression)
+        )
+        with stream:
+            if dialect.bom:
+                stream.write("\ufeff".encode(dialect.encoding))
+            if dialect.encoding == "utf-8":
+                df.write_csv(stream, **options)
+            else:
+                stream.write(df.write_csv(**options).encode(dialect.encoding))
+
+
+class ParquetFormat(FileFormat):
+    name = "parquet"
+    extensions = (".parquet", ".pq")
+    magic = (b"PAR1",)
+
+    def scan(self, path: Path) -> pl.LazyFrame:
+        return pl.scan_parquet(path)
+
+    def read_stream(self, stream: IO[bytes]) -> pl.DataFrame:
+        return pl.read_parquet(stream)
+
+    def write(self, df: pl.DataFrame, path: Path) -> None:
+        df.write_parquet(path)
+
+
+class IPCFormat(FileFormat):
+    """Arrow IPC (Feather v2) files, Polars memory-maps them when reading local files"""
+
+    name = "ipc"
+    extensions = (".arrow", ".ipc", ".feather")
+    magic = (b"ARROW1",)
+
+    def scan(self, path: Path) -> pl.LazyFrame:
+        return pl.scan_ipc(path)
+
+    def read_stream(self, stream: IO[bytes]) -> pl.DataFrame:
+        return pl.read_ipc(stream)
+
+    def write(self, df: pl.DataFrame, path: Path) -> None:
+        df.write_ipc(path)
+
+
+class NDJSONFormat(FileFormat):
+    """Newline delimited JSON: one object per line"""
+
+    name = "ndjson"
+    extensions = (".ndjson", ".jsonl")
+    magic = (b"{",)
+
+    def scan(self, path: Path) -> pl.LazyFrame:
+        return pl.scan_ndjson(path)
+
+    def read_stream(self, stream: IO[bytes]) -> pl.DataFrame:
+        return pl.read_ndjson(stream)
+
+    def write(self, df: pl.DataFrame, path: Path) -> None:
+        df.write_ndjson(path)
+
+
+FORMATS: list[FileFormat] = []
+
+# stdin is copied to a file by chunks of this size, see spool_stream
+SPOOL_CHUNK_SIZE = 1024 * 1024
+
+
+def register_format(file_format: FileFormat) -> None:
+    """Add a format to the registry (the last registered wins for a shared extension)"""
+    FORMATS.insert(0, file_format)
+
+
+for _format in (CSVFormat(), ParquetFormat(), IPCFormat(), NDJSONFormat()):
+    register_format(_format)
+
+
+def format_for_path(path: str | Path) -> Optional[FileFormat]:
+    """
+    Format of a file from its extension (compressed CSV included),
+    or from its first bytes when the extension is unknown.
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    compressed = suffix in COMPRESSION_SUFFIXES
+    if compressed:
+        suffix = path.with_suffix("").suffix.lower()
+    for file_format in FORMATS:
+        if suffix in file_format.extensions:
+            # only CSV files can be compressed
+            if compressed and not isinstance(file_format, CSVFormat):
+                return None
+            return file_format
+
+    if not path.is_file():
+        return None
+    if detect_compression(path) is not None:
+        return next(f for f in FORMATS if isinstance(f, CSVFormat))
+    with open(path, "rb") as f:
+        head = f.read(16)
+    for file_format in FORMATS:
+        if any(head.startswith(magic) for magic in file_format.magic):
+            return file_format
+    return None
+
+
+def spool_stream(stream: IO[bytes], path: Path) -> Path:
+    """
+    Copy a stream that can only be read once (stdin) to a file, so it can be
+    sniffed, read with random access and saved like any file.
+    The format is detected from the first bytes, a text stream is read as CSV.
+
+    Returns:
+        The path of the file (`path`, with a .csv suffix for CSV data)
+    """
+    with open(path, "wb") as f:
+        shutil.copyfileobj(stream, f, SPOOL_CHUNK_SIZE)
+    if format_for_path(path) is None:
+        path = path.rename(path.with_suffix(".csv"))
+    return path
+
+
+def write_atomic(
+    file_format: FileFormat, df: pl.DataFrame, path: Path, **options: Any
+) -> None:
+    """
+    Write to a temporary file next to `path` then move it in place.
+    A crash never leaves a half written file, and memory-mapped readers of the old
+    file keep a valid mapping.
+    """
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    os.close(fd)
+    tmp_path = Path(tmp_name)
+    try:
+        file_format.write(df, tmp_path, **options)
+        if path.exists():
+            shutil.copymode(path, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
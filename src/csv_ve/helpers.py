@@ -1,9 +1,77 @@
+import csv
+import io
+import re
+
+# labels of the columns 0..n-1, extended when a wider file needs more
+_column_labels = []
+
+# spreadsheet cell address: column label then row number (ex: B12)
+CELL_ADDRESS = re.compile(r"([A-Za-z]+)\s*(\d+)")
+
+
 def col_label_spreasheet_format(index):
-    """Convert col index to spreadsheet column label (A, B, C, ... Z, AA, AB, ...)"""
-    label = ""
-    index += 1
-    while index > 0:
-        index -= 1
-        label = chr(65 + (index % 26)) + label
-        index //= 26
-    return label
+    """
+    Convert col index to spreadsheet column label (A, B, C, ... Z, AA, AB, ...).
+    Labels are cached: a label is its prefix label (computed before it) plus a letter
+    """
+    while len(_column_labels) <= index:
+        next_index = len(_column_labels)
+        prefix = _column_labels[next_index // 26 - 1] if next_index >= 26 else ""
+        _column_labels.append(prefix + chr(65 + next_index % 26))
+    return _column_labels[index]
+
+
+def is_column_label(text):
+    """True for letters only (ex: AA), not checked against the columns"""
+    return text.isascii() and text.isalpha()
+
+
+def col_index_from_label(label):
+    """Column index of a spreadsheet column label (A -> 0, Z -> 25, AA -> 26), any case"""
+    if not is_column_label(label):
+        raise ValueError(f"Invalid column label '{label}'")
+    index = 0
+    for char in label.upper():
+        index = index * 26 + ord(char) - 64
+    return index - 1
+
+
+def parse_cell_address(text):
+    """
+    0-based (row, col) of a cell address, None for a missing part:
+    B12 (spreadsheet), 12:3 (row:col), 12:B or B:12 (column label on either side), 12: or :3
+
+    Raises:
+        ValueError: If the address is invalid
+    """
+    text = text.strip()
+    match = CELL_ADDRESS.fullmatch(text)
+    if match is not None:
+        label, row = match.groups()
+        return int(row) - 1, col_index_from_label(label)
+
+    parts = text.split(":")
+    if len(parts) != 2:
+        raise ValueError("Format must be ROW:COL or A1")
+    row_part, col_part = (part.strip() for part in parts)
+    if is_column_label(row_part):  # column first: AA:3
+        row_part, col_part = col_part, row_part
+    try:
+        row = int(row_part) - 1 if row_part else None
+        if not col_part:
+            col = None
+        elif is_column_label(col_part):
+            col = col_index_from_label(col_part)
+        else:
+            col = int(col_part) - 1
+    except ValueError:
+        raise ValueError(
+            "Please enter row numbers and column numbers or letters (e.g., 12:3, B12)"
+        ) from None
+    return row, col
+
+
+def parse_tsv(text):
+    """Split tab separated text (e.g. copied from a spreadsheet) into rows of strings"""
+    rows = list(csv.reader(io.StringIO(text), delimiter="\t"))
+    return [row for row in rows if row]
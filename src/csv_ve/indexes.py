@@ -0,0 +1,482 @@
+from typing import Collection, Optional, Sequence
+
+import polars as pl
+
+
+def remove_rows(series: pl.Series, rows: Sequence[int]) -> pl.Series:
+    """Series without the values at the (sorted) indices `rows`"""
+    if isinstance(rows, range) and rows.step == 1:
+        return pl.concat([series.slice(0, rows.start), series.slice(rows.stop)])
+    kept = pl.int_range(pl.len()).is_in(list(rows)).not_()
+    return series.to_frame().filter(kept).to_series()
+
+
+class DataIndex:
+    """
+    Index derived from the data of a model, kept in sync by the model (see `CSVDataModel.add_index`).
+    Edits call the hooks below with the updated frame so an index can patch itself
+    instead of being rebuilt from the whole frame. By default every hook rebuilds the index.
+    """
+
+    # columns the index is built on (None: every column),
+    # the model drops the index when one of them is deleted
+    columns: Optional[tuple[str, ...]] = None
+    # False when the hooks only use the columns of the frame, not its values:
+    # the columns of spilled data can then change without reading it back
+    reads_values = True
+
+    def build(self, df: pl.DataFrame) -> None:
+        raise NotImplementedError
+
+    def rows_updated(
+        self, df: pl.DataFrame, start: int, stop: int, columns: Collection[str]
+    ) -> None:
+        """Values of `columns` changed in the rows start:stop"""
+        self.build(df)
+
+    def rows_inserted(self, df: pl.DataFrame, at: int, count: int) -> None:
+        """`count` rows were inserted at `at`"""
+        self.build(df)
+
+    def rows_deleted(self, df: pl.DataFrame, rows: Sequence[int]) -> None:
+        """The rows at the (sorted) indices `rows` of the previous frame were deleted"""
+        self.build(df)
+
+    def columns_changed(self, df: pl.DataFrame) -> None:
+        """Columns were added or removed (the columns of the index still exist)"""
+        self.build(df)
+
+    def estimated_size(self) -> int:
+        """Memory used by the index in bytes, estimated"""
+        return 0
+
+
+class DuplicateIndex(DataIndex):
+    """
+    Hash index of the rows, or of some columns of the rows, to find duplicates.
+    Each row is reduced to a 64-bit hash (`hash_rows`): rows with the same hash
+    are considered equal, collisions are negligible at this size.
+    The count of every hash is kept so edits only rehash the touched rows.
+    """
+
+    # concatenating patched slices adds chunks, rechunk past this count
+    MAX_CHUNKS = 64
+
+    def __init__(self, columns: Optional[Sequence[str]] = None):
+        """
+        Args:
+            columns: Key columns, None for whole rows
+        """
+        self.columns = tuple(columns) if columns is not None else None
+        self._hashes = pl.Series(dtype=pl.UInt64)  # hash of each row
+        self._counts: dict[int, int] = {}  # hash -> number of rows
+        self._duplicates: set[int] = set()  # hashes of more than one row
+
+    def _hash(self, df: pl.DataFrame) -> pl.Series:
+        keys = df if self.columns is None else df.select(self.columns)
+        return keys.hash_rows()
+
+    def _count(self, hashes: pl.Series, sign: int) -> None:
+        """Add (sign=1) or remove (sign=-1) hashes from the counts"""
+        for hash_value, count in hashes.value_counts().iter_rows():
+            total = self._counts.get(hash_value, 0) + sign * count
+            if total > 0:
+                self._counts[hash_value] = total
+            else:
+                self._counts.pop(hash_value, None)
+            if total > 1:
+                self._duplicates.add(hash_value)
+            else:
+                self._duplicates.discard(hash_value)
+
+    def _set_hashes(self, parts: list[pl.Series]) -> None:
+        hashes = pl.concat(parts)
+        if hashes.n_chunks() > self.MAX_CHUNKS:
+            hashes = hashes.rechunk()
+        self._hashes = hashes
+
+    # ---DataIndex hooks--- #
+    def build(self, df: pl.DataFrame) -> None:
+        self._hashes = self._hash(df)
+        counts = self._hashes.value_counts()
+        self._counts = dict(counts.iter_rows())
+        self._duplicates = set(
+            counts.filter(pl.col("count") > 1).to_series(0).to_list()
+        )
+
+    def rows_updated(
+        self, df: pl.DataFrame, start: int, stop: int, columns: Collection[str]
+    ) -> None:
+        if self.columns is not None and not set(columns) & set(self.columns):
+            return
+        new = self._hash(df.slice(start, stop - start))
+        self._count(self._hashes.slice(start, stop - start), -1)
+        self._count(new, 1)
+        self._set_hashes([self._hashes.slice(0, start), new, self._hashes.slice(stop)])
+
+    def rows_inserted(self, df: pl.DataFrame, at: int, count: int) -> None:
+        new = self._hash(df.slice(at, count))
+        self._count(new, 1)
+        self._set_hashes([self._hashes.slice(0, at), new, self._hashes.slice(at)])
+
+    def rows_deleted(self, df: pl.DataFrame, rows: Sequence[int]) -> None:
+        self._count(self._hashes.gather(list(rows)), -1)
+        self._set_hashes([remove_rows(self._hashes, rows)])
+
+    def columns_changed(self, df: pl.DataFrame) -> None:
+        if self.columns is None:
+            # whole row hashes depend on every column
+            self.build(df)
+
+    def estimated_size(self) -> int:
+        # python ints in a dict: about 100 bytes per entry
+        return self._hashes.estimated_size() + 100 * len(self._counts)
+
+    # ---lookups--- #
+    def is_duplicated(self, row_idx: int) -> bool:
+        """True if another row has the same key, O(1)"""
+        return self._hashes[row_idx] in self._duplicates
+
+    def duplicated(self) -> pl.Series:
+        """Boolean mask of the rows that have a duplicate"""
+        duplicates = pl.Series(list(self._duplicates), dtype=pl.UInt64)
+        return self._hashes.is_in(duplicates.implode())
+
+    def duplicate_count(self) -> int:
+        """Number of rows that have a duplicate"""
+        return sum(self._counts[hash_value] for hash_value in self._duplicates)
+
+
+class RowIds(DataIndex):
+    """
+    Stable id of each row: its index in the file when it was loaded (or saved),
+    inserted rows get new ids. A diff with the file matches rows by id even when
+    rows were inserted or deleted before them.
+    """
+
+    reads_values = False
+
+    def __init__(self):
+        self.ids = pl.Series("row_id", dtype=pl.UInt64)
+        self._next_id = 0
+
+    def build(self, df: pl.DataFrame) -> None:
+        self.ids = pl.int_range(len(df), dtype=pl.UInt64, eager=True).alias("row_id")
+        self._next_id = len(df)
+
+    def rows_updated(
+        self, df: pl.DataFrame, start: int, stop: int, columns: Collection[str]
+    ) -> None:
+        pass
+
+    def rows_inserted(self, df: pl.DataFrame, at: int, count: int) -> None:
+        new = pl.int_range(
+            self._next_id, self._next_id + count, dtype=pl.UInt64, eager=True
+        ).alias("row_id")
+        self._next_id += count
+        self.ids = pl.concat([self.ids.slice(0, at), new, self.ids.slice(at)])
+
+    def rows_deleted(self, df: pl.DataFrame, rows: Sequence[int]) -> None:
+        self.ids = remove_rows(self.ids, rows)
+
+    def columns_changed(self, df: pl.DataFrame) -> None:
+        pass
+
+    def estimated_size(self) -> int:
+        return self.ids.estimated_size()
+
+
+class CellVersions(DataIndex):
+    """
+    Edit version of each cell, for caches of what is derived from a cell (its rendering).
+    Updates give the touched cells a new version; inserts, deletes and column
+    changes move the cells, so every cell gets a new version.
+    """
+
+    reads_values = False
+    # updates of more cells (or more tracked cells) give every cell a new version
+    MAX_TRACKED_CELLS = 100_000
+
+    def __init__(self):
+        self.version = 0
+        self._base_version = 0  # version of the cells not in _cells
+        self._cells: dict[tuple[int, int], int] = {}  # (row, col) -> version
+
+    def cell_version(self, row_idx: int, col_idx: int) -> int:
+        return self._cells.get((row_idx, col_idx), self._base_version)
+
+    def _update_all(self) -> None:
+        self.version += 1
+        self._base_version = self.version
+        self._cells.clear()
+
+    # ---DataIndex hooks--- #
+    def build(self, df: pl.DataFrame) -> None:
+        self._update_all()
+
+    def rows_updated(
+        self, df: pl.DataFrame, start: int, stop: int, columns: Collection[str]
+    ) -> None:
+        if len(self._cells) + (stop - start) * len(columns) > self.MAX_TRACKED_CELLS:
+            self._update_all()
+            return
+        self.version += 1
+        col_indices = [df.get_column_index(col_name) for col_name in columns]
+        for row_idx in range(start, stop):
+            for col_idx in col_indices:
+                self._cells[(row_idx, col_idx)] = self.version
+
+    def rows_inserted(self, df: pl.DataFrame, at: int, count: int) -> None:
+        self._update_all()
+
+    def rows_deleted(self, df: pl.DataFrame, rows: Sequence[int]) -> None:
+        self._update_all()
+
+    def columns_changed(self, df: pl.DataFrame) -> None:
+        self._update_all()
+
+    def estimated_size(self) -> int:
+        # (row, col) tuple key and int version: about 200 bytes per cell
+        return 200 * len(self._cells)
+
+
+class ColorBins(DataIndex):
+    """
+    Color bin of each value of a column, for a heatmap: bin 0 for missing (null or
+    non-numeric) values, bins 1..bin_count from the lowest to the highest values.
+    The bin edges are quantiles of the column (or fixed thresholds), computed once;
+    the bins are a UInt8 series aligned to the rows so the table only looks up the
+    visible rows. Edits only bin the touched rows again, the quantiles are computed
+    again once a share of the rows changed.
+    """
+
+    BIN_COUNT = 8
+    # share of the rows edited since the quantiles were computed before computing them again
+    REBIN_SHARE = 0.1
+    # concatenating patched slices adds chunks, rechunk past this count
+    MAX_CHUNKS = 64
+
+    def __init__(
+        self,
+        column: str,
+        bin_count: int = BIN_COUNT,
+        thresholds: Optional[Sequence[float]] = None,
+    ):
+        """
+        Args:
+            column: Column to bin
+            bin_count: Number of quantile bins (at most 255)
+            thresholds: Fixed bin edges instead of quantiles, gives len(thresholds) + 1 bins
+        """
+        if not 0 < bin_count < 256:
+            raise ValueError(f"Invalid bin count: {bin_count}")
+        self.columns = (column,)
+        self.thresholds = sorted(thresholds) if thresholds is not None else None
+        self.bin_count = len(self.thresholds) + 1 if self.thresholds else bin_count
+        self.edges: list[float] = []
+        self.bins = pl.Series(column, dtype=pl.UInt8)
+        self._edited_rows = 0  # since the edges were computed
+
+    @property
+    def _values(self) -> pl.Expr:
+        return pl.col(self.columns[0]).cast(pl.Float64, strict=False)
+
+    def _bin(self, df: pl.DataFrame) -> pl.Series:
+        """Bins of the rows of `df`, vectorized: 1 + number of edges below the value"""
+        values = self._values
+        above = [values > edge for edge in self.edges]
+        bins = (pl.sum_horizontal(above) if above else pl.lit(0)) + 1
+        return df.select(
+            pl.when(values.is_null() | values.is_nan())
+            .then(0)
+            .otherwise(bins)
+            .cast(pl.UInt8)
+            .alias(self.columns[0])
+        ).to_series()
+
+    def _set_bins(self, parts: list[pl.Series]) -> None:
+        bins = pl.concat(parts)
+        if bins.n_chunks() > self.MAX_CHUNKS:
+            bins = bins.rechunk()
+        self.bins = bins
+
+    def _count_edits(self, df: pl.DataFrame, count: int) -> bool:
+        """Count edited rows, True (and the bins are rebuilt) past REBIN_SHARE of the rows"""
+        self._edited_rows += count
+        if self.thresholds is None and self._edited_rows > self.REBIN_SHARE * len(df):
+            self.build(df)
+            return True
+        return False
+
+    # ---DataIndex hooks--- #
+    def build(self, df: pl.DataFrame) -> None:
+        if self.thresholds is not None:
+            self.edges = list(self.thresholds)
+        else:
+            values = self._values
+            quantiles = df.select(
+                values.quantile(i / self.bin_count).alias(str(i))
+                for i in range(1, self.bin_count)
+            ).row(0)
+            # equal quantiles (few distinct values) would give empty bins
+            self.edges = sorted({q for q in quantiles if q is not None})
+        self.bins = self._bin(df)
+        self._edited_rows = 0
+
+    def rows_updated(
+        self, df: pl.DataFrame, start: int, stop: int, columns: Collection[str]
+    ) -> None:
+        if self.columns[0] not in columns or self._count_edits(df, stop - start):
+            return
+        new = self._bin(df.slice(start, stop - start))
+        self._set_bins([self.bins.slice(0, start), new, self.bins.slice(stop)])
+
+    def rows_inserted(self, df: pl.DataFrame, at: int, count: int) -> None:
+        if self._count_edits(df, count):
+            return
+        new = self._bin(df.slice(at, count))
+        self._set_bins([self.bins.slice(0, at), new, self.bins.slice(at)])
+
+    def rows_deleted(self, df: pl.DataFrame, rows: Sequence[int]) -> None:
+        if self._count_edits(df, len(rows)):
+            return
+        self._set_bins([remove_rows(self.bins, rows)])
+
+    def columns_changed(self, df: pl.DataFrame) -> None:
+        pass
+
+    def estimated_size(self) -> int:
+        return self.bins.estimated_size()
+
+    # ---lookups--- #
+    @property
+    def highest_bin(self) -> int:
+        """Bin of the highest values, below bin_count if quantiles were equal"""
+        return len(self.edges) + 1
+
+    def bin(self, row_idx: int) -> int:
+        """Bin of a row, 0 for a missing value, O(1)"""
+        return self.bins[row_idx]
+
+    def is_numeric(self) -> bool:
+        """True if the column has at least one numeric value"""
+        return bool((self.bins > 0).any())
+
+
+class ValueIndex(DataIndex):
+    """
+    Hash index of the values of a column, to find the rows with a value
+    (ex: jump to `order_id=98123`) in O(log n) instead of scanning the column.
+    Each value is reduced to a 64-bit hash (like `DuplicateIndex`), kept with its row
+    and sorted by hash: sorting hashes is much faster than sorting strings.
+    Missing values are not indexed.
+    Edits filter out the entries of the touched rows and splice the new ones in at their
+    sorted position (found by binary search), or merge them when there are many,
+    inserts and deletes shift the rows: the column is not sorted again.
+    """
+
+    # updates of more than this share of the rows sort the whole column again
+    REBUILD_SHARE = 0.25
+    # more new entries than this are merged with the others instead of spliced one by one
+    MAX_SPLICES = 1000
+    # splicing slices adds chunks, rechunk past this count
+    MAX_CHUNKS = 64
+
+    def __init__(self, column: str):
+        """
+        Args:
+            column: Column to index
+        """
+        self.columns = (column,)
+        self.dtype: pl.DataType = pl.Null()  # of the column, to hash looked up values
+        self.entries = pl.DataFrame(schema={"hash": pl.UInt64, "row": pl.UInt32})
+
+    def _entries(self, df: pl.DataFrame, start: int, stop: int) -> pl.DataFrame:
+        """Entries of the rows start:stop, sorted by hash"""
+        values = df.get_column(self.columns[0]).slice(start, stop - start)
+        return (
+            pl.DataFrame(
+                {
+                    "hash": values.hash(),
+                    "row": pl.int_range(start, stop, dtype=pl.UInt32, eager=True),
+                }
+            )
+            .filter(values.is_not_null())
+            .sort("hash")
+        )
+
+    def _splice(self, removed: pl.Expr, new: pl.DataFrame) -> None:
+        """Remove the entries where `removed` is true and add the sorted `new` entries"""
+        entries = self.entries.filter(~removed)  # keeps the order
+
+        if new.height > self.MAX_SPLICES:
+            entries = entries.merge_sorted(new, "hash")
+        elif not new.is_empty():
+            hashes = entries.get_column("hash")
+            insert_at = hashes.search_sorted(new.get_column("hash"), "left")
+            parts, previous = [], 0
+            for i, position in enumerate(insert_at.to_list()):
+                parts += [entries.slice(previous, position - previous), new.slice(i, 1)]
+                previous = position
+            parts.append(entries.slice(previous))
+            entries = pl.concat(parts)
+        if entries.n_chunks() > self.MAX_CHUNKS:
+            entries = entries.rechunk()
+        self.entries = entries
+
+    # ---DataIndex hooks--- #
+    def build(self, df: pl.DataFrame) -> None:
+        self.dtype = df.schema[self.columns[0]]
+        self.entries = self._entries(df, 0, len(df))
+
+    def rows_updated(
+        self, df: pl.DataFrame, start: int, stop: int, columns: Collection[str]
+    ) -> None:
+        if self.columns[0] not in columns:
+            return
+        if stop - start > self.REBUILD_SHARE * len(df):
+            # also when the column changed type
+            self.build(df)
+            return
+        self._splice(
+            pl.col("row").is_between(start, stop - 1), self._entries(df, start, stop)
+        )
+
+    def rows_inserted(self, df: pl.DataFrame, at: int, count: int) -> None:
+        row = pl.col("row")
+        self.entries = self.entries.with_columns(
+            pl.when(row >= at).then(row + count).otherwise(row).alias("row")
+        )
+        self._splice(pl.lit(False), self._entries(df, at, at + count))
+
+    def rows_deleted(self, df: pl.DataFrame, rows: Sequence[int]) -> None:
+        deleted = pl.Series(list(rows), dtype=pl.UInt32)
+        kept = self.entries.filter(~pl.col("row").is_in(deleted.implode()))
+        # a row moves up by the number of deleted rows before it
+        kept_rows = kept.get_column("row")
+        self.entries = kept.with_columns(
+            (kept_rows - deleted.search_sorted(kept_rows)).alias("row")
+        )
+
+    def columns_changed(self, df: pl.DataFrame) -> None:
+        pass
+
+    def estimated_size(self) -> int:
+        return self.entries.estimated_size()
+
+    # ---lookups--- #
+    def rows(self, value: object) -> pl.Series:
+        """Rows with the value in increasing order, O(log n) plus the matches"""
+        value_hash = pl.Series([value], dtype=self.dtype).hash()[0]
+        hashes = self.entries.get_column("hash")
+        start = hashes.search_sorted(value_hash, "left")
+        stop = hashes.search_sorted(value_hash, "right")
+        return self.entries.get_column("row").slice(start, stop - start).sort()
+
+    def next_row(self, value: object, after: int = -1) -> Optional[int]:
+        """First row with the value after the row `after`, from the top past the last one"""
+        rows = self.rows(value)
+        if rows.is_empty():
+            return None
+        position = rows.search_sorted(after, "right")
+        return rows[position if position < len(rows) else 0]
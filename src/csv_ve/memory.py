@@ -0,0 +1,157 @@
+import re
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from .data_model import CSVDataModel
+
+DEFAULT_MEMORY_BUDGET = 2 * 1024**3  # bytes
+
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
+
+def parse_size(text: str) -> int:
+    """
+    Bytes of a size like '512M', '2G' or '1.5GB' (powers of 1024)
+
+    Raises:
+        ValueError: If the size is invalid
+    """
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)I?B?\s*", text.upper())
+    if match is None:
+        raise ValueError(f"Invalid size '{text}' (ex: 512M, 2G)")
+    number, unit = match.groups()
+    return int(float(number) * SIZE_UNITS[unit])
+
+
+def format_size(size: int) -> str:
+    """Short human readable size: 12.3 MB"""
+    value = float(size)
+    for unit in ("B", "KB", "MB", "GB"):
+        if value < 1024:
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} TB"
+
+
+@dataclass
+class MemoryUsage:
+    """Estimated memory of the open files, in bytes"""
+
+    data: int = 0  # frames in memory
+    indexes: int = 0  # indexes kept up to date by the edits (row windows included)
+    undo: int = 0  # old values kept to undo the last edit
+    caches: int = 0  # rendered cells of the table
+
+    @property
+    def total(self) -> int:
+        return self.data + self.indexes + self.undo + self.caches
+
+
+class MemoryBudget:
+    """
+    Memory budget shared by the files open in one app.
+    When the data of the open files uses more than `max_bytes`, the least recently
+    used files (never the active one) are spilled to disk, see `CSVDataModel.spill`.
+    A spilled file is read back in memory when it becomes active again.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MEMORY_BUDGET,
+        spill_dir: Optional[str | Path] = None,
+    ):
+        self.max_bytes = max_bytes
+        self._spill_dir = Path(spill_dir) if spill_dir is not None else None
+        self._owns_spill_dir = spill_dir is None
+        # least recently used first, the active model is the last one
+        self._models: list[CSVDataModel] = []
+
+    @property
+    def spill_dir(self) -> Path:
+        """Directory of the spill files, a temporary one is created on first use"""
+        if self._spill_dir is None:
+            self._spill_dir = Path(tempfile.mkdtemp(prefix="csv-ve-"))
+        return self._spill_dir
+
+    def used(self) -> int:
+        """Memory used by the data of all the models, in bytes"""
+        return sum(model.estimated_size() for model in self._models)
+
+    def usage(self, caches: int = 0) -> MemoryUsage:
+        """Memory used by the models (data, indexes and undo journals), plus `caches`"""
+        return MemoryUsage(
+            data=self.used(),
+            indexes=sum(model.index_size() for model in self._models),
+            undo=sum(model.undo_size() for model in self._models),
+            caches=caches,
+        )
+
+    def add(self, model: CSVDataModel) -> None:
+        """Track a model, it becomes the most recently used one"""
+        if model in self._models:
+            self._models.remove(model)
+        self._models.append(model)
+        self.enforce()
+
+    def remove(self, model: CSVDataModel) -> None:
+        self._models.remove(model)
+
+    def activate(self, model: CSVDataModel) -> None:
+        """The model is shown: read it back in memory if needed and spill others"""
+        self.add(model)
+        model.rehydrate()
+        self.enforce()
+
+    def enforce(self) -> list[CSVDataModel]:
+        """
+        Spill the least recently used models until the budget is met.
+
+        Returns:
+            The spilled models
+        """
+        spilled = []
+        used = self.used()
+        for model in self._models[:-1]:
+            if used <= self.max_bytes:
+                break
+            size = model.estimated_size()
+            if size:
+                model.spill(self.spill_dir)
+                used -= size
+                spilled.append(model)
+        return spilled
+
+    def degrade(self, caches: int = 0) -> list[str]:
+        """
+        When the budget is still exceeded with the inactive files on disk (see `enforce`):
+        drop the undo journals, then spill the active file too. Its rows are then read
+        from the spill file by windows (lazy mode) until it's edited.
+
+        Args:
+            caches: Memory of the caches outside of the models (the table)
+
+        Returns:
+            What was done, for the user
+        """
+        done = []
+        if self.usage(caches).total > self.max_bytes and any(
+            model.undo_size() for model in self._models
+        ):
+            for model in self._models:
+                model.drop_undo()
+            done.append("undo history dropped")
+        if self.usage(caches).total > self.max_bytes and self._models:
+            active = self._models[-1]
+            if active.estimated_size():
+                active.spill(self.spill_dir)
+                done.append(f"{active.file_path.name} read from disk (lazy mode)")
+        return done
+
+    def close(self) -> None:
+        """Remove the temporary spill directory"""
+        if self._owns_spill_dir and self._spill_dir is not None:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
@@ -0,0 +1,193 @@
+import io
+import os
+import urllib.request
+from pathlib import PurePosixPath
+from typing import Optional
+from urllib.parse import urlparse
+
+REMOTE_SCHEMES = ("http", "https", "s3")
+
+
+def is_url(path: object) -> bool:
+    """True for the remote files csv-ve can open: http(s):// and s3:// URLs"""
+    return isinstance(path, str) and urlparse(path).scheme in REMOTE_SCHEMES
+
+
+def url_path(url: str) -> PurePosixPath:
+    """Path part of a URL, for its name and extension (ex: 'data.csv.gz')"""
+    return PurePosixPath(urlparse(url).path)
+
+
+def http_url(url: str) -> str:
+    """
+    HTTP(S) URL of a file. s3://bucket/key URLs use the endpoint of
+    AWS_ENDPOINT_URL_S3 or AWS_ENDPOINT_URL (S3-compatible stores, path-style),
+    else the public AWS endpoint. Requests are not signed: public buckets only.
+    """
+    parsed = urlparse(url)
+    if parsed.scheme != "s3":
+        return url
+    endpoint = os.environ.get("AWS_ENDPOINT_URL_S3") or os.environ.get(
+        "AWS_ENDPOINT_URL"
+    )
+    if endpoint:
+        return f"{endpoint.rstrip('/')}/{parsed.netloc}{parsed.path}"
+    return f"https://{parsed.netloc}.s3.amazonaws.com{parsed.path}"
+
+
+class RemoteFile(io.RawIOBase):
+    """
+    Read-only, seekable binary stream over a remote file, read with HTTP range requests.
+
+    Small reads (the first bytes for the dialect, the footer of a Parquet file, the
+    chunks of a decompressor) fetch a block, kept until a read needs another one.
+    Larger reads fetch their range straight into the buffer of the caller.
+    Polars reads file objects whole: opening a remote file downloads all of it,
+    the ranges only keep the detection of its format and dialect small.
+    """
+
+    BLOCK_SIZE = 1024 * 1024
+
+    def __init__(self, url: str, block_size: int = BLOCK_SIZE, timeout: float = 30):
+        """
+        Args:
+            url: http(s):// or s3:// URL
+            block_size: Size of the range request of a small read, in bytes
+            timeout: Timeout of a request, in seconds
+        """
+        super().__init__()
+        self.url = url
+        self.name = url
+        self.block_size = block_size
+        self.timeout = timeout
+        self.requests = 0  # number of range requests
+
+        self._http_url = http_url(url)
+        self._block: Optional[tuple[int, bytes]] = (
+            None  # (start, bytes) of the last block
+        )
+        self._pos = 0
+        self.size, self.etag = self._head()
+
+    def _head(self) -> tuple[int, str]:
+        """Size and version (ETag or Last-Modified) of the file"""
+        request = urllib.request.Request(self._http_url, method="HEAD")
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            size = response.headers.get("Content-Length")
+            if size is None:
+                raise OSError(f"Unknown size of the remote file: {self.url}")
+            etag = response.headers.get("ETag") or response.headers.get(
+                "Last-Modified", ""
+            )
+        return int(size), etag
+
+    def refresh(self) -> bool:
+        """
+        Check the remote file again, the buffered block is dropped if it changed.
+
+        Returns:
+            True if the file changed
+        """
+        size, etag = self._head()
+        if (size, etag) == (self.size, self.etag):
+            return False
+        self._block = None
+        self.size, self.etag = size, etag
+        return True
+
+    # ---range requests--- #
+    def _request(self, start: int, end: int) -> urllib.request.Request:
+        """Request of the bytes start:end (end exclusive)"""
+        self.requests += 1
+        return urllib.request.Request(
+            self._http_url, headers={"Range": f"bytes={start}-{end - 1}"}
+        )
+
+    def _fetch(self, start: int, end: int) -> bytes:
+        with urllib.request.urlopen(
+            self._request(start, end), timeout=self.timeout
+        ) as response:
+            data = response.read()
+            if response.status != 206:
+                # the server ignored the range and sent the whole file
+                data = data[start:end]
+        return data
+
+    def _fetch_into(self, view: memoryview) -> int:
+        """Fetch the bytes at the position straight into `view`"""
+        end = min(self._pos + len(view), self.size)
+        with urllib.request.urlopen(
+            self._request(self._pos, end), timeout=self.timeout
+        ) as response:
+            if response.status != 206:
+                data = response.read()[self._pos : end]
+                view[: len(data)] = data
+                return len(data)
+            count = 0
+            while count < end - self._pos:
+                read = response.readinto(view[count : end - self._pos])
+                if not read:
+                    break
+                count += read
+        return count
+
+    # ---io.RawIOBase--- #
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        elif whence == io.SEEK_END:
+            self._pos = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if self._pos < 0:
+            raise ValueError("Negative seek position")
+        return self._pos
+
+    def readinto(self, buffer: bytearray | memoryview) -> int:  # type: ignore[override]
+        """Fill the buffer up to the end of the file"""
+        view = memoryview(buffer).cast("B")
+        if not view or self._pos >= self.size:
+            return 0
+        if len(view) >= self.block_size:
+            count = self._fetch_into(view)
+            self._pos += count
+            return count
+
+        count = 0
+        while count < len(view) and self._pos < self.size:
+            if self._block is None or not (
+                self._block[0] <= self._pos < self._block[0] + len(self._block[1])
+            ):
+                start = self._pos - self._pos % self.block_size
+                end = min(start + self.block_size, self.size)
+                self._block = (start, self._fetch(start, end))
+            start, data = self._block
+            offset = self._pos - start
+            size = min(len(view) - count, len(data) - offset)
+            view[count : count + size] = data[offset : offset + size]
+            self._pos += size
+            count += size
+        return count
+
+    def readall(self) -> bytes:
+        """The rest of the file in one range request, without a copy"""
+        if self._pos >= self.size:
+            return b""
+        data = self._fetch(self._pos, self.size)
+        self._pos += len(data)
+        return data
+
+    def close(self) -> None:
+        self._block = None
+        super().close()
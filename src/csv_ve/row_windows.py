@@ -0,0 +1,224 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from math import ceil
+from typing import Callable, Collection, Sequence
+
+import polars as pl
+
+from .indexes import DataIndex
+
+# Read rows start:stop of the data as tuples
+RowFetcher = Callable[[int, int], list[tuple]]
+
+
+class RowWindows(DataIndex):
+    """
+    Rows of the data read on demand by fixed-size windows, kept in an LRU cache.
+
+    The table reads its visible rows from here instead of holding every cell.
+    `visit` is called with the row under the cursor (or at the top of the
+    viewport): it estimates the direction and speed of the scroll and reads the
+    next windows in a background thread, so scrolling doesn't wait on the data
+    at window boundaries.
+    Added to the indexes of the model, the edits drop the windows of the rows they change
+    (ex: computed columns evaluated again after an edit of another column).
+    """
+
+    WINDOW_SIZE = 500
+    MAX_WINDOWS = 32
+    # windows read ahead of the scroll, at most
+    MAX_READ_AHEAD = 4
+    # seconds of scrolling at the current speed to read ahead
+    LOOKAHEAD = 1.0
+
+    def __init__(
+        self,
+        fetch: RowFetcher,
+        row_count: int,
+        window_size: int = WINDOW_SIZE,
+        max_windows: int = MAX_WINDOWS,
+        max_read_ahead: int = MAX_READ_AHEAD,
+    ):
+        """
+        Args:
+            fetch: Reads the rows start:stop, called from a background thread too
+            row_count: Number of rows of the data
+            window_size: Rows per window
+            max_windows: Windows kept in the cache
+            max_read_ahead: Windows read ahead of the scroll, at most
+        """
+        self.fetch = fetch
+        self.row_count = row_count
+        self.window_size = window_size
+        self.max_read_ahead = min(max_read_ahead, max_windows - 1)
+        self.max_windows = max_windows
+        self.misses = 0  # windows read while the table waited for them
+
+        self._windows: OrderedDict[int, list[tuple]] = OrderedDict()
+        # window -> (generation, read in the background)
+        self._pending: dict[int, tuple[int, Future[list[tuple]]]] = {}
+        # bumped by invalidate: windows read before are dropped
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="csv-ve-rows")
+        # scroll tracking
+        self._last_row = 0
+        self._last_time = time.monotonic()
+        self._velocity = 0.0  # rows per second, negative when scrolling up
+
+    @property
+    def window_count(self) -> int:
+        return -(-self.row_count // self.window_size)
+
+    def row(self, row_idx: int) -> tuple:
+        """Values of a row, read with its window if not cached"""
+        window = row_idx // self.window_size
+        return self._window(window)[row_idx - window * self.window_size]
+
+    def _window(self, window: int) -> list[tuple]:
+        with self._lock:
+            rows = self._windows.get(window)
+            if rows is not None:
+                self._windows.move_to_end(window)
+                return rows
+            pending = self._pending.get(window)
+            generation = self._generation
+        if pending is not None and pending[0] == generation:
+            wait([pending[1]])
+            if not pending[1].cancelled() and pending[1].exception() is None:
+                rows = pending[1].result()
+                self._store(window, generation, rows)
+                return rows
+        # not read ahead (or invalidated meanwhile)
+        self.misses += 1
+        rows = self._read(window)
+        self._store(window, generation, rows)
+        return rows
+
+    def _read(self, window: int) -> list[tuple]:
+        start = window * self.window_size
+        return self.fetch(start, min(start + self.window_size, self.row_count))
+
+    def _store(self, window: int, generation: int, rows: list[tuple]) -> None:
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._windows[window] = rows
+            self._windows.move_to_end(window)
+            while len(self._windows) > self.max_windows:
+                self._windows.popitem(last=False)
+
+    def prefetch(self, window: int) -> None:
+        """Read a window in the background, if it's not cached or being read"""
+        if not 0 <= window < self.window_count:
+            return
+        with self._lock:
+            if window in self._windows or window in self._pending:
+                return
+            generation = self._generation
+            future = self._executor.submit(self._read, window)
+            self._pending[window] = (generation, future)
+
+        def done(future: Future[list[tuple]]) -> None:
+            if not future.cancelled() and future.exception() is None:
+                self._store(window, generation, future.result())
+            with self._lock:
+                if self._pending.get(window, (0, None))[1] is future:
+                    del self._pending[window]
+
+        future.add_done_callback(done)
+
+    def visit(self, row_idx: int) -> None:
+        """
+        The table shows `row_idx`: read ahead the windows the scroll is heading to.
+        A jump (ex: to the top or the bottom) reads the windows around the row.
+        """
+        now = time.monotonic()
+        delta = row_idx - self._last_row
+        elapsed = max(now - self._last_time, 1e-3)
+        self._last_row, self._last_time = row_idx, now
+        window = row_idx // self.window_size
+
+        if abs(delta) > self.window_size:
+            self._velocity = 0.0
+            self.prefetch(window - 1)
+            self.prefetch(window + 1)
+            return
+        if delta:
+            # smooth out key repeat jitter
+            self._velocity = 0.5 * self._velocity + 0.5 * delta / elapsed
+        if not self._velocity:
+            return
+        direction = 1 if self._velocity > 0 else -1
+        ahead = ceil(abs(self._velocity) * self.LOOKAHEAD / self.window_size)
+        for offset in range(1, min(max(ahead, 1), self.max_read_ahead) + 1):
+            self.prefetch(window + direction * offset)
+
+    def invalidate(self, start: int = 0, stop: int | None = None) -> None:
+        """Drop the cached windows of the rows start:stop (every row by default)"""
+        stop = self.row_count if stop is None else stop
+        first, last = start // self.window_size, (stop - 1) // self.window_size
+        with self._lock:
+            self._generation += 1
+            for window in range(first, last + 1):
+                self._windows.pop(window, None)
+            for window in [w for w in self._pending if first <= w <= last]:
+                self._pending.pop(window)[1].cancel()
+
+    # ---DataIndex hooks--- #
+    def build(self, df: pl.DataFrame) -> None:
+        self.invalidate()
+        self.row_count = len(df)
+
+    def rows_updated(
+        self, df: pl.DataFrame, start: int, stop: int, columns: Collection[str]
+    ) -> None:
+        self.invalidate(start, stop)
+
+    def rows_inserted(self, df: pl.DataFrame, at: int, count: int) -> None:
+        # the rows move: the table loads new windows
+        self.invalidate()
+        self.row_count = len(df)
+
+    def rows_deleted(self, df: pl.DataFrame, rows: Sequence[int]) -> None:
+        self.invalidate()
+        self.row_count = len(df)
+
+    def columns_changed(self, df: pl.DataFrame) -> None:
+        self.invalidate()
+
+    def estimated_size(self) -> int:
+        """Memory of the cached rows in bytes, estimated from the first row of each window"""
+        with self._lock:
+            windows = list(self._windows.values())
+        return sum(
+            len(rows) * (sys.getsizeof(rows[0]) + sum(map(sys.getsizeof, rows[0])))
+            for rows in windows
+            if rows
+        )
+
+    def shrink(self, max_windows: int) -> None:
+        """Keep fewer windows in the cache (at least the ones read ahead)"""
+        with self._lock:
+            self.max_windows = max(max_windows, self.max_read_ahead + 1)
+            while len(self._windows) > self.max_windows:
+                self._windows.popitem(last=False)
+
+    def cached_windows(self) -> list[int]:
+        """Indices of the cached windows, least recently used first"""
+        with self._lock:
+            return list(self._windows)
+
+    def wait(self) -> None:
+        """Wait for the windows being read ahead"""
+        with self._lock:
+            pending = [future for _, future in self._pending.values()]
+        wait(pending)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            self._windows.clear()
@@ -0,0 +1,47 @@
+from typing import Callable, Optional
+
+from textual.app import ComposeResult
+from textual.binding import Binding
+from textual.screen import ModalScreen
+from textual.widgets import Input, Static
+
+
+class ColumnInputScreen(ModalScreen[bool]):
+    """
+    Modal screen with one input to change the columns (computed column, column type).
+    `submit` applies the value and returns an error message, or None if it was applied:
+    the screen closes with True, or stays open with the error.
+    """
+
+    CSS_PATH = "screen.tcss"
+    BINDINGS = [
+        Binding("escape", "dismiss(False)", "Cancel", show=False),
+    ]
+
+    def __init__(
+        self, title: str, placeholder: str, submit: Callable[[str], Optional[str]]
+    ):
+        super().__init__()
+        self.input_title = title
+        self.placeholder = placeholder
+        self.submit = submit
+
+    def compose(self) -> ComposeResult:
+        yield Input(placeholder=self.placeholder, id="column_input")
+        yield Static("", id="column_error")
+
+    def on_mount(self) -> None:
+        column_input = self.query_one("#column_input", Input)
+        column_input.border_title = self.input_title
+        column_input.focus()
+
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        value = event.value.strip()
+        if not value:
+            self.dismiss(False)
+            return
+        error = self.submit(value)
+        if error is not None:
+            self.query_one("#column_error", Static).update(error)
+            return
+        self.dismiss(True)
@@ -0,0 +1,101 @@
+from typing import Callable, Literal
+
+import polars as pl
+from textual import work
+from textual.app import ComposeResult
+from textual.binding import Binding
+from textual.containers import Vertical
+from textual.screen import ModalScreen
+from textual.widgets import DataTable, Static
+
+from ..diff import Diff
+from ..widgets.result_table import ResultTable
+
+
+def diff_table(diff: Diff) -> pl.DataFrame:
+    """Rows of a diff for display: 1-based row numbers, changed columns as text"""
+    return diff.rows.with_columns(
+        (pl.col("old_row") + 1).alias("old_row"),
+        (pl.col("new_row") + 1).alias("new_row"),
+        pl.col("changed_columns").list.join(", "),
+    )
+
+
+class DiffScreen(ModalScreen[int | Literal["save"] | None]):
+    """
+    Modal screen with the changes between two versions of a file.
+    For the diff of an open file with the file on disk (editable), enter on a row
+    closes the screen with its row index, ctrl+s with "save".
+    """
+
+    CSS_PATH = "screen.tcss"
+    BINDINGS = [
+        Binding("escape", "dismiss(None)", "Close", show=False),
+        Binding("ctrl+s", "dismiss('save')", "Save", show=True),
+    ]
+
+    def __init__(
+        self, title: str, compute_diff: Callable[[], Diff], editable: bool = True
+    ):
+        """
+        Args:
+            title: Border title of the dialog
+            compute_diff: Computes the diff, called in a worker thread
+            editable: False for a read-only diff (no jump to a row, no save)
+        """
+        super().__init__()
+        self.dialog_title = title
+        self.compute_diff = compute_diff
+        self.editable = editable
+        self.diff: Diff | None = None
+
+    def compose(self) -> ComposeResult:
+        with Vertical(id="diff_dialog"):
+            yield Static("Comparing with the file on disk...", id="diff_status")
+            yield ResultTable(id="diff_result", cursor_type="row")
+
+    def on_mount(self) -> None:
+        self.query_one("#diff_dialog").border_title = self.dialog_title
+        self._compute_diff()
+
+    def check_action(self, action: str, parameters: tuple[object, ...]) -> bool | None:
+        if action == "dismiss" and parameters == ("save",):
+            return self.editable
+        return True
+
+    @work(thread=True, exclusive=True, group="diff")
+    def _compute_diff(self) -> None:
+        try:
+            diff = self.compute_diff()
+        except Exception as e:
+            self.app.call_from_thread(self._set_status, f"Diff failed: {e}", True)
+            return
+        self.app.call_from_thread(self._show_diff, diff)
+
+    def _show_diff(self, diff: Diff) -> None:
+        self.diff = diff
+        if diff.is_empty():
+            self._set_status("No changes")
+            return
+        status = diff.summary()
+        if diff.added_columns:
+            status += f"\nAdded columns: {', '.join(diff.added_columns)}"
+        if diff.deleted_columns:
+            status += f"\nDeleted columns: {', '.join(diff.deleted_columns)}"
+        self._set_status(status)
+        table = self.query_one(ResultTable)
+        table.show_result(diff_table(diff))
+        table.focus()
+
+    def on_data_table_row_selected(self, event: DataTable.RowSelected) -> None:
+        """Close the screen with the row of the selected change (deleted rows have none)"""
+        if self.diff is None or not self.editable:
+            return
+        new_row = self.diff.new_row(event.cursor_row)
+        if new_row is not None:
+            self.dismiss(new_row)
+
+    def _set_status(self, message: str, error: bool = False) -> None:
+        status = self.query_one("#diff_status", Static)
+        status.set_class(error, "error")
+        status.update(message)
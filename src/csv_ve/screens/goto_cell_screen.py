@@ -1,31 +1,65 @@
+from typing import Callable, Optional
+
 from textual.app import ComposeResult
 from textual.binding import Binding
 from textual.screen import ModalScreen
 from textual.widgets import Input, Static
 
+from ..helpers import col_label_spreasheet_format, parse_cell_address
+
+
+# (column name, value) -> (row, col) of the next row with the value, None if no row has it
+FindFunction = Callable[[str, str], Optional[tuple[int, int]]]
+
 
 class CoordInputScreen(ModalScreen[tuple[int, int] | None]):
-    """Modal screen for navigating to a specific cell."""
+    """
+    Modal screen for navigating to a specific cell (row:col, or spreadsheet address: B12),
+    or to the next row with a value in a column (column=value) with `find`.
+    """
 
     CSS_PATH = "screen.tcss"
     BINDINGS = [
         Binding("escape", "dismiss(None)", "Cancel", show=False),
     ]
 
-    def __init__(self, max_row: int, max_col: int):
+    def __init__(
+        self,
+        max_row: int,
+        max_col: int,
+        find: Optional[FindFunction] = None,
+        value: str = "",
+    ):
+        """
+        Args:
+            max_row: Number of rows
+            max_col: Number of columns
+            find: Finds the next row with a value in a column, None to only go to cells
+            value: Initial input (ex: the last column=value to find the next row)
+        """
         super().__init__()
         self.max_row = max_row
         self.max_col = max_col
+        self.find = find
+        self.value = value
 
     def compose(self) -> ComposeResult:
         """only Input widget and its border"""
-        yield Input(placeholder="row:col", id="coord_input", classes="input_rowcol")
+        yield Input(
+            self.value,
+            placeholder="row:col, A1"
+            if self.find is None
+            else "row:col, A1 or column=value",
+            id="coord_input",
+            classes="input_rowcol",
+        )
         yield Static("", id="error_message")
 
     def on_mount(self) -> None:
         """Focus the coordinate input when mounted."""
         input = self.query_one("#coord_input", Input).focus()
-        input.border_subtitle = f"(1-{self.max_row}:1-{self.max_col})"
+        last_label = col_label_spreasheet_format(max(self.max_col - 1, 0))
+        input.border_subtitle = f"(1-{self.max_row}:1-{self.max_col} or A-{last_label})"
 
     def on_input_submitted(self, event: Input.Submitted) -> None:
         """Handle Enter key - validate and navigate."""
@@ -42,38 +76,48 @@ class CoordInputScreen(ModalScreen[tuple[int, int] | None]):
             self.dismiss(None)
             return
 
-        # Parse the input
-        if ":" not in value:
-            error_msg.update("Format must be ROW:COL")
+        if "=" in value and self.find is not None:
+            self.find_and_navigate(value)
+            return
+
+        # Parse the input: 12:3, B12, 12:B or AA:3
+        # DataTable indexes starts at 0, the parser substracts 1 to be consistent with the rows index (start at 1)
+        try:
+            row, col = parse_cell_address(value)
+        except ValueError as e:
+            error_msg.update(str(e))
+            return
+
+        # Validate that at least one is provided
+        if row is None and col is None:
+            error_msg.update("Please enter at least row or column")
+            return
+
+        # Validate ranges
+        if row is not None and (row < 0 or row > self.max_row):
+            error_msg.update(f"Row must be between 1 and {self.max_row}")
             return
 
-        parts = value.split(":")
-        if len(parts) != 2:
-            error_msg.update("Format must be ROW:COL")
+        if col is not None and (col < 0 or col > self.max_col):
+            error_msg.update(f"Column must be between 1 and {self.max_col}")
             return
 
+        # Valid input - dismiss with coordinates
+        self.dismiss((row, col))
+
+    def find_and_navigate(self, value: str) -> None:
+        """Go to the next row with the value in the column (column=value)"""
+        error_msg = self.query_one("#error_message", Static)
+        column, _, column_value = (part.strip() for part in value.partition("="))
         try:
-            row_str, col_str = parts
-            row = int(row_str.strip()) - 1 if row_str.strip() else None
-            col = int(col_str.strip()) - 1 if col_str.strip() else None
-            # DataTable indexes starts at 0 so we have to substract by 1 to be consistent with the rows index (start at 1)
-
-            # Validate that at least one is provided
-            if row is None and col is None:
-                error_msg.update("Please enter at least row or column")
-                return
-
-            # Validate ranges
-            if row is not None and (row < 0 or row > self.max_row):
-                error_msg.update(f"Row must be between 1 and {self.max_row}")
-                return
-
-            if col is not None and (col < 0 or col > self.max_col):
-                error_msg.update(f"Column must be between 1 and {self.max_col}")
-                return
-
-            # Valid input - dismiss with coordinates
-            self.dismiss((row, col))
-
-        except ValueError:
-            error_msg.update("Please enter valid numbers (e.g., 12:3)")
+            found = self.find(column, column_value) if self.find is not None else None
+        except KeyError as e:
+            error_msg.update(e.args[0])
+            return
+        except ValueError as e:
+            error_msg.update(str(e))
+            return
+        if found is None:
+            error_msg.update(f"No row with {column}={column_value}")
+            return
+        self.dismiss(found)
@@ -0,0 +1,110 @@
+import time
+from typing import Optional
+
+import polars as pl
+from textual import work
+from textual.app import ComposeResult
+from textual.binding import Binding
+from textual.containers import Vertical
+from textual.screen import ModalScreen
+from textual.widgets import Input, Static
+from textual.worker import Worker, get_current_worker
+
+from ..data_model import SQL_TABLE_NAME, CSVDataModel
+from ..widgets.result_table import ResultTable
+
+
+class QueryScreen(ModalScreen[None]):
+    """
+    Modal screen to run SQL queries over the data of the open file.
+    Queries run in a worker thread: escape cancels a running query, or closes the screen.
+    """
+
+    CSS_PATH = "screen.tcss"
+    BINDINGS = [
+        Binding("escape", "cancel", "Cancel", show=False),
+    ]
+
+    # how often the worker checks if the query is done or cancelled
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, data_model: CSVDataModel):
+        super().__init__()
+        self.data_model = data_model
+        self._query_worker: Optional[Worker] = None
+
+    def compose(self) -> ComposeResult:
+        with Vertical(id="query_dialog"):
+            yield Input(
+                placeholder=f"SELECT * FROM {SQL_TABLE_NAME} WHERE ...",
+                id="query_input",
+            )
+            yield Static("", id="query_status")
+            yield ResultTable(id="query_result")
+
+    def on_mount(self) -> None:
+        query_input = self.query_one("#query_input", Input)
+        query_input.border_title = "SQL"
+        query_input.focus()
+
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        sql = event.value.strip()
+        if sql:
+            self.run_query(sql)
+
+    @property
+    def running(self) -> bool:
+        return self._query_worker is not None and self._query_worker.is_running
+
+    def action_cancel(self) -> None:
+        """Cancel the running query, or close the screen"""
+        if self.running:
+            assert self._query_worker is not None
+            self._query_worker.cancel()
+            self._set_status("Query cancelled")
+        else:
+            self.dismiss(None)
+
+    def run_query(self, sql: str) -> None:
+        """Start a query, a running one is cancelled"""
+        try:
+            lazy_result = self.data_model.query(sql)
+        except Exception as e:
+            self._set_status(f"Invalid query: {e}", error=True)
+            return
+        self._set_status("Running...")
+        self._query_worker = self._collect(lazy_result)
+
+    @work(thread=True, exclusive=True, group="query")
+    def _collect(self, lazy_result: pl.LazyFrame) -> None:
+        """Collect the query in the background so it can be cancelled"""
+        worker = get_current_worker()
+        start = time.perf_counter()
+        try:
+            running_query = lazy_result.collect(background=True)
+            while (result := running_query.fetch()) is None:
+                if worker.is_cancelled:
+                    running_query.cancel()
+                    return
+                time.sleep(self.POLL_INTERVAL)
+        except Exception as e:
+            if not worker.is_cancelled:
+                self.app.call_from_thread(
+                    self._set_status, f"Query failed: {e}", error=True
+                )
+            return
+        if not worker.is_cancelled:
+            self.app.call_from_thread(
+                self._show_result, result, time.perf_counter() - start
+            )
+
+    def _show_result(self, result: pl.DataFrame, seconds: float) -> None:
+        self.query_one(ResultTable).show_result(result)
+        self._set_status(
+            f"{len(result)} rows × {len(result.columns)} cols in {seconds:.2f}s"
+        )
+
+    def _set_status(self, message: str, error: bool = False) -> None:
+        status = self.query_one("#query_status", Static)
+        status.set_class(error, "error")
+        status.update(message)
@@ -0,0 +1,36 @@
+from textual.app import ComposeResult
+from textual.binding import Binding
+from textual.containers import Horizontal, Vertical
+from textual.screen import ModalScreen
+from textual.widgets import Button, Static
+
+
+class RecoverEditsScreen(ModalScreen[bool]):
+    """Modal screen asking to replay the unsaved edits of a previous session."""
+
+    CSS_PATH = "screen.tcss"
+    BINDINGS = [
+        Binding("escape", "dismiss(False)", "Discard", show=False),
+    ]
+
+    def __init__(self, file_name: str, edit_count: int):
+        super().__init__()
+        self.file_name = file_name
+        self.edit_count = edit_count
+
+    def compose(self) -> ComposeResult:
+        with Vertical(id="recover_dialog"):
+            yield Static(
+                f"{self.edit_count} unsaved edit(s) of '{self.file_name}' "
+                "were found from a previous session.\nReplay them?",
+                id="recover_message",
+            )
+            with Horizontal(id="recover_buttons"):
+                yield Button("Replay", variant="primary", id="replay")
+                yield Button("Discard", variant="error", id="discard")
+
+    def on_mount(self) -> None:
+        self.query_one("#replay", Button).focus()
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        self.dismiss(event.button.id == "replay")
@@ -0,0 +1,86 @@
+from typing import Callable, Literal, Optional
+
+from textual.app import ComposeResult
+from textual.binding import Binding
+from textual.containers import Horizontal, Vertical
+from textual.screen import ModalScreen
+from textual.widgets import Checkbox, Input, RadioButton, RadioSet, Static
+
+# where to replace: the range selection, the cursor column or every column
+ReplaceScope = Literal["selection", "column", "all"]
+
+# applies a replace: (pattern, replacement, regex, scope) -> error message or None
+ReplaceFunction = Callable[[str, str, bool, ReplaceScope], Optional[str]]
+
+
+class ReplaceScreen(ModalScreen[bool]):
+    """
+    Modal screen to find and replace text, literal or regex, in the range selection,
+    the cursor column or the whole file. Enter applies the replace: the screen closes
+    with True, or stays open with the error (ex: no matches).
+    """
+
+    CSS_PATH = "screen.tcss"
+    BINDINGS = [
+        Binding("escape", "dismiss(False)", "Cancel", show=False),
+    ]
+
+    def __init__(self, column: str, has_selection: bool, replace: ReplaceFunction):
+        """
+        Args:
+            column: Name of the cursor column
+            has_selection: Is there a range selection (the default scope)
+            replace: Applies the replace
+        """
+        super().__init__()
+        self.column = column
+        self.has_selection = has_selection
+        self.replace = replace
+
+    def compose(self) -> ComposeResult:
+        with Vertical(id="replace_dialog"):
+            yield Input(placeholder="Find", id="replace_find")
+            yield Input(placeholder="Replace with", id="replace_with")
+            with Horizontal(id="replace_options"):
+                yield Checkbox("Regex", id="replace_regex")
+                with RadioSet(id="replace_scope"):
+                    yield RadioButton(
+                        "Selection",
+                        id="scope_selection",
+                        value=self.has_selection,
+                        disabled=not self.has_selection,
+                    )
+                    yield RadioButton(
+                        f"Column {self.column}",
+                        id="scope_column",
+                        value=not self.has_selection,
+                    )
+                    yield RadioButton("All columns", id="scope_all")
+            yield Static("", id="replace_status")
+
+    def on_mount(self) -> None:
+        self.query_one("#replace_dialog").border_title = "Replace"
+        self.query_one("#replace_find", Input).focus()
+
+    @property
+    def scope(self) -> ReplaceScope:
+        pressed = self.query_one(RadioSet).pressed_button
+        if pressed is None or pressed.id is None:
+            return "column"
+        return pressed.id.removeprefix("scope_")  # type: ignore[return-value]
+
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        pattern = self.query_one("#replace_find", Input).value
+        if not pattern:
+            self.query_one("#replace_find", Input).focus()
+            return
+        error = self.replace(
+            pattern,
+            self.query_one("#replace_with", Input).value,
+            self.query_one("#replace_regex", Checkbox).value,
+            self.scope,
+        )
+        if error is not None:
+            self.query_one("#replace_status", Static).update(error)
+            return
+        self.dismiss(True)
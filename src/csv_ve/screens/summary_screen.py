@@ -0,0 +1,107 @@
+import polars as pl
+from textual import work
+from textual.app import ComposeResult
+from textual.binding import Binding
+from textual.containers import Vertical
+from textual.screen import ModalScreen
+from textual.widgets import DataTable, Input, Static
+
+from ..data_model import SUMMARY_AGGREGATIONS, CSVDataModel
+from ..widgets.result_table import ResultTable
+
+
+def parse_aggregations(text: str) -> list[tuple[str, str]]:
+    """'age:mean, price:sum' -> [('age', 'mean'), ('price', 'sum')]"""
+    aggregations = []
+    for item in text.split(","):
+        if not item.strip():
+            continue
+        col_name, sep, aggregation = item.rpartition(":")
+        if not sep or not col_name.strip():
+            raise ValueError(f"Aggregations must be column:aggregation, got '{item}'")
+        aggregations.append((col_name.strip(), aggregation.strip().lower()))
+    return aggregations
+
+
+class SummaryScreen(ModalScreen[list[int] | None]):
+    """
+    Modal screen with a group-by summary of the data.
+    Selecting a group (enter) closes the screen with the indices of its rows.
+    """
+
+    CSS_PATH = "screen.tcss"
+    BINDINGS = [
+        Binding("escape", "dismiss(None)", "Cancel", show=False),
+    ]
+
+    def __init__(self, data_model: CSVDataModel, group_by: str = ""):
+        super().__init__()
+        self.data_model = data_model
+        self.group_by = group_by
+        self._by: list[str] = []  # group-by columns of the shown summary
+
+    def compose(self) -> ComposeResult:
+        with Vertical(id="summary_dialog"):
+            yield Input(
+                value=self.group_by, placeholder="city, country", id="summary_by"
+            )
+            yield Input(placeholder="age:mean, price:sum", id="summary_aggregations")
+            yield Static("", id="summary_status")
+            yield ResultTable(id="summary_result", cursor_type="row")
+
+    def on_mount(self) -> None:
+        by_input = self.query_one("#summary_by", Input)
+        by_input.border_title = "Group by"
+        aggregations_input = self.query_one("#summary_aggregations", Input)
+        aggregations_input.border_title = "Aggregations"
+        aggregations_input.border_subtitle = ", ".join(sorted(SUMMARY_AGGREGATIONS))
+        by_input.focus()
+
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        self.compute_summary()
+
+    def compute_summary(self) -> None:
+        by = [
+            col.strip()
+            for col in self.query_one("#summary_by", Input).value.split(",")
+            if col.strip()
+        ]
+        try:
+            aggregations = parse_aggregations(
+                self.query_one("#summary_aggregations", Input).value
+            )
+        except ValueError as e:
+            self._set_status(str(e), error=True)
+            return
+        self._set_status("Computing...")
+        self._summarize(by, aggregations)
+
+    @work(thread=True, exclusive=True, group="summary")
+    def _summarize(self, by: list[str], aggregations: list[tuple[str, str]]) -> None:
+        try:
+            summary = self.data_model.summarize(by, aggregations)
+        except (KeyError, ValueError, pl.exceptions.PolarsError) as e:
+            message = e.args[0] if isinstance(e, KeyError) else str(e)
+            self.app.call_from_thread(self._set_status, message, error=True)
+            return
+        self.app.call_from_thread(self._show_summary, by, summary)
+
+    def _show_summary(self, by: list[str], summary: pl.DataFrame) -> None:
+        self._by = by
+        table = self.query_one(ResultTable)
+        table.show_result(summary)
+        self._set_status(f"{len(summary)} groups, enter: go to the rows of a group")
+        table.focus()
+
+    def on_data_table_row_selected(self, event: DataTable.RowSelected) -> None:
+        """Close the screen with the rows of the selected group"""
+        table = self.query_one(ResultTable)
+        if event.data_table is not table or table.result is None:
+            return
+        key = table.result.row(event.cursor_row)[: len(self._by)]
+        self.dismiss(self.data_model.group_rows(self._by, key))
+
+    def _set_status(self, message: str, error: bool = False) -> None:
+        status = self.query_one("#summary_status", Static)
+        status.set_class(error, "error")
+        status.update(message)
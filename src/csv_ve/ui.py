@@ -1,19 +1,42 @@
-from typing import Literal
-
+import json
+import re
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Literal, Optional, Sequence
+
+import polars as pl
 from textual import events
 from textual.app import App, ComposeResult
 from textual.binding import Binding
 from textual.containers import Vertical
-from textual.widgets import DataTable, Footer, Header, Input
+from textual.coordinate import Coordinate
+from textual.widgets import DataTable, Footer, Header, Input, Tab, Tabs
 
-from .data_model import CSVDataModel
+from .data_model import COLUMN_TYPES, CSVDataModel
+from .diff import Diff, diff_files
 from .helpers import (
     col_label_spreasheet_format,
+    parse_tsv,
 )
+from .indexes import ColorBins, DuplicateIndex
+from .memory import DEFAULT_MEMORY_BUDGET, MemoryBudget, format_size
+from .row_windows import RowWindows
+from .screens.column_screen import ColumnInputScreen
+from .screens.diff_screen import DiffScreen
 from .screens.goto_cell_screen import CoordInputScreen
+from .screens.query_screen import QueryScreen
+from .screens.recover_screen import RecoverEditsScreen
+from .screens.replace_screen import ReplaceScope, ReplaceScreen
+from .screens.summary_screen import SummaryScreen
+from .widgets.csv_table import CSVTable
 
 
 ##-----Textual app-----##
+# `name = expression` of a computed column (not a comparison like `a >= b`)
+COLUMN_ASSIGNMENT = re.compile(r"^\s*([\w\- ]+?)\s*=(?!=)\s*(.+)$")
+
+
 class CSVEditorApp(App):
     """A Textual app to view and edit CSV files"""
 
@@ -26,10 +49,37 @@ class CSVEditorApp(App):
         Binding("escape", "cancel_edit", "Cancel", show=True),
         Binding("n", "insert_new_row_below_cursor", "new row", show=True),
         Binding("b", "insert_new_col_right_cursor", "new column", show=True),
+        Binding("equals_sign", "computed_column", "computed column", show=False),
+        Binding("t", "cast_column", "column type", show=False),
         Binding("ctrl+n", "delete_row", "delete row", show=False),
         Binding("ctrl+b", "delete_column", "delete col", show=False),
         Binding("ctrl+g", "goto_cell", "jump cell", show=True),
+        Binding("ctrl+e", "query", "SQL", show=True),
+        Binding("ctrl+o", "summary", "Summary", show=False),
+        Binding("ctrl+t", "diff", "Changes", show=False),
         Binding("ctrl+c", "copy_cell", "copy", show=False),
+        Binding("ctrl+v", "paste_cells", "paste", show=False),
+        Binding("delete", "clear_cells", "clear", show=False),
+        Binding("ctrl+l", "replace", "replace", show=False),
+        Binding("ctrl+z,u", "undo", "undo", show=False),
+        Binding("ctrl+d", "mark_duplicates", "duplicates", show=False),
+        Binding("ctrl+k", "heatmap", "heatmap", show=False),
+        Binding("ctrl+f", "freeze", "freeze", show=False),
+        # tabs (several files open)
+        Binding(
+            "ctrl+pagedown,right_square_bracket", "next_tab", "Next file", show=False
+        ),
+        Binding(
+            "ctrl+pageup,left_square_bracket",
+            "previous_tab",
+            "Previous file",
+            show=False,
+        ),
+        # range selection
+        Binding("shift+left,H", "select_left", "Select left", show=False),
+        Binding("shift+down,J", "select_down", "Select down", show=False),
+        Binding("shift+up,K", "select_up", "Select up", show=False),
+        Binding("shift+right,L", "select_right", "Select right", show=False),
         # VIM keybindings
         Binding("h", "table_left", "Left", show=False),
         Binding("j", "table_down", "Down", show=False),
@@ -40,17 +90,79 @@ class CSVEditorApp(App):
         Binding("g", "table_top", "Top", show=False),
     ]
 
-    def __init__(self, csv_path: str, theme: str | None):
+    # seconds between two checks of the memory budget
+    MEMORY_CHECK_INTERVAL = 2.0
+    # seconds between two checks that the edit logs are written
+    EDIT_LOG_CHECK_INTERVAL = 2.0
+
+    def __init__(
+        self,
+        csv_path: str | Path | Sequence[str | Path],
+        theme: str | None,
+        memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    ):
+        """
+        Args:
+            csv_path: File to open, or several files opened as tabs
+            memory_budget: Bytes kept in memory (data, indexes, undo history and table
+                caches). Beyond it inactive tabs are spilled to disk, then the caches
+                are shrunk, the undo history dropped and the open file read from disk
+        """
         super().__init__()
-        self.csv_path = csv_path
-        self.data_model = CSVDataModel(csv_path)
+        self.csv_paths = (
+            [csv_path] if isinstance(csv_path, (str, Path)) else list(csv_path)
+        )
+        # one model per tab, under a shared memory budget: each file is tracked once
+        # loaded, the files loaded before are spilled when over the budget.
+        # The first tab is loaded last (the most recently used model is kept)
+        self.memory_budget = MemoryBudget(memory_budget)
+        data_models = []
+        for path in reversed(self.csv_paths):
+            data_model = CSVDataModel(path, edit_log=True)
+            self.memory_budget.add(data_model)
+            data_models.append(data_model)
+        self.data_models = data_models[::-1]
+        self.active_tab = 0
+        self._cursors: dict[int, Coordinate] = {}  # cursor of the inactive tabs
+        self._recovery_offered: set[int] = set()
+        self._marked_duplicates: dict[int, DuplicateIndex] = {}  # tab -> index
+        # tab -> column name -> color bins
+        self._heatmaps: dict[int, dict[str, ColorBins]] = {}
+        # tab -> (frozen rows, frozen columns)
+        self._frozen: dict[int, tuple[int, int]] = {}
+        # file, rows and columns of the active tab, shown in the header
+        self._table_info = ""
+        # last column=value found, to find the next row again
+        self._last_find = ""
+        # tabs whose edit log failure was shown
+        self._edit_log_failures: set[int] = set()
         self.theme = theme or "catppuccin-mocha"
 
+    @property
+    def data_model(self) -> CSVDataModel:
+        """Model of the active tab"""
+        return self.data_models[self.active_tab]
+
+    @property
+    def csv_path(self) -> str | Path:
+        """Path of the file in the active tab"""
+        return self.csv_paths[self.active_tab]
+
     def compose(self) -> ComposeResult:
         yield Header(icon="􀝥")
 
         with Vertical(id="main-container"):
-            yield DataTable(cursor_type="cell", header_height=2, zebra_stripes=True)
+            tabs = Tabs(
+                *(
+                    Tab(Path(path).name, id=f"file-{i}")
+                    for i, path in enumerate(self.csv_paths)
+                ),
+                id="file_tabs",
+            )
+            tabs.can_focus = False  # keep the focus on the table
+            tabs.display = len(self.csv_paths) > 1
+            yield tabs
+            yield CSVTable(cursor_type="cell", header_height=2, zebra_stripes=True)
             yield Input(
                 placeholder="Edit cell value...",
                 id="formula_bar",
@@ -62,6 +174,102 @@ class CSVEditorApp(App):
         """Load data when app starts"""
         self.title = "CSV-VE"
         self.load_data()
+        self._offer_edit_recovery()
+        self.set_interval(self.MEMORY_CHECK_INTERVAL, self._check_memory)
+        self.set_interval(self.EDIT_LOG_CHECK_INTERVAL, self._check_edit_logs)
+
+    def on_unmount(self) -> None:
+        """Make sure the buffered edits reach the edit log before exiting"""
+        for data_model in self.data_models:
+            data_model.close()
+        self.memory_budget.close()
+
+    def _check_edit_logs(self) -> None:
+        """Tell once when the edits of a file can't be written to its edit log (and when they are again)"""
+        for tab, data_model in enumerate(self.data_models):
+            edit_log = data_model.edit_log
+            if edit_log is None:
+                continue
+            if edit_log.failed and tab not in self._edit_log_failures:
+                self._edit_log_failures.add(tab)
+                self.notify(
+                    f"Edits of {self.csv_paths[tab]} can't be written to {edit_log.path} "
+                    f"({edit_log.error}): save to keep them",
+                    severity="error",
+                    timeout=10,
+                )
+            elif not edit_log.failed and tab in self._edit_log_failures:
+                self._edit_log_failures.discard(tab)
+                self.notify(f"Edits of {self.csv_paths[tab]} are logged again")
+
+    def _offer_edit_recovery(self) -> None:
+        """Ask to replay the edits a crashed or killed session didn't save (once per file)"""
+        if self.active_tab in self._recovery_offered:
+            return
+        self._recovery_offered.add(self.active_tab)
+        edit_count = self.data_model.pending_edits()
+        if not edit_count:
+            return
+
+        def handle_recovery(replay: bool | None) -> None:
+            if not replay:
+                if self.data_model.edit_log is not None:
+                    self.data_model.edit_log.discard()
+                return
+            try:
+                replayed = self.data_model.replay_edit_log()
+            except Exception as e:
+                # drop the edits replayed before the failure, the edit log is kept
+                self.data_model.load()
+                self.load_data()
+                self.notify(
+                    f"Failed to replay edits: {e}, the file was reloaded",
+                    severity="error",
+                )
+                return
+            self.load_data()
+            self.notify(f"Replayed {replayed} edit(s)", severity="information")
+
+        self.push_screen(
+            RecoverEditsScreen(self.data_model.file_path.name, edit_count),
+            handle_recovery,
+        )
+
+    # ----tabs---- #
+    def on_tabs_tab_activated(self, event: Tabs.TabActivated) -> None:
+        if event.tab is not None and event.tab.id is not None:
+            self.switch_tab(int(event.tab.id.removeprefix("file-")))
+
+    def switch_tab(self, index: int) -> None:
+        """
+        Show the file of another tab.
+        The model of the tab is read back in memory if it was spilled,
+        the cursor of each tab is kept.
+        """
+        if index == self.active_tab:
+            return
+        table = self.query_one(CSVTable)
+        if hasattr(self, "editing_cell"):
+            self._clear_edit_state(table)
+        self._cursors[self.active_tab] = table.cursor_coordinate
+
+        self.active_tab = index
+        self.memory_budget.activate(self.data_model)
+        self.load_data()
+        cursor: Optional[Coordinate] = self._cursors.pop(index, None)
+        if cursor is not None:
+            table.move_cursor(row=cursor.row, column=cursor.column)
+
+        tabs = self.query_one("#file_tabs", Tabs)
+        if tabs.active != f"file-{index}":
+            tabs.active = f"file-{index}"
+        self._offer_edit_recovery()
+
+    def action_next_tab(self) -> None:
+        self.switch_tab((self.active_tab + 1) % len(self.data_models))
+
+    def action_previous_tab(self) -> None:
+        self.switch_tab((self.active_tab - 1) % len(self.data_models))
 
     # ----cursor---- #
     def _set_cursor_type(
@@ -85,7 +293,10 @@ class CSVEditorApp(App):
     def on_data_table_row_label_selected(
         self, event: DataTable.RowLabelSelected
     ) -> None:
-        """Row label clicked - switch to row cursor"""
+        """
+        Row label clicked - switch to row cursor
+        shift+up/down (J/K) then extend the selection to several rows for bulk actions
+        """
         self._set_cursor_type(event.data_table, "row", row=event.row_index)
 
     # VIM keybindings
@@ -113,6 +324,65 @@ class CSVEditorApp(App):
         if isinstance(self.focused, DataTable):
             self.focused.action_scroll_top()
 
+    # range selection
+    def _extend_selection(self, rows: int = 0, columns: int = 0) -> None:
+        if isinstance(self.focused, CSVTable):
+            self.focused.extend_selection(rows=rows, columns=columns)
+
+    def action_select_left(self):
+        self._extend_selection(columns=-1)
+
+    def action_select_down(self):
+        self._extend_selection(rows=1)
+
+    def action_select_up(self):
+        self._extend_selection(rows=-1)
+
+    def action_select_right(self):
+        self._extend_selection(columns=1)
+
+    def _selected_range(self, table: CSVTable) -> tuple[int, int, int, int]:
+        """Selected range, or the cell under the cursor when nothing is selected"""
+        if table.selection is not None:
+            return table.selection
+        row, col = table.cursor_coordinate
+        return row, row + 1, col, col + 1
+
+    def _selected_rows(self, table: CSVTable) -> tuple[int, int]:
+        """Rows of a row or cell selection, or the cursor row (a column selection spans every row)"""
+        if table.selection is not None and table.cursor_type in ("row", "cell"):
+            row_start, row_stop, _, _ = table.selection
+            return row_start, row_stop
+        return table.cursor_row, table.cursor_row + 1
+
+    def _refresh_rows(self) -> None:
+        """
+        After rows were inserted in or deleted from the model: the table follows the
+        new row count and reads the moved rows back, without being loaded again.
+        """
+        table = self.query_one(CSVTable)
+        df = self.data_model.df
+        if table.row_windows is None or df is None:
+            self.load_data()
+            return
+        table.clear_selection()
+        table.refresh_data()
+        table.fixed_rows = min(self._frozen.get(self.active_tab, (0, 0))[0], len(df))
+        self._table_info = f"{self.csv_path} | {len(df)} rows × {len(df.columns)} cols"
+        self._show_memory()
+
+    def _refresh_range(
+        self, row_start: int, row_stop: int, col_start: int, col_stop: int
+    ) -> None:
+        """Push model values of a range to the table in one refresh"""
+        table = self.query_one(CSVTable)
+        if table.row_windows is not None:
+            # the table reads the changed rows back from the model
+            table.refresh_data()
+            return
+        block = self.data_model.get_range(row_start, row_stop, col_start, col_stop)
+        table.update_range(row_start, col_start, block.rows())
+
     # ---file/ table actions--- #
     def load_data(self) -> None:
         """Load CSV data into the DataTable"""
@@ -126,6 +396,7 @@ class CSVEditorApp(App):
         header.tall = False
 
         if df is None:
+            self._table_info = ""
             self.sub_title = str("No data loaded")
             return
 
@@ -133,11 +404,62 @@ class CSVEditorApp(App):
         for i, col_name in enumerate(df.columns):
             labeled_col_name = f"{col_label_spreasheet_format(i)}\n{col_name}"
             table.add_column(labeled_col_name, key=col_name, width=30)
-        for i, row in enumerate(df.iter_rows()):
-            table.add_row(*row, label=f"{i + 1}")
+        # the cells are read from the model by windows when they are shown
+        model, col_count = self.data_model, len(df.columns)
+        row_windows = RowWindows(
+            lambda start, stop: model.get_range(start, stop, 0, col_count).rows(),
+            len(df),
+        )
+        # the edits of the model drop the windows of the rows they change
+        for index in [i for i in model.indexes if isinstance(i, RowWindows)]:
+            model.remove_index(index)
+        model.add_index(row_windows)
+        table.load_rows(row_windows, model.cell_versions.cell_version)
 
         # Update header with file info
-        self.sub_title = f"{self.csv_path} | {len(df)} rows × {len(df.columns)} cols"
+        self._table_info = f"{self.csv_path} | {len(df)} rows × {len(df.columns)} cols"
+
+        # duplicate marks of this tab (dropped if their columns were deleted)
+        duplicates = self._marked_duplicates.get(self.active_tab)
+        if duplicates is not None and duplicates not in self.data_model.indexes:
+            del self._marked_duplicates[self.active_tab]
+            duplicates = None
+        table.mark_rows(None if duplicates is None else duplicates.is_duplicated)
+        self._show_heatmaps(table)
+        rows, columns = self._frozen.get(self.active_tab, (0, 0))
+        table.fixed_rows, table.fixed_columns = (
+            min(rows, len(df)),
+            min(columns, df.width),
+        )
+        self._show_memory()
+
+    def _check_memory(self) -> None:
+        """
+        Keep the memory under the budget (checked periodically).
+        When spilling the inactive tabs is not enough: shrink the table caches,
+        drop the undo history, then read the open file from disk (lazy mode).
+        """
+        if not self._table_info:
+            return
+        table = self.query_one(CSVTable)
+        budget = self.memory_budget
+        budget.enforce()
+        if budget.usage(table.cache_size()).total > budget.max_bytes:
+            table.shrink_caches()
+            done = budget.degrade(table.cache_size())
+            if done:
+                self.notify(
+                    f"Memory budget exceeded: {', '.join(done)}", severity="warning"
+                )
+        self._show_memory()
+
+    def _show_memory(self) -> None:
+        """File info and memory used / budget in the header"""
+        if not self._table_info:
+            return
+        table = self.query_one(CSVTable)
+        used = self.memory_budget.usage(table.cache_size()).total
+        self.sub_title = f"{self._table_info} | {format_size(used)} / {format_size(self.memory_budget.max_bytes)}"
 
     def action_save(self) -> None:
         """Save the CSV file"""
@@ -158,25 +480,138 @@ class CSVEditorApp(App):
 
     def on_data_table_cell_highlighted(self, event: DataTable.CellHighlighted) -> None:
         """Update formula bar when cursor moves to a new cell"""
-        table = self.query_one(DataTable)
         formula_bar = self.query_one("#formula_bar", Input)
 
-        # Get the value of the highlighted cell
+        # Read the value from the data model rather than the rendered cell
+        row, col = event.coordinate
         try:
-            current_value = table.get_cell_at(event.coordinate)
-            formula_bar.value = str(current_value)
+            formula_bar.value = self._cell_text(self.data_model.get_cell(row, col))
         except Exception:
             # Handle case where cell might not exist
             formula_bar.value = ""
 
     def action_copy_cell(self) -> None:
-        table = self.query_one(DataTable)
+        """Copy the highlighted cell, or the selected range as TSV"""
+        table = self.query_one(CSVTable)
+        if table.cursor_coordinate is None:
+            return
+
+        if table.selection is None:
+            row, col = table.cursor_coordinate
+            cell_value = self.data_model.get_cell(row, col)
+            self.copy_to_clipboard(self._cell_text(cell_value))
+            return
+
+        block = self.data_model.get_range(*table.selection)
+        tsv = block.write_csv(separator="\t", include_header=False)
+        self.copy_to_clipboard(tsv.rstrip("\n"))
+
+    def action_paste_cells(self) -> None:
+        """Paste the clipboard (TSV) with its top-left cell at the cursor"""
+        self._paste_tsv(self.clipboard)
+
+    def on_paste(self, event: events.Paste) -> None:
+        """Text pasted from the terminal while the table has the focus"""
+        if isinstance(self.focused, CSVTable):
+            self._paste_tsv(event.text)
+
+    def _paste_tsv(self, text: str) -> None:
+        table = self.query_one(CSVTable)
+        rows = parse_tsv(text)
+        if not rows:
+            return
+        row, col = table.cursor_coordinate
+
+        # cut what does not fit in the table
+        rows = [
+            values[: self.data_model.column_count() - col]
+            for values in rows[: self.data_model.row_count() - row]
+        ]
+        width = max(len(values) for values in rows)
+        rows = [list(values) + [None] * (width - len(values)) for values in rows]
+
+        try:
+            self.data_model.set_range(row, col, rows)
+        except (ValueError, IndexError) as e:
+            self.notify(f"Paste failed: {e}", severity="warning")
+            return
+        self._refresh_range(row, row + len(rows), col, col + width)
+
+    def action_clear_cells(self) -> None:
+        """Empty the highlighted cell or the selected range"""
+        table = self.query_one(CSVTable)
         if table.cursor_coordinate is None:
             return
-        row_key, column_key = table.coordinate_to_cell_key(table.cursor_coordinate)
 
-        cell_value = table.get_cell(row_key, column_key)
-        self.copy_to_clipboard(str(cell_value))
+        selected = self._selected_range(table)
+        try:
+            self.data_model.clear_range(*selected)
+        except Exception as e:
+            self.notify(f"Failed to clear cells: {e}", severity="error")
+            return
+        self._refresh_range(*selected)
+
+    def action_replace(self) -> None:
+        """Find and replace text in the selected range, the cursor column or every column"""
+        table = self.query_one(CSVTable)
+        df = self.data_model.df
+        if df is None or not df.width:
+            return
+        selection = table.selection
+        col = table.cursor_column
+
+        def replace(
+            pattern: str, replacement: str, regex: bool, scope: ReplaceScope
+        ) -> Optional[str]:
+            if scope == "selection" and selection is not None:
+                row_start, row_stop, col_start, col_stop = selection
+            elif scope == "column":
+                row_start, row_stop, col_start, col_stop = 0, len(df), col, col + 1
+            else:
+                row_start, row_stop, col_start, col_stop = 0, len(df), 0, df.width
+            try:
+                count = self.data_model.replace_all(
+                    pattern,
+                    replacement,
+                    regex,
+                    row_start,
+                    row_stop,
+                    col_start,
+                    col_stop,
+                )
+            except Exception as e:
+                return str(e)
+            if not count:
+                return f"No matches for '{pattern}' in the text cells"
+            self._refresh_range(row_start, row_stop, col_start, col_stop)
+            self.notify(f"{count} replacements (u to undo)", severity="information")
+            return None
+
+        self.push_screen(ReplaceScreen(df.columns[col], selection is not None, replace))
+
+    def action_undo(self) -> None:
+        """Undo the last edit, if it can be undone (a replace)"""
+        try:
+            description = self.data_model.undo()
+        except RuntimeError as e:
+            self.notify(str(e), severity="warning")
+            return
+        self.query_one(CSVTable).refresh_data()
+        self.notify(f"Undone: {description}", severity="information")
+
+    @staticmethod
+    def _cell_text(value: object) -> str:
+        """
+        Text shown in the formula bar or copied for a cell value (None -> empty).
+        Lists and structs are written as JSON, the way they are parsed back.
+        """
+        if value is None:
+            return ""
+        if isinstance(value, pl.Series):  # a list cell
+            value = value.to_list()
+        if isinstance(value, (list, dict)):
+            return json.dumps(value, default=str, ensure_ascii=False)
+        return str(value)
 
     # ---edit data actions--- #
     def action_edit_cell(self) -> None:
@@ -190,12 +625,13 @@ class CSVEditorApp(App):
         if table.cursor_coordinate is None:
             return
 
+        row, col = table.cursor_coordinate
         row_key, col_key = table.coordinate_to_cell_key(table.cursor_coordinate)
-        current_value = table.get_cell(row_key, col_key)
+        current_value = self.data_model.get_cell(row, col)
 
         # Populate formula bar with current value
         self.editing_cell = (row_key, col_key, current_value)
-        formula_bar.value = str(current_value)
+        formula_bar.value = self._cell_text(current_value)
         formula_bar.focus()
 
     def on_input_submitted(self, event: Input.Submitted) -> None:
@@ -210,10 +646,26 @@ class CSVEditorApp(App):
             table = self.query_one(DataTable)
 
             row_idx = table.get_row_index(row_key)
-            col_idx = list(table.columns.keys()).index(col_key)
-
-            self.data_model.set_cell(row_idx, col_idx, event.value)
-            table.update_cell(row_key, col_key, event.value)
+            col_idx = self.data_model.column_index(col_key.value)
+
+            selection = self.query_one(CSVTable).selection
+            try:
+                if selection is None:
+                    self.data_model.set_cell(row_idx, col_idx, event.value)
+                else:
+                    # fill the whole selected range with the value
+                    self.data_model.fill_range(*selection, event.value)
+            except ValueError as e:
+                # stay in edit mode so the value can be fixed
+                self.notify(str(e), severity="warning")
+                return
+
+            if selection is None:
+                table.update_cell(
+                    row_key, col_key, self.data_model.get_cell(row_idx, col_idx)
+                )
+            else:
+                self._refresh_range(*selection)
 
             self._clear_edit_state(table)
 
@@ -237,8 +689,10 @@ class CSVEditorApp(App):
             self._clear_edit_state(table)
             event.prevent_default()
             event.stop()
-        else:
-            table.cursor_type = "cell"  # relevant for the cursor part of the code. Unrelated to cell modif but related to escape key
+        elif event.key == "escape":
+            # back to the cell cursor (and drop the selection) when the formula bar is not the focus
+            table.cursor_type = "cell"
+            table.clear_selection()
         # enter key
         if event.key == "enter" and not formula_bar.has_focus:
             event.stop()
@@ -257,13 +711,23 @@ class CSVEditorApp(App):
         """
         Show/ hide keybindings in the footer.
         - show only escape keybinding in edit mode
-        - hide goto_cell, enter, save, reload keybinding in edit mode
+        - hide goto_cell, enter, save, reload, query, summary, diff, replace, undo keybinding in edit mode
         """
         formula_bar = self.query_one("#formula_bar", Input)
 
         if action == "cancel_edit":
             return hasattr(self, "editing_cell")
-        if action in {"goto_cell", "edit_cell", "save", "reload"}:
+        if action in {
+            "goto_cell",
+            "edit_cell",
+            "save",
+            "reload",
+            "query",
+            "summary",
+            "diff",
+            "replace",
+            "undo",
+        }:
             return not formula_bar.has_focus
         return True
 
@@ -273,26 +737,28 @@ class CSVEditorApp(App):
         Insert a new empty row below the current cursor position.
         Uses CSVDataModel (that uses polars) to create the new row (textual only reads - the file is the source of thruth)
         - insert the new row in the data model (polars)
-        - reload the table (textual)
+        - refresh the rows of the table (textual)
         - move the cursor back to the original position so it appears like it didn't move
         """
-        table = self.query_one(DataTable)
+        table = self.query_one(CSVTable)
 
         if table.cursor_coordinate is None:
             return
 
         row, col = table.cursor_coordinate
+        # with several selected rows, insert as many rows below the selection
+        row_start, row_stop = self._selected_rows(table)
 
         try:
-            self.data_model.insert_row(row + 1)
+            self.data_model.insert_rows(row_stop, row_stop - row_start)
         except Exception as e:
             self.notify(f"Failed to insert row: {e}", severity="error")
             return
 
-        self.load_data()  # reset cursor position to the first row (by default)
+        self._refresh_rows()
 
         # Restore cursor to its position
-        new_row = min(row + 1, self.data_model.row_count() - 1)
+        new_row = min(row_stop, self.data_model.row_count() - 1)
         table.move_cursor(row=new_row, column=col)
 
     def action_insert_new_col_right_cursor(self) -> None:
@@ -322,20 +788,71 @@ class CSVEditorApp(App):
         new_col = min(col + 1, self.data_model.column_count() - 1)
         table.move_cursor(row=row, column=new_col)
 
+    def action_computed_column(self) -> None:
+        """
+        Insert a column computed from the others to the right of the cursor,
+        from a SQL expression: `total = price * qty` (or `price * qty` for a generated name).
+        The column is evaluated again when the columns it uses are edited.
+        """
+        table = self.query_one(CSVTable)
+        if self.data_model.df is None:
+            return
+        row, col = table.cursor_coordinate
+
+        def submit(value: str) -> Optional[str]:
+            match = COLUMN_ASSIGNMENT.match(value)
+            col_name, expression = match.groups() if match else (None, value)
+            try:
+                self.data_model.insert_computed_column(col + 1, col_name, expression)
+            except Exception as e:
+                return e.args[0] if isinstance(e, KeyError) else str(e)
+            self.load_data()
+            table.move_cursor(row=row, column=col + 1)
+            return None
+
+        self.push_screen(ColumnInputScreen("New column", "total = price * qty", submit))
+
+    def action_cast_column(self) -> None:
+        """Convert the cursor column to another type (int, float, date...)"""
+        table = self.query_one(CSVTable)
+        df = self.data_model.df
+        if df is None or not df.width:
+            return
+        row, col = table.cursor_coordinate
+        col_name = df.columns[col]
+
+        def submit(value: str) -> Optional[str]:
+            try:
+                self.data_model.cast_column(col, value)
+            except Exception as e:
+                return str(e)
+            self.load_data()
+            table.move_cursor(row=row, column=col)
+            return None
+
+        self.push_screen(
+            ColumnInputScreen(
+                f"Type of {col_name} ({df.schema[col_name]})",
+                ", ".join(COLUMN_TYPES),
+                submit,
+            )
+        )
+
     # ---remove row or col--- #
     def action_delete_row(self) -> None:
         """
-        Delete the row at the current cursor position.
+        Delete the row at the current cursor position, or all the selected rows.
         """
-        table = self.query_one(DataTable)
+        table = self.query_one(CSVTable)
 
         if table.cursor_coordinate is None:
             return
 
-        row, col = table.cursor_coordinate
+        _, col = table.cursor_coordinate
+        row, row_stop = self._selected_rows(table)
 
         try:
-            self.data_model.delete_row(row)
+            self.data_model.delete_rows(row, row_stop)
         except ValueError as e:
             self.notify(str(e), severity="warning")
             return
@@ -343,7 +860,7 @@ class CSVEditorApp(App):
             self.notify(f"Failed to delete row: {e}", severity="error")
             return
 
-        self.load_data()
+        self._refresh_rows()
 
         # Move cursor to the same row (or the last row if we deleted the last one)
         new_row = min(row, self.data_model.row_count() - 1)
@@ -351,17 +868,18 @@ class CSVEditorApp(App):
 
     def action_delete_column(self) -> None:
         """
-        Delete the column at the current cursor position.
+        Delete the column at the current cursor position, or all the selected columns.
         """
-        table = self.query_one(DataTable)
+        table = self.query_one(CSVTable)
 
         if table.cursor_coordinate is None:
             return
 
-        row, col = table.cursor_coordinate
+        row, _ = table.cursor_coordinate
+        _, _, col, col_stop = self._selected_range(table)
 
         try:
-            self.data_model.delete_column(col)
+            self.data_model.delete_columns(range(col, col_stop))
         except ValueError as e:
             self.notify(str(e), severity="warning")
             return
@@ -377,11 +895,23 @@ class CSVEditorApp(App):
 
     # ---jump to specific cell--- #
     def action_goto_cell(self) -> None:
-        """Open the navigation popup."""
+        """
+        Open the navigation popup: row:col, or column=value for the next row with the value.
+        The last column=value is filled in again, enter finds the next row.
+        """
         table = self.query_one(DataTable)
         max_row = table.row_count
         max_col = len(table.columns)
 
+        def find(column: str, value: str) -> Optional[tuple[int, int]]:
+            # indexed lookup, the index of the column is kept for the next ones.
+            # A new value is looked up from the cursor row, the same one after it
+            query = f"{column}={value}"
+            after = table.cursor_row - (query != self._last_find)
+            row = self.data_model.find_value(column, value, after=after)
+            self._last_find = query
+            return None if row is None else (row, self.data_model.column_index(column))
+
         def handle_navigation(result: tuple[int, int] | None) -> None:
             if result is not None:
                 row, col = result
@@ -397,4 +927,226 @@ class CSVEditorApp(App):
                 table.move_cursor(row=target_row, column=target_col)
                 table.focus()
 
-        self.push_screen(CoordInputScreen(max_row, max_col), handle_navigation)
+        self.push_screen(
+            CoordInputScreen(max_row, max_col, find, self._last_find), handle_navigation
+        )
+
+    # ---duplicates--- #
+    def _selected_columns(self, table: CSVTable) -> Optional[list[str]]:
+        """Names of the selected columns (column cursor or range), None for whole rows"""
+        df = self.data_model.df
+        if df is None:
+            return None
+        if table.cursor_type == "column":
+            _, _, col_start, col_stop = self._selected_range(table)
+        elif table.selection is not None and table.cursor_type == "cell":
+            _, _, col_start, col_stop = table.selection
+        else:
+            return None
+        return df.columns[col_start:col_stop]
+
+    def action_mark_duplicates(self) -> None:
+        """
+        Highlight the duplicate rows: rows with the same values in the selected columns
+        (column cursor or range selection), or identical rows when nothing is selected.
+        The same action again removes the highlight.
+        """
+        table = self.query_one(CSVTable)
+        columns = self._selected_columns(table)
+        key = tuple(columns) if columns is not None else None
+
+        marked = self._marked_duplicates.pop(self.active_tab, None)
+        if marked is not None and marked.columns == key:
+            table.mark_rows(None)
+            return
+
+        try:
+            index = self.data_model.duplicate_index(columns)
+        except Exception as e:
+            self.notify(f"Failed to find duplicates: {e}", severity="error")
+            return
+        self._marked_duplicates[self.active_tab] = index
+        table.mark_rows(index.is_duplicated)
+
+        count = index.duplicate_count()
+        target = "rows" if columns is None else ", ".join(columns)
+        if count:
+            self.notify(f"{count} rows with duplicate {target}", severity="warning")
+        else:
+            self.notify(f"No duplicate {target}", severity="information")
+
+    # ---heatmap--- #
+    def action_heatmap(self) -> None:
+        """
+        Color the selected columns (column cursor or range selection, else the cursor
+        column) by value: quantile bins from low to high values, missing values apart.
+        The same action again removes the colors.
+        """
+        df = self.data_model.df
+        table = self.query_one(CSVTable)
+        if df is None or not df.width:
+            return
+        columns = self._selected_columns(table) or [df.columns[table.cursor_column]]
+        heatmaps = self._heatmaps.setdefault(self.active_tab, {})
+
+        if all(col_name in heatmaps for col_name in columns):
+            for col_name in columns:
+                self.data_model.remove_index(heatmaps.pop(col_name))
+            self._show_heatmaps(table)
+            return
+
+        not_numeric = []
+        for col_name in columns:
+            if col_name in heatmaps:
+                continue
+            try:
+                bins = self.data_model.color_bins(col_name)
+            except Exception as e:
+                self.notify(f"Failed to color {col_name}: {e}", severity="error")
+                return
+            if bins.is_numeric():
+                heatmaps[col_name] = bins
+            else:
+                self.data_model.remove_index(bins)
+                not_numeric.append(col_name)
+        self._show_heatmaps(table)
+        if not_numeric:
+            self.notify(
+                f"No numeric values in {', '.join(not_numeric)}", severity="warning"
+            )
+
+    def _show_heatmaps(self, table: CSVTable) -> None:
+        """Color the heatmap columns of this tab (dropped if they were deleted)"""
+        heatmaps = self._heatmaps.get(self.active_tab, {})
+        for col_name, bins in list(heatmaps.items()):
+            if bins not in self.data_model.indexes:
+                del heatmaps[col_name]
+        table.color_columns(
+            {
+                self.data_model.column_index(col_name): bins
+                for col_name, bins in heatmaps.items()
+            }
+        )
+
+    # ---frozen panes--- #
+    def action_freeze(self) -> None:
+        """
+        Freeze the columns up to the cursor column (and with a range selection, the rows
+        and columns up to its end): they stay in view while scrolling.
+        The frozen cells are rendered from the same rows as the rest of the table.
+        The same action again unfreezes them.
+        """
+        table = self.query_one(CSVTable)
+        if self._frozen.pop(self.active_tab, None) is not None:
+            table.fixed_rows, table.fixed_columns = 0, 0
+            return
+        if not table.columns:
+            return
+        if table.selection is not None and table.cursor_type == "cell":
+            _, rows, _, columns = table.selection
+        else:
+            rows, columns = 0, table.cursor_column + 1
+        self._frozen[self.active_tab] = (rows, columns)
+        table.fixed_rows, table.fixed_columns = rows, columns
+        table.clear_selection()
+
+    # ---changes since the last save--- #
+    def action_diff(self) -> None:
+        """
+        Show the changes compared to the file on disk.
+        From the diff: enter jumps to the changed row, ctrl+s saves.
+        """
+        table = self.query_one(CSVTable)
+
+        def handle_diff(result: int | str | None) -> None:
+            if result == "save":
+                self.action_save()
+            elif isinstance(result, int):
+                table.move_cursor(row=result)
+                table.focus()
+
+        self.push_screen(
+            DiffScreen(
+                f"Changes to {self.data_model.file_path.name}",
+                self.data_model.diff_with_disk,
+            ),
+            handle_diff,
+        )
+
+    # ---SQL queries--- #
+    def action_query(self) -> None:
+        """Open the SQL query screen over the data of the active tab"""
+        self.push_screen(QueryScreen(self.data_model))
+
+    # ---group-by summary--- #
+    def action_summary(self) -> None:
+        """
+        Open the group-by summary, grouped by the column under the cursor by default.
+        Selecting a group moves the cursor to its first row.
+        """
+        table = self.query_one(CSVTable)
+        df = self.data_model.df
+        if df is None or not df.columns:
+            return
+        col_name = df.columns[table.cursor_column]
+
+        def handle_group(rows: list[int] | None) -> None:
+            if not rows:
+                return
+            table.move_cursor(row=rows[0])
+            table.focus()
+            self.notify(
+                f"Group of {len(rows)} row(s), first at row {rows[0] + 1}",
+                severity="information",
+            )
+
+        self.push_screen(SummaryScreen(self.data_model, col_name), handle_group)
+
+
+class DiffApp(App[None]):
+    """Read-only view of the differences between two files (`csv-ve diff a.csv b.csv`)"""
+
+    def __init__(
+        self,
+        old_path: str | Path,
+        new_path: str | Path,
+        key: Optional[Sequence[str]] = None,
+        theme: Optional[str] = None,
+    ):
+        super().__init__()
+        self.old_path, self.new_path = Path(old_path), Path(new_path)
+        self.key = list(key) if key else None
+        self.theme = theme or "catppuccin-mocha"
+        # the diff is written there and shown page by page, see compute_diff
+        self._diff_dir: Optional[Path] = None
+
+    def compose(self) -> ComposeResult:
+        yield Header()
+        yield Footer()
+
+    def on_mount(self) -> None:
+        self.title = "csv-ve diff"
+        self.push_screen(
+            DiffScreen(
+                f"{self.old_path.name} -> {self.new_path.name}",
+                self.compute_diff,
+                editable=False,
+            ),
+            lambda _: self.exit(),
+        )
+
+    def on_unmount(self) -> None:
+        if self._diff_dir is not None:
+            shutil.rmtree(self._diff_dir, ignore_errors=True)
+
+    def compute_diff(self) -> Diff:
+        """
+        The diff is sunk to an Arrow IPC file by the streaming engine, then its pages
+        are read from the file as they are shown: it's never collected in memory.
+        """
+        rows, added, deleted = diff_files(self.old_path, self.new_path, self.key)
+        if self._diff_dir is None:
+            self._diff_dir = Path(tempfile.mkdtemp(prefix="csv-ve-diff-"))
+        diff_path = self._diff_dir / "diff.arrow"
+        rows.sink_ipc(diff_path)
+        return Diff(pl.scan_ipc(diff_path), added, deleted)
@@ -0,0 +1,441 @@
+from typing import Any, Callable, ClassVar, Iterable, Optional
+
+from rich.segment import Segment
+from rich.style import Style
+from textual._two_way_dict import TwoWayDict
+from textual.cache import LRUCache
+from textual.coordinate import Coordinate
+from textual.geometry import Region
+from textual.widgets import DataTable
+from textual.widgets._data_table import (
+    CellDoesNotExist,
+    CellType,
+    ColumnKey,
+    CursorType,
+    Row,
+    RowDoesNotExist,
+    RowKey,
+)
+
+from ..indexes import ColorBins
+from ..row_windows import RowWindows
+from .virtual_rows import (
+    LineOffsets,
+    OrderedRows,
+    RowCells,
+    RowLocations,
+    RowMetadata,
+    VirtualRows,
+)
+
+
+class CSVTable(DataTable):
+    """
+    DataTable with a rectangular range selection.
+    The range goes from an anchor cell to the cursor and is highlighted like the cursor.
+    Rows can also be marked (e.g. duplicates) with `mark_rows`, and columns colored
+    by value (heatmap) with `color_columns`.
+    With `load_rows`, the table holds no rows at all: the rows are virtual (see
+    VirtualRows), their cells are read from the data by windows when they are shown
+    (see RowWindows), and rendered cells are cached by cell version so an edit only
+    renders the touched cells again.
+    """
+
+    # rendered cells kept across edits, selection and mark changes
+    CELL_CACHE_SIZE = 20_000
+    # memory of a rendered cell (segments of its lines), estimated
+    RENDERED_CELL_SIZE = 600
+
+    COMPONENT_CLASSES: ClassVar[set[str]] = DataTable.COMPONENT_CLASSES | {
+        "csvtable--marked-row",
+        "csvtable--heat-low",
+        "csvtable--heat-high",
+        "csvtable--missing-cell",
+    }
+    DEFAULT_CSS = """
+    CSVTable > .csvtable--marked-row {
+        background: $warning 30%;
+    }
+    CSVTable > .csvtable--heat-low {
+        background: $success 35%;
+    }
+    CSVTable > .csvtable--heat-high {
+        background: $error 60%;
+    }
+    CSVTable > .csvtable--missing-cell {
+        background: $secondary 35%;
+    }
+    """
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.selection_anchor: Optional[Coordinate] = None
+        self._extending_selection = False
+        # row index -> is the row marked
+        self.marked_rows: Optional[Callable[[int], bool]] = None
+        # column index -> color bins of its rows
+        self.colored_columns: dict[int, ColorBins] = {}
+        # (theme, bin, highest bin) -> style of the bin
+        self._bin_styles: dict[tuple[str, int, int], Style] = {}
+        # cells read on demand (see load_rows), None: the cells are in the table
+        self.row_windows: Optional[RowWindows] = None
+        # rows of load_rows, not stored in the table
+        self._virtual_rows: Optional[VirtualRows] = None
+        # (row, col) -> edit version of the cell, see load_rows
+        self.cell_version: Optional[Callable[[int, int], int]] = None
+        self._rendered_cells: LRUCache[tuple, list[list[Segment]]] = LRUCache(
+            self.CELL_CACHE_SIZE
+        )
+
+    @property
+    def selection(self) -> Optional[tuple[int, int, int, int]]:
+        """
+        Selected range as (row_start, row_stop, col_start, col_stop), stops are exclusive.
+        With a row (column) cursor the selection spans whole rows (columns).
+        """
+        if self.selection_anchor is None or self.cursor_type == "none":
+            return None
+        anchor_row, anchor_col = self.selection_anchor
+        cursor_row, cursor_col = self.cursor_coordinate
+        row_start, row_stop = (
+            min(anchor_row, cursor_row),
+            max(anchor_row, cursor_row) + 1,
+        )
+        col_start, col_stop = (
+            min(anchor_col, cursor_col),
+            max(anchor_col, cursor_col) + 1,
+        )
+
+        if self.cursor_type == "row":
+            return row_start, row_stop, 0, len(self.columns)
+        if self.cursor_type == "column":
+            return 0, self.row_count, col_start, col_stop
+        return row_start, row_stop, col_start, col_stop
+
+    def extend_selection(self, rows: int = 0, columns: int = 0) -> None:
+        """Move the cursor while keeping the anchor, starting a selection if needed"""
+        if self.selection_anchor is None:
+            self.selection_anchor = self.cursor_coordinate
+        row, col = self.cursor_coordinate
+        self._extending_selection = True
+        try:
+            self.cursor_coordinate = Coordinate(row + rows, col + columns)
+        finally:
+            self._extending_selection = False
+        self._refresh_selection()
+
+    def clear_selection(self) -> None:
+        if self.selection_anchor is not None:
+            self.selection_anchor = None
+            self._refresh_selection()
+
+    def _refresh_selection(self) -> None:
+        # render caches don't know about the anchor
+        self._clear_render_caches()
+        self.refresh()
+
+    def _clear_render_caches(self) -> None:
+        """
+        Drop the rendered rows and lines, not the row offsets and order
+        that `_clear_caches` also drops: they take O(rows) to rebuild
+        """
+        self._row_render_cache.clear()
+        self._cell_render_cache.clear()
+        self._line_cache.clear()
+        self._styles_cache.clear()
+
+    def watch_cursor_coordinate(
+        self, old_coordinate: Coordinate, new_coordinate: Coordinate
+    ) -> None:
+        """Any cursor move that is not a selection extension drops the selection"""
+        if not self._extending_selection:
+            self.clear_selection()
+        super().watch_cursor_coordinate(old_coordinate, new_coordinate)
+
+    def clear(self, columns: bool = False) -> "CSVTable":
+        self.selection_anchor = None
+        self._close_row_windows()
+        super().clear(columns)
+        return self
+
+    def on_unmount(self) -> None:
+        self._close_row_windows()
+
+    def _close_row_windows(self) -> None:
+        if self.row_windows is not None:
+            self.row_windows.close()
+            self.row_windows = None
+        if self._virtual_rows is not None:
+            self._virtual_rows = None
+            self.rows, self._data = {}, {}
+            self._row_locations = TwoWayDict({})
+        self.cell_version = None
+        self._rendered_cells.clear()
+
+    def cache_size(self) -> int:
+        """
+        Memory of the rendered cells in bytes, estimated.
+        The row windows are an index of the model, counted with its indexes.
+        """
+        return len(self._rendered_cells) * self.RENDERED_CELL_SIZE
+
+    def shrink_caches(self) -> None:
+        """Free the rendered cells and keep half the row windows (memory budget exceeded)"""
+        self._rendered_cells.clear()
+        self._clear_render_caches()
+        if self.row_windows is not None:
+            self.row_windows.shrink(self.row_windows.max_windows // 2)
+
+    # ---rows read on demand--- #
+    def load_rows(
+        self,
+        row_windows: RowWindows,
+        cell_version: Optional[Callable[[int, int], int]] = None,
+    ) -> None:
+        """
+        Show the rows of the data (the columns must be added first) without adding
+        them to the table: the cells of the visible rows are read from `row_windows`.
+        With `cell_version` (see indexes.CellVersions), rendered cells are cached
+        until the version of the cell changes.
+        """
+        self._close_row_windows()
+        self.row_windows = row_windows
+        self.cell_version = cell_version
+        rows = self._virtual_rows = VirtualRows(row_windows.row_count, row_windows.row)
+        self.rows = RowMetadata(rows)  # type: ignore[assignment]
+        self._data = RowCells(rows, lambda: [c.key for c in self.ordered_columns])  # type: ignore[assignment]
+        self._row_locations = RowLocations(rows)  # type: ignore[assignment]
+        self._rows_changed(0)
+
+    def _rows_changed(self, old_count: int) -> None:
+        self._clear_caches()
+        self._require_update_dimensions = True
+        self.cursor_coordinate = self.cursor_coordinate  # within the rows
+        # like add_row: the cursor appears when the first rows are added
+        if not old_count and self.row_count and self.columns:
+            if self.show_cursor and self.cursor_type != "none":
+                self._highlight_cursor()
+        self._update_count += 1
+        self.check_idle()
+        self.refresh()
+
+    @property
+    def ordered_rows(self) -> list[Row]:
+        if self._virtual_rows is None:
+            return super().ordered_rows
+        return OrderedRows(self._virtual_rows)  # type: ignore[return-value]
+
+    @property
+    def _y_offsets(self) -> list[tuple[RowKey, int]]:
+        if self._virtual_rows is None:
+            return super()._y_offsets
+        return LineOffsets(self._virtual_rows)  # type: ignore[return-value]
+
+    def _get_cell_region(self, coordinate: Coordinate) -> Region:
+        # DataTable sums the height of every row above, virtual rows have a height of 1
+        if self._virtual_rows is None or not self.is_valid_coordinate(coordinate):
+            return super()._get_cell_region(coordinate)
+        row_idx, col_idx = coordinate
+        columns = self.ordered_columns
+        x = self._row_label_column_width + sum(
+            column.get_render_width(self) for column in columns[:col_idx]
+        )
+        width = columns[col_idx].get_render_width(self)
+        return Region(x, self._row_y(row_idx), width, 1)
+
+    def _get_row_region(self, row_index: int) -> Region:
+        if self._virtual_rows is None or not self.is_valid_row_index(row_index):
+            return super()._get_row_region(row_index)
+        row_width = self._row_label_column_width + sum(
+            column.get_render_width(self) for column in self.columns.values()
+        )
+        return Region(0, self._row_y(row_index), max(self.size.width, row_width), 1)
+
+    def _row_y(self, row_idx: int) -> int:
+        return row_idx + (self.header_height if self.show_header else 0)
+
+    def get_row(self, row_key: RowKey | str) -> list[CellType]:
+        if self.row_windows is None:
+            return super().get_row(row_key)
+        row_idx = self._row_locations.get(row_key)
+        if row_idx is None:
+            raise RowDoesNotExist(f"Row key {row_key!r} is not valid.")
+        return list(self.row_windows.row(row_idx))
+
+    def get_cell(self, row_key: RowKey | str, column_key: ColumnKey | str) -> CellType:
+        if self.row_windows is None:
+            return super().get_cell(row_key, column_key)
+        row_idx = self._row_locations.get(row_key)
+        col_idx = self._column_locations.get(column_key)
+        if row_idx is None or col_idx is None:
+            raise CellDoesNotExist(
+                f"No cell exists for row_key={row_key!r}, column_key={column_key!r}."
+            )
+        return self.row_windows.row(row_idx)[col_idx]
+
+    def update_cell(
+        self,
+        row_key: RowKey | str,
+        column_key: ColumnKey | str,
+        value: CellType,
+        *,
+        update_width: bool = False,
+    ) -> None:
+        if self.row_windows is not None:
+            row_idx = self._row_locations.get(row_key)
+            if row_idx is not None:
+                # read the value back from the data
+                self.row_windows.invalidate(row_idx, row_idx + 1)
+        super().update_cell(row_key, column_key, value, update_width=update_width)
+
+    def _update_dimensions(self, new_rows: Iterable[RowKey]) -> None:
+        if self.row_windows is None:
+            super()._update_dimensions(new_rows)
+            return
+        # measuring the new rows would read every cell: the columns have a
+        # fixed width, only the row labels (row numbers) are measured
+        if self.row_count:
+            self._labelled_row_exists = True
+            self._label_column.content_width = max(
+                self._label_column.content_width, len(str(self.row_count))
+            )
+        super()._update_dimensions(())
+
+    def _render_cell(
+        self,
+        row_index: int,
+        column_index: int,
+        base_style: Style,
+        width: int,
+        cursor: bool = False,
+        hover: bool = False,
+    ) -> list[list[Segment]]:
+        bins = self.colored_columns.get(column_index)
+        if bins is not None and row_index >= 0:
+            base_style += self._bin_style(bins.bin(row_index), bins.highest_bin)
+        # DataTable's own cell cache is dropped by any edit or selection change
+        if self.cell_version is None or row_index < 0 or column_index < 0:
+            return super()._render_cell(
+                row_index, column_index, base_style, width, cursor, hover
+            )
+        key = (
+            row_index,
+            column_index,
+            self.cell_version(row_index, column_index),
+            self.app.theme,
+            base_style,
+            width,
+            cursor,
+            hover,
+            self._show_hover_cursor,
+            self._pseudo_class_state,
+            # fixed cells have their own style
+            row_index < self.fixed_rows or column_index < self.fixed_columns,
+        )
+        lines = self._rendered_cells.get(key)
+        if lines is None:
+            lines = super()._render_cell(
+                row_index, column_index, base_style, width, cursor, hover
+            )
+            self._rendered_cells[key] = lines
+        return lines
+
+    def watch_scroll_y(self, old_value: float, new_value: float) -> None:
+        if self.row_windows is not None:
+            self.row_windows.visit(int(new_value))
+        super().watch_scroll_y(old_value, new_value)
+
+    def refresh_data(self) -> None:
+        """
+        Render the cells again after edits of the model, when the cells are read on demand:
+        the edits already dropped the changed rows from the row windows (one of the
+        indexes of the model) and the cell versions only re-render the changed cells.
+        Rows inserted or deleted in the model only change the row count.
+        """
+        rows = self._virtual_rows
+        if rows is not None and self.row_windows is not None:
+            old_count = rows.count
+            if old_count != self.row_windows.row_count:
+                rows.count = self.row_windows.row_count
+                self._rows_changed(old_count)
+                return
+        self._update_count += 1
+        self.refresh()
+
+    def update_range(self, row_idx: int, col_idx: int, rows: list[tuple]) -> None:
+        """
+        Update a block of cells with a single refresh.
+        `update_cell` would invalidate the render caches once per cell.
+        """
+        if self.row_windows is not None:
+            # the values are read back from the data
+            self.row_windows.invalidate(row_idx, row_idx + len(rows))
+            self.refresh_data()
+            return
+        column_keys = [column.key for column in self.ordered_columns]
+        for row_offset, values in enumerate(rows):
+            row_key = self._row_locations.get_key(row_idx + row_offset)
+            row_data = self._data[row_key]
+            for col_offset, value in enumerate(values):
+                row_data[column_keys[col_idx + col_offset]] = value
+        self._update_count += 1
+        self.refresh()
+
+    def mark_rows(self, marked_rows: Optional[Callable[[int], bool]]) -> None:
+        """Highlight the rows for which `marked_rows(row_index)` is True (None: no marks)"""
+        self.marked_rows = marked_rows
+        self._clear_render_caches()
+        self.refresh()
+
+    def color_columns(self, colored_columns: dict[int, ColorBins]) -> None:
+        """Color the cells of columns (by index) by the bin of their value (heatmap)"""
+        self.colored_columns = colored_columns
+        self._clear_render_caches()
+        self.refresh()
+
+    def _bin_style(self, bin: int, highest_bin: int) -> Style:
+        """Background of a color bin: missing values, then from low to high values"""
+        key = (self.app.theme, bin, highest_bin)
+        style = self._bin_styles.get(key)
+        if style is None:
+            _, background = self.background_colors
+            if bin == 0:
+                color = (
+                    background
+                    + self.get_component_styles("csvtable--missing-cell").background
+                )
+            else:
+                low = (
+                    background
+                    + self.get_component_styles("csvtable--heat-low").background
+                )
+                high = (
+                    background
+                    + self.get_component_styles("csvtable--heat-high").background
+                )
+                color = low.blend(high, (bin - 1) / max(highest_bin - 1, 1))
+            style = self._bin_styles[key] = Style(bgcolor=color.rich_color)
+        return style
+
+    def _get_row_style(self, row_index: int, base_style: Style) -> Style:
+        row_style = super()._get_row_style(row_index, base_style)
+        if (
+            row_index >= 0
+            and self.marked_rows is not None
+            and self.marked_rows(row_index)
+        ):
+            row_style += self.get_component_styles("csvtable--marked-row").rich_style
+        return row_style
+
+    def _should_highlight(
+        self,
+        cursor: Coordinate,
+        target_cell: Coordinate,
+        type_of_cursor: CursorType,
+    ) -> bool:
+        selection = self.selection
+        if selection is not None:
+            row_start, row_stop, col_start, col_stop = selection
+            row, col = target_cell
+            return row_start <= row < row_stop and col_start <= col < col_stop
+        return super()._should_highlight(cursor, target_cell, type_of_cursor)
@@ -0,0 +1,66 @@
+from typing import Any, Optional
+
+import polars as pl
+from textual.coordinate import Coordinate
+from textual.widgets import DataTable
+
+
+class ResultTable(DataTable):
+    """
+    Read-only table of a query result.
+    Rows are added by pages as the cursor or the scroll gets close to the last
+    added row, so a large result doesn't build millions of rows up front.
+    A lazy result (ex: scanned from a file) is also collected page by page.
+    """
+
+    PAGE_SIZE = 500
+
+    def __init__(self, **kwargs: Any):
+        kwargs.setdefault("cursor_type", "cell")
+        kwargs.setdefault("zebra_stripes", True)
+        super().__init__(**kwargs)
+        self.result: Optional[pl.DataFrame | pl.LazyFrame] = None
+        self._result_rows = 0
+        self._loaded_rows = 0
+
+    def show_result(self, result: pl.DataFrame | pl.LazyFrame) -> None:
+        """Replace the table content with a query result"""
+        self.clear(columns=True)
+        self.result = result
+        self._loaded_rows = 0
+        if isinstance(result, pl.LazyFrame):
+            self._result_rows = result.select(pl.len()).collect().item()
+            columns = result.collect_schema().names()
+        else:
+            self._result_rows, columns = len(result), result.columns
+        for col_name in columns:
+            self.add_column(col_name, key=col_name)
+        self.load_more_rows()
+
+    def load_more_rows(self) -> None:
+        """Add the next page of rows of the result"""
+        if self.result is None or self._loaded_rows >= self._result_rows:
+            return
+        page = self.result.slice(self._loaded_rows, self.PAGE_SIZE)
+        if isinstance(page, pl.LazyFrame):
+            page = page.collect()
+        start = self._loaded_rows
+        # counted first: adding rows can move the cursor, which loads rows again
+        self._loaded_rows += len(page)
+        for i, row in enumerate(page.iter_rows(), start=start + 1):
+            self.add_row(*row, label=str(i))
+
+    def _load_rows_near(self, row: int) -> None:
+        if row >= self._loaded_rows - self.PAGE_SIZE // 5:
+            self.load_more_rows()
+
+    def watch_cursor_coordinate(
+        self, old_coordinate: Coordinate, new_coordinate: Coordinate
+    ) -> None:
+        self._load_rows_near(new_coordinate.row)
+        super().watch_cursor_coordinate(old_coordinate, new_coordinate)
+
+    def watch_scroll_y(self, old_value: float, new_value: float) -> None:
+        # scrolling without moving the cursor (mouse wheel, scrollbar)
+        self._load_rows_near(int(new_value) + self.scrollable_content_region.height)
+        super().watch_scroll_y(old_value, new_value)
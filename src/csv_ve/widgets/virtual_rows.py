@@ -0,0 +1,161 @@
+from collections.abc import Iterator, Mapping, Sequence
+from typing import Callable, Optional, overload
+
+from rich.text import Text
+from textual.widgets._data_table import CellType, ColumnKey, Row, RowKey
+
+# Values of the row at an index
+RowReader = Callable[[int], Sequence[CellType]]
+
+
+class VirtualRows:
+    """
+    Rows of a DataTable that are not stored: the row at index i has the key
+    RowKey(str(i)), a height of 1 and its number as label, its cells are read on demand.
+    The views below stand in for the row structures of DataTable (rows, _data,
+    _row_locations, ordered_rows, _y_offsets) with O(1) lookups, so a table of
+    millions of rows is set up in constant time and a row count change is free.
+    """
+
+    def __init__(self, count: int, read_row: RowReader):
+        """
+        Args:
+            count: Number of rows
+            read_row: Values of a row (in the order of the columns)
+        """
+        self.count = count
+        self.read_row = read_row
+
+    def index(self, key: object) -> Optional[int]:
+        """Index of a row key, None for keys of other rows (ex: the header)"""
+        value = getattr(key, "value", key)
+        if not isinstance(value, str) or not value.isdigit():
+            return None
+        row_idx = int(value)
+        return row_idx if row_idx < self.count else None
+
+    def key(self, row_idx: int) -> Optional[RowKey]:
+        return RowKey(str(row_idx)) if 0 <= row_idx < self.count else None
+
+    def row(self, row_idx: int) -> Row:
+        return Row(RowKey(str(row_idx)), 1, Text(str(row_idx + 1)))
+
+
+class RowLocations:
+    """Row key <-> index, like DataTable._row_locations (a TwoWayDict)"""
+
+    def __init__(self, rows: VirtualRows):
+        self._rows = rows
+
+    def get(self, key: RowKey) -> Optional[int]:
+        return self._rows.index(key)
+
+    def get_key(self, row_idx: int) -> Optional[RowKey]:
+        return self._rows.key(row_idx)
+
+    def contains_value(self, row_idx: int) -> bool:
+        return 0 <= row_idx < self._rows.count
+
+    def __contains__(self, key: object) -> bool:
+        return self._rows.index(key) is not None
+
+    def __len__(self) -> int:
+        return self._rows.count
+
+    def __iter__(self) -> Iterator[RowKey]:
+        return (RowKey(str(row_idx)) for row_idx in range(self._rows.count))
+
+
+class RowMetadata(Mapping[RowKey, Row]):
+    """Row key -> Row, like DataTable.rows"""
+
+    def __init__(self, rows: VirtualRows):
+        self._rows = rows
+
+    def __getitem__(self, key: RowKey) -> Row:
+        row_idx = self._rows.index(key)
+        if row_idx is None:
+            raise KeyError(key)
+        return self._rows.row(row_idx)
+
+    def __contains__(self, key: object) -> bool:
+        return self._rows.index(key) is not None
+
+    def __len__(self) -> int:
+        return self._rows.count
+
+    def __iter__(self) -> Iterator[RowKey]:
+        return (RowKey(str(row_idx)) for row_idx in range(self._rows.count))
+
+
+class RowCells(Mapping[RowKey, dict[ColumnKey, CellType]]):
+    """
+    Row key -> column key -> value, like DataTable._data.
+    The dict of a row is built when asked: writing to it changes nothing.
+    """
+
+    def __init__(self, rows: VirtualRows, column_keys: Callable[[], list[ColumnKey]]):
+        self._rows = rows
+        self._column_keys = column_keys
+
+    def __getitem__(self, key: RowKey) -> dict[ColumnKey, CellType]:
+        row_idx = self._rows.index(key)
+        if row_idx is None:
+            raise KeyError(key)
+        return dict(zip(self._column_keys(), self._rows.read_row(row_idx)))
+
+    def __contains__(self, key: object) -> bool:
+        return self._rows.index(key) is not None
+
+    def __len__(self) -> int:
+        return self._rows.count
+
+    def __iter__(self) -> Iterator[RowKey]:
+        return (RowKey(str(row_idx)) for row_idx in range(self._rows.count))
+
+
+class OrderedRows(Sequence[Row]):
+    """Rows in display order, like DataTable.ordered_rows. Slices are lazy too"""
+
+    def __init__(self, rows: VirtualRows, indices: Optional[range] = None):
+        self._rows = rows
+        self._indices = indices
+
+    @property
+    def indices(self) -> range:
+        return self._indices if self._indices is not None else range(self._rows.count)
+
+    @overload
+    def __getitem__(self, item: int) -> Row: ...
+
+    @overload
+    def __getitem__(self, item: slice) -> "OrderedRows": ...
+
+    def __getitem__(self, item: int | slice) -> "Row | OrderedRows":
+        if isinstance(item, slice):
+            return OrderedRows(self._rows, self.indices[item])
+        return self._rows.row(self.indices[item])
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __iter__(self) -> Iterator[Row]:
+        return (self._rows.row(row_idx) for row_idx in self.indices)
+
+
+class LineOffsets(Sequence[tuple[RowKey, int]]):
+    """(row key, line in the row) of each line, like DataTable._y_offsets: one line per row"""
+
+    def __init__(self, rows: VirtualRows):
+        self._rows = rows
+
+    def __getitem__(self, y: int) -> tuple[RowKey, int]:  # type: ignore[override]
+        if not 0 <= y < self._rows.count:
+            raise IndexError(y)
+        return RowKey(str(y)), 0
+
+    def __len__(self) -> int:
+        return self._rows.count
+
+    def clear(self) -> None:
+        pass
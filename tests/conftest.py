@@ -1,3 +1,7 @@
+import io
+import re
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import Mock, patch
 
 import pytest
@@ -58,3 +62,55 @@ def temp_txt(tmp_path):
     txt_file.write_text(txt_content)
 
     return txt_file
+
+
+## test_remote.py
+class RangeRequestHandler(SimpleHTTPRequestHandler):
+    """Static files with Range requests (single range), like an object store"""
+
+    def send_head(self):
+        match = re.fullmatch(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if match is None or self.command != "GET":
+            return super().send_head()
+        path = self.translate_path(self.path)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            self.send_error(404)
+            return None
+        start = int(match[1])
+        end = min(int(match[2] or len(data) - 1), len(data) - 1)
+        self.server.ranges.append((self.path, start, end))
+        self.send_response(206)
+        self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        return io.BytesIO(data[start : end + 1])
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def http_server(tmp_path):
+    """
+    Local HTTP server of the files of `server.directory` (a tmp dir) with Range
+    requests. Yields the server: `server.url` is its base URL, `server.ranges`
+    the (path, start, end) of the range requests it answered
+    """
+    directory = tmp_path / "served"
+    directory.mkdir()
+
+    def handler(*args, **kwargs):
+        return RangeRequestHandler(*args, directory=str(directory), **kwargs)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.ranges = []
+    server.directory = directory
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -1,5 +1,8 @@
+import json
 from io import StringIO
+from unittest.mock import DEFAULT, patch
 
+import pytest
 from dirty_equals import IsStr
 from rich.console import Console
 from typer.testing import CliRunner
@@ -88,6 +91,141 @@ class TestMainCommand:
         # assert "Missing argument" in result.stdout or "Error" in result.stdout
 
 
+class TestStdStreams:
+    """Test '-' for stdin and --output"""
+
+    @pytest.fixture(autouse=True)
+    def no_tty(self):
+        with patch("csv_ve.cli.reattach_terminal") as reattach:
+            yield reattach
+
+    def test_stdin(self, mock_app, no_tty):
+        opened = {}
+
+        def open_app(csv_path, theme):
+            # the spooled file is removed when the app closes
+            opened.update(path=csv_path, content=open(csv_path).read())
+            return DEFAULT
+
+        mock_app.side_effect = open_app
+
+        result = runner.invoke(csv_ve_cli, ["-"], input="a,b\n1,2\n")
+
+        assert result.exit_code == 0
+        assert opened["path"].endswith("stdin.csv")
+        assert opened["content"] == "a,b\n1,2\n"
+        no_tty.assert_called_once()
+
+    def test_stdin_to_stdout(self, mock_app):
+        result = runner.invoke(csv_ve_cli, ["-", "--output", "-"], input="a,b\n1,2\n")
+
+        assert result.exit_code == 0
+        assert result.stdout == "a,b\n1,2\n"
+
+    def test_output_file(self, temp_csv_with_headers, tmp_path, mock_app):
+        output = tmp_path / "out.csv"
+        result = runner.invoke(
+            csv_ve_cli, [str(temp_csv_with_headers), "-o", str(output)]
+        )
+
+        assert result.exit_code == 0
+        assert output.read_text() == temp_csv_with_headers.read_text()
+
+    def test_max_memory(self, mock_csv_path, mock_app):
+        result = runner.invoke(csv_ve_cli, ["test.csv", "--max-memory", "512M"])
+
+        assert result.exit_code == 0
+        mock_app.assert_called_once_with(
+            csv_path="test.csv",
+            theme=THEME_ALIASES["dark"],
+            memory_budget=512 * 1024**2,
+        )
+
+    def test_invalid_max_memory(self, mock_csv_path, mock_app):
+        result = runner.invoke(csv_ve_cli, ["test.csv", "-m", "lots"])
+
+        assert result.exit_code == 1
+        mock_app.assert_not_called()
+
+    def test_stdin_twice(self, mock_app):
+        result = runner.invoke(csv_ve_cli, ["-", "-"], input="a\n1\n")
+
+        assert result.exit_code == 1
+        mock_app.assert_not_called()
+
+    def test_output_with_several_files(self, temp_csv_with_headers, mock_app):
+        path = str(temp_csv_with_headers)
+        result = runner.invoke(csv_ve_cli, [path, path, "--output", "-"])
+
+        assert result.exit_code == 1
+        mock_app.assert_not_called()
+
+
+class TestDiffCommand:
+    """Test the diff subcommand"""
+
+    @pytest.fixture
+    def files(self, tmp_path):
+        old, new = tmp_path / "old.csv", tmp_path / "new.csv"
+        old.write_text("id,name\n1,a\n2,b\n3,c\n")
+        new.write_text("id,name\n1,a\n2,x\n4,d\n")
+        return str(old), str(new)
+
+    def test_csv_output(self, files):
+        result = runner.invoke(csv_ve_cli, ["diff", *files, "--key", "id", "-f", "csv"])
+
+        assert result.exit_code == 0
+        header, *lines = result.stdout.splitlines()
+        assert header == "change,old_row,new_row,changed_columns,id,name"
+        # written as they come, not sorted by row
+        assert sorted(lines) == [
+            'deleted,2,,"",3,c',
+            'inserted,,2,"",4,d',
+            "modified,1,1,name,2,x",
+        ]
+
+    def test_json_output_without_key(self, files):
+        result = runner.invoke(csv_ve_cli, ["diff", *files, "-f", "json"])
+
+        assert result.exit_code == 0
+        rows = [json.loads(line) for line in result.stdout.splitlines()]
+        assert sorted((row["change"], row["name"]) for row in rows) == [
+            ("deleted", "b"),
+            ("deleted", "c"),
+            ("inserted", "d"),
+            ("inserted", "x"),
+        ]
+
+    def test_unknown_key(self, files):
+        result = runner.invoke(csv_ve_cli, ["diff", *files, "-k", "nope", "-f", "csv"])
+
+        assert result.exit_code == 1
+        assert "Key column 'nope'" in result.stdout
+
+    def test_missing_file(self, files):
+        result = runner.invoke(csv_ve_cli, ["diff", files[0], "nonexistent.csv"])
+
+        assert result.exit_code == 1
+
+    def test_tui(self, files):
+        with patch("csv_ve.cli.DiffApp") as mock_diff_app:
+            result = runner.invoke(csv_ve_cli, ["diff", *files, "-k", "id"])
+
+        assert result.exit_code == 0
+        mock_diff_app.assert_called_once_with(
+            *files, ["id"], theme=THEME_ALIASES["dark"]
+        )
+        mock_diff_app.return_value.run.assert_called_once()
+
+    def test_open_is_the_default_command(self, mock_csv_path, mock_app):
+        result = runner.invoke(csv_ve_cli, ["-t", "light", "test.csv"])
+        assert result.exit_code == 0
+
+        result = runner.invoke(csv_ve_cli, ["open", "test.csv"])
+        assert result.exit_code == 0
+        mock_app.assert_called_with(csv_path="test.csv", theme=THEME_ALIASES["dark"])
+
+
 # Themes
 class TestResolveTheme:
     """Test the resolve_theme function"""
@@ -144,6 +282,49 @@ class TestIntegration:
         mock_app.assert_called_once()
         mock_app.return_value.run.assert_called_once()
 
+    def test_with_real_compressed_csv_file(self, tmp_path, mock_app):
+        """Compressed csv files are accepted"""
+        csv_path = tmp_path / "test_data.csv.gz"
+        csv_path.write_bytes(b"")
+
+        result = runner.invoke(csv_ve_cli, [str(csv_path)])
+
+        assert result.exit_code == 0
+        mock_app.assert_called_once()
+
+    def test_with_several_files(self, tmp_path, mock_app):
+        """Several files are opened as tabs"""
+        paths = [str(tmp_path / name) for name in ("a.csv", "b.csv")]
+        for path in paths:
+            open(path, "w").close()
+
+        result = runner.invoke(csv_ve_cli, paths)
+
+        assert result.exit_code == 0
+        mock_app.assert_called_once_with(csv_path=paths, theme=THEME_ALIASES["dark"])
+
+    def test_with_one_missing_file_among_several(self, temp_csv_with_headers, mock_app):
+        result = runner.invoke(
+            csv_ve_cli, [str(temp_csv_with_headers), "nonexistent.csv"]
+        )
+
+        assert result.exit_code == 1
+        mock_app.assert_not_called()
+
+    def test_with_url(self, mock_app):
+        """URLs are checked when they are opened, not for existence"""
+        url = "https://example.com/data.csv.gz"
+        result = runner.invoke(csv_ve_cli, [url])
+
+        assert result.exit_code == 0
+        mock_app.assert_called_once_with(csv_path=url, theme=THEME_ALIASES["dark"])
+
+    def test_with_unsupported_url(self, mock_app):
+        result = runner.invoke(csv_ve_cli, ["https://example.com/data.txt"])
+
+        assert result.exit_code == 1
+        mock_app.assert_not_called()
+
     def test_with_real_non_csv_file(self, temp_txt):
         """Test with a real temporary non-CSV file"""
         text_file = temp_txt
@@ -1,5 +1,6 @@
 # pytests for the file 'data_model.py' that manage the data from the file using Polars
 # We use a fixture in conftest.py that creates a 3x3 csv file
+from datetime import date
 from pathlib import Path
 from unittest.mock import patch
 
@@ -8,6 +9,12 @@ import pytest
 from dirty_equals import HasLen, IsInt
 from polars.testing import assert_series_equal
 
+from csv_ve.compression import (
+    COMPRESSION_SUFFIXES,
+    detect_compression,
+    open_compressed,
+    open_decompressed,
+)
 from csv_ve.data_model import CSVDataModel
 
 
@@ -77,6 +84,67 @@ class TestSave:
             model.save()
 
 
+class TestGetCell:
+    "test: get_cell()"
+
+    def test_get_cell_no_data(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+        model.df = None  # simulate no data
+
+        with pytest.raises(RuntimeError, match="No data loaded"):
+            model.get_cell(1, 1)
+
+    def test_get_cell_idx_out_of_bound(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+
+        with pytest.raises(IndexError, match="Row index 3 out of bounds"):
+            model.get_cell(3, 0)
+        with pytest.raises(IndexError, match="Column index 3 out of bounds"):
+            model.get_cell(0, 3)
+
+    def test_get_cell_returns_typed_value(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+
+        assert model.get_cell(0, 0) == "Alice"
+        assert model.get_cell(1, 1) == IsInt(exactly=25)
+
+
+class TestColumnIndex:
+    "test: column_index()"
+
+    def test_column_index_after_load(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+
+        assert model.column_index("name") == 0
+        assert model.column_index("city") == 2
+
+    def test_column_index_unknown_column(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+
+        with pytest.raises(KeyError, match="Column 'nope' not found"):
+            model.column_index("nope")
+
+    def test_column_index_follows_insert_and_delete(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+        assert model.df is not None
+
+        model.insert_column(1, "new")
+        assert model.column_index("new") == 1
+        assert model.column_index("age") == 2
+        assert model.column_index("city") == 3
+
+        model.delete_column(0)
+        for i, name in enumerate(model.df.columns):
+            assert model.column_index(name) == i
+
+    def test_column_index_rebuilt_when_df_replaced(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+        assert model.df is not None
+
+        model.df = model.df.rename({"age": "years"})
+        assert model.column_index("years") == 1
+
+
 class TestSetCell:
     "test: set_cell()"
 
@@ -129,6 +197,171 @@ class TestSetCell:
         assert model.df["age"].to_list() == HasLen(3)
         assert model.modified is True
 
+    def test_set_cell_coerces_string_to_column_dtype(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+        assert model.df is not None
+
+        model.set_cell(row_idx=0, col_idx=1, value=" 42 ")
+
+        assert model.df["age"].dtype == pl.Int64
+        assert model.df["age"][0] == IsInt(exactly=42)
+
+    def test_set_cell_rejects_invalid_value(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+        assert model.df is not None
+
+        with pytest.raises(ValueError, match="Invalid value 'abc' for column 'age'"):
+            model.set_cell(row_idx=0, col_idx=1, value="abc")
+
+        assert model.df["age"][0] == 30  # unchanged
+        assert model.modified is False
+
+    def test_set_cell_empty_string_is_null(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+        assert model.df is not None
+
+        model.set_cell(row_idx=0, col_idx=1, value="")
+
+        assert model.df["age"][0] is None
+
+    def test_set_cell_in_new_empty_column(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+        assert model.df is not None
+        model.insert_column(3, "notes")
+
+        model.set_cell(row_idx=1, col_idx=3, value="hello")
+
+        assert model.df["notes"].to_list() == [None, "hello", None]
+
+
+class TestParseValues:
+    "test: parse_values() and paste_values()"
+
+    def test_parse_values_typed_series(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+
+        parsed = model.parse_values(1, ["1", "", "3"])
+
+        assert parsed.dtype == pl.Int64
+        assert parsed.to_list() == [1, None, 3]
+
+    def test_parse_values_boolean_and_date(self, tmp_path):
+        csv_file = tmp_path / "typed.csv"
+        csv_file.write_text("flag,day\ntrue,2024-01-01\nfalse,2024-01-02")
+        model = CSVDataModel(csv_file)
+        assert model.df is not None
+        model.df = model.df.with_columns(pl.col("day").str.to_date())
+
+        assert model.parse_values(0, ["FALSE", "1"]).to_list() == [False, True]
+        assert model.parse_values(1, ["2025-03-04"]).dtype == pl.Date
+        with pytest.raises(ValueError):
+            model.parse_values(1, ["not a date"])
+
+    def test_parse_values_nested(self, tmp_path):
+        parquet_file = tmp_path / "nested.parquet"
+        pl.DataFrame({"tags": [[1, 2]], "point": [{"x": 1, "y": "a"}]}).write_parquet(
+            parquet_file
+        )
+        model = CSVDataModel(parquet_file)
+
+        assert model.parse_values(0, ["[3, 4]", ""]).to_list() == [[3, 4], None]
+        assert model.parse_values(1, ['{"x": 2, "y": "b"}']).to_list() == [
+            {"x": 2, "y": "b"}
+        ]
+        with pytest.raises(ValueError, match="tags"):
+            model.parse_values(0, ["[1, 2"])
+        with pytest.raises(ValueError):
+            model.set_cell(0, 0, "not json")
+        assert model.df["tags"].to_list() == [[1, 2]]
+
+    def test_parser_is_cached_per_column(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+
+        model.parse_values(1, ["1"])
+        parser = model._parsers[("age", pl.Int64)]
+        model.parse_values(1, ["2"])
+
+        assert model._parsers[("age", pl.Int64)] is parser
+
+    def test_paste_values_writes_block(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+        assert model.df is not None
+
+        model.paste_values(1, 1, ["7", "8"])
+
+        assert model.df["age"].to_list() == [30, 7, 8]
+        assert model.modified is True
+
+    def test_paste_values_out_of_bound(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+
+        with pytest.raises(IndexError, match="Row index 2 out of bounds"):
+            model.paste_values(2, 1, ["7", "8"])
+
+
+class TestRanges:
+    "test: get_range(), set_range(), fill_range() and clear_range()"
+
+    def test_range_out_of_bound(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+
+        with pytest.raises(IndexError, match="Row range 2:4 out of bounds"):
+            model.fill_range(2, 4, 0, 1, "x")
+        with pytest.raises(IndexError, match="Column range 0:4 out of bounds"):
+            model.clear_range(0, 1, 0, 4)
+
+    def test_get_range(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+
+        block = model.get_range(1, 3, 0, 2)
+
+        assert block.rows() == [("Bob", 25), ("Charlie", 35)]
+
+    def test_set_range_writes_block(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+        assert model.df is not None
+
+        model.set_range(0, 1, [["1", "Rome"], ["2", "Oslo"]])
+
+        assert model.df["age"].to_list() == [1, 2, 35]
+        assert model.df["city"].to_list() == ["Rome", "Oslo", "Berlin"]
+        assert model.modified is True
+
+    def test_set_range_is_atomic(self, temp_csv_with_headers):
+        "a bad value in any column should not write the other columns"
+        model = CSVDataModel(temp_csv_with_headers)
+        assert model.df is not None
+
+        with pytest.raises(ValueError):
+            model.set_range(0, 0, [["Zoe", "not a number"]])
+
+        assert model.df["name"][0] == "Alice"
+        assert model.modified is False
+
+    def test_set_range_ragged_rows(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+
+        with pytest.raises(ValueError, match="same length"):
+            model.set_range(0, 0, [["a", "1"], ["b"]])
+
+    def test_fill_range(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+        assert model.df is not None
+
+        model.fill_range(1, 3, 1, 2, "50")
+
+        assert model.df["age"].to_list() == [30, 50, 50]
+
+    def test_clear_range(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+        assert model.df is not None
+
+        model.clear_range(0, 2, 0, 3)
+
+        assert model.df.row(0) == (None, None, None)
+        assert model.df.row(1) == (None, None, None)
+        assert model.df.row(2) == ("Charlie", 35, "Berlin")
+
 
 class TestRowCount:
     "test: row_count()"
@@ -294,6 +527,140 @@ class TestInsertColumn:
         assert model.df["Test_Col"].to_list() == [None, None, None]
 
 
+class TestComputedColumns:
+    "test: insert_computed_column() and cast_column()"
+
+    @pytest.fixture
+    def model(self, tmp_path):
+        csv_file = tmp_path / "orders.csv"
+        csv_file.write_text(
+            "item,price,qty,day\npen,1.5,2,2024-01-02\nink,4,1,2024-01-03\n"
+        )
+        return CSVDataModel(csv_file)
+
+    def test_computed_column(self, model):
+        model.insert_computed_column(3, "total", "price * qty")
+        assert model.df.columns == ["item", "price", "qty", "total", "day"]
+        assert model.df["total"].to_list() == [3.0, 4.0]
+        assert model.computed_columns == {"total": "price * qty"}
+        assert model.column_index("day") == 4
+
+    def test_evaluated_again_after_edits(self, model):
+        model.insert_computed_column(3, "total", "price * qty")
+        model.insert_computed_column(4, "share", "total / sum(total)")
+        model.set_cell(1, 2, "4")
+        assert model.df["total"].to_list() == [3.0, 16.0]
+        assert model.df["share"].to_list() == [3 / 19, 16 / 19]
+
+        model.delete_row(1)
+        assert model.df["share"].to_list() == [1.0]
+
+    def test_invalid_expressions(self, model):
+        with pytest.raises(ValueError, match="Invalid expression"):
+            model.insert_computed_column(0, "x", "price *")
+        with pytest.raises(KeyError, match="Column 'cost' not found"):
+            model.insert_computed_column(0, "x", "cost * qty")
+        with pytest.raises(ValueError, match="already exists"):
+            model.insert_computed_column(0, "qty", "qty + 1")
+        assert model.df.columns == ["item", "price", "qty", "day"]
+
+    def test_deleted_input_makes_plain_values(self, model):
+        model.insert_computed_column(3, None, "price * qty")
+        assert model.df.columns[3] == "Column_1"
+        model.delete_column(2)
+        assert model.computed_columns == {}
+        assert model.df["Column_1"].to_list() == [3.0, 4.0]
+
+    def test_cast_column(self, model):
+        model.cast_column(2, "float")
+        assert model.df.schema["qty"] == pl.Float64
+
+        model.insert_computed_column(4, "d", "day")
+        model.cast_column(3, "date")
+        assert model.df["day"].to_list() == [date(2024, 1, 2), date(2024, 1, 3)]
+        assert model.df.schema["d"] == pl.String  # computed columns keep their type
+
+    def test_cast_invalid(self, model):
+        with pytest.raises(ValueError, match="Invalid value 'pen'"):
+            model.cast_column(0, "int")
+        with pytest.raises(ValueError, match="Unknown type"):
+            model.cast_column(1, "decimal128")
+        assert model.df.schema["item"] == pl.String
+
+
+class TestReplace:
+    "test: replace_all() and undo()"
+
+    @pytest.fixture
+    def model(self, tmp_path):
+        csv_file = tmp_path / "people.csv"
+        csv_file.write_text(
+            "name,city,age\nAnna,New York,30\nBob,York,25\nAnn,Paris,41\n"
+        )
+        return CSVDataModel(csv_file)
+
+    def test_literal_replace(self, model):
+        assert model.replace_all("York", "Jersey") == 2
+        assert model.df["city"].to_list() == ["New Jersey", "Jersey", "Paris"]
+        assert model.modified
+
+    def test_regex_and_range(self, model):
+        count = model.replace_all(r"^(An+)", "<$1>", regex=True, row_stop=2)
+        assert count == 1
+        assert model.df["name"].to_list() == ["<Ann>a", "Bob", "Ann"]
+
+    def test_column_scope_and_text_columns(self, model):
+        assert model.replace_all("o", "0", col_start=1, col_stop=2) == 2
+        assert model.df["name"].to_list() == ["Anna", "Bob", "Ann"]
+        # numbers are not text
+        assert model.replace_all("4", "5") == 0
+        assert model.df["age"].to_list() == [30, 25, 41]
+
+    def test_replaced_by_nothing_is_empty(self, model):
+        model.replace_all("Paris", "")
+        assert model.df["city"][2] is None
+
+    def test_invalid(self, model):
+        with pytest.raises(ValueError, match="Invalid pattern"):
+            model.replace_all("(", "x", regex=True)
+        with pytest.raises(ValueError, match="Nothing to find"):
+            model.replace_all("", "x")
+        with pytest.raises(IndexError):
+            model.replace_all("a", "b", row_stop=10)
+
+    def test_undo(self, model):
+        before = model.df
+        model.replace_all("n", "N")
+        assert model.can_undo()
+        assert model.undo() == "replace 'n'"
+        assert model.df.equals(before)
+        with pytest.raises(RuntimeError, match="Nothing to undo"):
+            model.undo()
+
+    def test_undo_after_a_replace_without_match(self, model):
+        before = model.df
+        model.replace_all("n", "N")
+        version = model.version
+        assert model.replace_all("Zürich", "Bern") == 0
+        assert model.version == version
+        assert model.undo() == "replace 'n'"
+        assert model.df.equals(before)
+
+    def test_no_undo_after_another_edit(self, model):
+        model.replace_all("n", "N")
+        model.set_cell(0, 2, "31")
+        assert not model.can_undo()
+        with pytest.raises(RuntimeError, match="Nothing to undo"):
+            model.undo()
+
+    def test_indexes_follow(self, model):
+        duplicates = model.duplicate_index(["city"])
+        model.replace_all("New ", "")
+        assert duplicates.duplicate_count() == 2
+        model.undo()
+        assert duplicates.duplicate_count() == 0
+
+
 class TestDeleteRow:
     "test: delete_row()"
 
@@ -342,6 +709,83 @@ class TestDeleteRow:
         assert model.modified is True
 
 
+class TestBulkRowsCols:
+    "test: insert_rows(), delete_rows() and delete_columns()"
+
+    def test_insert_rows(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+        assert model.df is not None
+
+        model.insert_rows(1, 3)
+
+        assert model.df.shape == (6, 3)
+        assert model.df["name"].to_list() == [
+            "Alice",
+            None,
+            None,
+            None,
+            "Bob",
+            "Charlie",
+        ]
+        assert model.df.schema == pl.Schema(
+            {"name": pl.String, "age": pl.Int64, "city": pl.String}
+        )
+
+    def test_insert_rows_count_positive(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+
+        with pytest.raises(ValueError, match="must be positive"):
+            model.insert_rows(0, 0)
+
+    def test_delete_rows_range(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+        assert model.df is not None
+
+        model.delete_rows(0, 2)
+
+        assert model.df["name"].to_list() == ["Charlie"]
+        assert model.modified is True
+
+    def test_delete_rows_indices(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+        assert model.df is not None
+
+        model.delete_rows([0, 2])
+
+        assert model.df["name"].to_list() == ["Bob"]
+
+    def test_delete_rows_out_of_bound(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+
+        with pytest.raises(IndexError, match="Row index 3 out of bounds"):
+            model.delete_rows(1, 4)
+        with pytest.raises(IndexError, match="Row index 5 out of bounds"):
+            model.delete_rows([0, 5])
+
+    def test_delete_rows_cant_delete_every_row(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+
+        with pytest.raises(ValueError, match="Cannot delete the last remaining row"):
+            model.delete_rows(0, 3)
+        with pytest.raises(ValueError, match="Cannot delete the last remaining row"):
+            model.delete_rows([0, 1, 2])
+
+    def test_delete_columns(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+        assert model.df is not None
+
+        model.delete_columns([0, 2])
+
+        assert model.df.columns == ["age"]
+        assert model.column_index("age") == 0
+
+    def test_delete_columns_cant_delete_every_column(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+
+        with pytest.raises(ValueError, match="Cannot delete the last remaining column"):
+            model.delete_columns([0, 1, 2])
+
+
 class TestDeleteCol:
     "test: delete_column()"
 
@@ -390,3 +834,214 @@ class TestDeleteCol:
 
         assert len(model.df.columns) == 2
         assert model.modified is True
+
+
+class TestCompressedFiles:
+    "test: load() and save() of compressed csv files"
+
+    @pytest.mark.parametrize("suffix", [".gz", ".bz2", ".xz", ".zst"])
+    def test_load_and_save_keep_compression(self, tmp_path, suffix):
+        if suffix == ".zst":
+            pytest.importorskip("zstandard")
+        csv_file = tmp_path / f"data.csv{suffix}"
+        compression = COMPRESSION_SUFFIXES[suffix]
+        with open_compressed(csv_file, compression) as f:
+            f.write(b"name,age\nAlice,30\nBob,25\n")
+
+        model = CSVDataModel(csv_file)
+        assert model.compression == compression
+        assert model.df is not None
+        assert model.df.shape == (2, 2)
+
+        model.set_cell(0, 1, "31")
+        model.save()
+
+        assert detect_compression(csv_file) == compression
+        with open_decompressed(csv_file, compression) as f:
+            assert f.read() == b"name,age\nAlice,31\nBob,25\n"
+
+    @pytest.mark.parametrize("suffix", [".gz", ".bz2"])
+    def test_latin_1(self, tmp_path, suffix):
+        csv_file = tmp_path / f"data.csv{suffix}"
+        compression = COMPRESSION_SUFFIXES[suffix]
+        with open_compressed(csv_file, compression) as f:
+            f.write("nom,âge\nÉlodie,30\n".encode("latin-1"))
+
+        model = CSVDataModel(csv_file)
+        assert model.df.columns == ["nom", "âge"]
+        assert model.df["nom"].to_list() == ["Élodie"]
+
+        model.set_cell(0, 1, "31")
+        model.save()
+
+        assert detect_compression(csv_file) == compression
+        with open_decompressed(csv_file, compression) as f:
+            assert f.read() == "nom,âge\nÉlodie,31\n".encode("latin-1")
+
+    def test_compression_detected_from_magic_bytes(self, tmp_path):
+        csv_file = tmp_path / "data.csv"
+        with open_compressed(csv_file, "gzip") as f:
+            f.write(b"name\nAlice\n")
+
+        model = CSVDataModel(csv_file)
+
+        assert model.compression == "gzip"
+        assert model.df is not None
+        assert model.df["name"].to_list() == ["Alice"]
+
+
+class TestQuery:
+    "test: query()"
+
+    def test_select_where(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+        result = model.query("SELECT name FROM data WHERE age > 28 ORDER BY age")
+
+        assert isinstance(result, pl.LazyFrame)
+        assert result.collect()["name"].to_list() == ["Alice", "Charlie"]
+
+    def test_aggregate(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+        result = model.query("SELECT count(*) AS n, max(age) AS oldest FROM data")
+        assert result.collect().row(0) == (3, 35)
+
+    def test_sees_unsaved_edits(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+        model.set_cell(0, 0, "Zoe")
+        result = model.query("SELECT name FROM data WHERE age = 30").collect()
+        assert result["name"].to_list() == ["Zoe"]
+
+    def test_spilled_data(self, temp_csv_with_headers, tmp_path):
+        model = CSVDataModel(temp_csv_with_headers)
+        model.spill(tmp_path)
+        assert model.query("SELECT * FROM data").collect().height == 3
+        assert model.spilled
+
+    def test_invalid_query(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+        with pytest.raises(pl.exceptions.PolarsError):
+            model.query("SELEC name FROM data").collect()
+
+
+class TestSummary:
+    "test: summarize() and group_rows()"
+
+    @pytest.fixture
+    def model(self, tmp_path):
+        csv_file = tmp_path / "sales.csv"
+        csv_file.write_text(
+            "city,product,qty\nParis,a,1\nBerlin,b,2\nParis,b,3\nParis,a,4\n"
+        )
+        return CSVDataModel(csv_file)
+
+    def test_count_per_group(self, model):
+        summary = model.summarize(["city"])
+        assert summary.to_dicts() == [
+            {"city": "Berlin", "count": 1},
+            {"city": "Paris", "count": 3},
+        ]
+
+    def test_aggregations(self, model):
+        summary = model.summarize(["city", "product"], [("qty", "sum"), ("qty", "max")])
+        assert summary.columns == ["city", "product", "count", "qty_sum", "qty_max"]
+        assert summary.row(1) == ("Paris", "a", 2, 5, 4)
+
+    def test_spilled_data(self, model, tmp_path):
+        model.spill(tmp_path)
+        assert model.summarize(["city"]).height == 2
+        assert model.spilled
+
+    def test_errors(self, model):
+        with pytest.raises(ValueError, match="group-by"):
+            model.summarize([])
+        with pytest.raises(KeyError):
+            model.summarize(["country"])
+        with pytest.raises(ValueError, match="Unknown aggregation"):
+            model.summarize(["city"], [("qty", "drop")])
+
+    def test_group_rows(self, model):
+        assert model.group_rows(["city"], ["Paris"]) == [0, 2, 3]
+        assert model.group_rows(["city", "product"], ("Paris", "b")) == [2]
+        assert model.group_rows(["city"], ["Rome"]) == []
+
+    def test_group_rows_are_cached_until_an_edit(self, model):
+        model.group_rows(["city"], ["Paris"])
+        with patch.object(pl.LazyFrame, "group_by") as group_by:
+            assert model.group_rows(["city"], ["Berlin"]) == [1]
+            group_by.assert_not_called()
+
+        model.set_cell(1, 0, "Paris")
+        assert model.group_rows(["city"], ["Paris"]) == [0, 1, 2, 3]
+
+    def test_version(self, model):
+        version = model.version
+        model.set_cell(0, 0, "Rome")
+        model.insert_rows(0, 2)
+        assert model.version == version + 2
+        with pytest.raises(ValueError):
+            model.set_cell(0, 2, "not a number")
+        assert model.version == version + 2
+
+
+class TestDiffWithDisk:
+    "test: diff_with_disk()"
+
+    def test_no_changes(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+        assert model.diff_with_disk().is_empty()
+
+    def test_rows_matched_by_row_id(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+        model.insert_rows(0, 1)  # shifts every row
+        model.set_cell(2, 1, "26")  # Bob
+        model.delete_row(3)  # Charlie
+
+        diff = model.diff_with_disk()
+        assert list(diff.rows.select("change", "old_row", "new_row").iter_rows()) == [
+            ("inserted", None, 0),
+            ("modified", 1, 2),
+            ("deleted", 2, None),
+        ]
+        assert diff.rows["changed_columns"].to_list() == [[], ["age"], []]
+
+    def test_columns(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+        model.insert_column(0, "id")
+        model.delete_column(model.column_index("city"))
+
+        diff = model.diff_with_disk()
+        assert diff.added_columns == ["id"]
+        assert diff.deleted_columns == ["city"]
+        assert diff.rows.is_empty()
+
+    def test_writing_a_new_column_keeps_the_row_ids(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+        model.delete_row(0)
+        model.insert_column(2)
+        model.set_cell(0, 2, "x")  # the empty column becomes a text column
+
+        diff = model.diff_with_disk()
+        assert (diff.inserted, diff.deleted, diff.modified) == (0, 1, 0)
+        assert diff.rows["old_row"].to_list() == [0]
+
+    def test_empty_after_save(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+        model.insert_rows(1, 2)
+        model.set_cell(0, 0, "Zoe")
+        model.save()
+
+        assert model.diff_with_disk().is_empty()
+        model.set_cell(3, 0, "Yan")
+        assert model.diff_with_disk().modified == 1
+
+    def test_file_changed_on_disk(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+        temp_csv_with_headers.write_text(
+            "name,age,city\nBob,25,London\nAlice,30,Paris\nDan,40,Rome\n"
+        )
+        # row ids don't match the file anymore: rows are matched by hash
+        diff = model.diff_with_disk()
+        assert list(diff.rows.select("change", "old_row", "new_row").iter_rows()) == [
+            ("inserted", None, 2),
+            ("deleted", 2, None),
+        ]
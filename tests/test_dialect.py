@@ -0,0 +1,137 @@
+# pytests for the file 'dialect.py': detection of the delimiter, quoting, header, encoding and line endings
+import codecs
+import gzip
+import time
+
+import pytest
+
+from csv_ve.data_model import CSVDataModel
+from csv_ve.dialect import SNIFF_SIZE, Dialect, sniff_bytes, sniff_dialect
+
+
+class TestSniffBytes:
+    "test: sniff_bytes()"
+
+    def test_default_dialect(self):
+        assert sniff_bytes(b"name,age\nAlice,30\nBob,25\n") == Dialect()
+
+    def test_empty_file(self):
+        assert sniff_bytes(b"") == Dialect()
+
+    @pytest.mark.parametrize("delimiter", [";", "\t", "|"])
+    def test_delimiter(self, delimiter):
+        data = delimiter.join(["name", "age"]) + "\nAlice" + delimiter + "30\n"
+        assert sniff_bytes(data.encode()).delimiter == delimiter
+
+    def test_quote_char(self):
+        data = b"name,city\n'Smith, John','Paris'\n'Doe, Jane','Berlin'\n"
+        dialect = sniff_bytes(data)
+        assert dialect.delimiter == ","
+        assert dialect.quote_char == "'"
+
+    def test_no_header(self):
+        assert sniff_bytes(b"1,2\n3,4\n5,6\n").has_header is False
+        assert sniff_bytes(b"a,1\nb,2\n").has_header is False
+
+    def test_header_over_numbers(self):
+        assert sniff_bytes(b"x,y\n1,2\n3,4\n").has_header is True
+
+    def test_crlf(self):
+        assert sniff_bytes(b"a,b\r\n1,2\r\n").line_terminator == "\r\n"
+
+    def test_utf8_bom(self):
+        dialect = sniff_bytes(codecs.BOM_UTF8 + "nom,ville\nÉlodie,Lyon\n".encode())
+        assert dialect.encoding == "utf-8"
+        assert dialect.bom is True
+
+    def test_utf16_bom(self):
+        data = codecs.BOM_UTF16_LE + "a;b\n1;2\n".encode("utf-16-le")
+        dialect = sniff_bytes(data)
+        assert dialect.encoding == "utf-16-le"
+        assert dialect.delimiter == ";"
+
+    def test_latin1(self):
+        assert sniff_bytes("nom,ville\nÉlodie,Lyon\n".encode("latin-1")).encoding == (
+            "latin-1"
+        )
+
+    def test_prefix_cut_in_the_middle_of_a_character(self):
+        line = "é,1\n".encode()
+        data = b"name,n\n" + line * (SNIFF_SIZE // len(line))
+        assert sniff_bytes(data[:SNIFF_SIZE]).encoding == "utf-8"
+
+    def test_quoted_last_column_is_fast(self):
+        # csv.Sniffer takes seconds on a whole prefix of such lines
+        line = b'1,foo,bar,"Smith, John N"\n'
+        data = b"id,a,b,name\n" + line * (SNIFF_SIZE // len(line) + 1)
+        start = time.perf_counter()
+        dialect = sniff_bytes(data[:SNIFF_SIZE])
+        assert time.perf_counter() - start < 0.5
+        assert dialect.delimiter == ","
+        assert dialect.quote_char == '"'
+        assert dialect.has_header
+
+
+class TestSniffDialect:
+    "test: sniff_dialect()"
+
+    def test_reads_only_a_prefix(self, tmp_path):
+        path = tmp_path / "big.csv"
+        # the first line past the prefix would break the sniffing
+        path.write_bytes(b"a;b\n1;2\n" * (SNIFF_SIZE // 8) + b"x,y,z,w\n" * 1000)
+        assert sniff_dialect(path).delimiter == ";"
+
+    def test_cached_until_the_file_changes(self, tmp_path):
+        path = tmp_path / "data.csv"
+        path.write_text("a;b\n1;2\n")
+        dialect = sniff_dialect(path)
+        assert sniff_dialect(path) is dialect
+
+        path.write_text("a|b|c\n1|2|3\n")
+        assert sniff_dialect(path).delimiter == "|"
+
+
+class TestRoundTrip:
+    "test: the dialect is kept when the file is loaded and saved"
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            b"name;age\r\nAlice;30\r\nBob;25\r\n",
+            b"name\tage\nAlice\t30\nBob\t25\n",
+            codecs.BOM_UTF8 + "nom,âge\nÉlodie,30\n".encode(),
+            "nom|âge\nÉlodie|30\n".encode("latin-1"),
+            codecs.BOM_UTF16_LE + "nom,âge\nÉlodie,30\n".encode("utf-16-le"),
+            b"1,2\n3,4\n",
+        ],
+    )
+    def test_save_unchanged(self, tmp_path, data):
+        path = tmp_path / "data.csv"
+        path.write_bytes(data)
+        model = CSVDataModel(str(path))
+        model.save()
+        assert path.read_bytes() == data
+
+    def test_edit_and_save(self, tmp_path):
+        path = tmp_path / "data.tsv"
+        path.write_bytes(b"name\tage\nAlice\t30\n")
+        model = CSVDataModel(str(path))
+        assert model.df.columns == ["name", "age"]
+        model.set_cell(0, 1, "31")
+        model.save()
+        assert path.read_bytes() == b"name\tage\nAlice\t31\n"
+
+    def test_no_header(self, tmp_path):
+        path = tmp_path / "data.csv"
+        path.write_bytes(b"1,2\n3,4\n")
+        model = CSVDataModel(str(path))
+        assert model.has_header is False
+        assert model.row_count() == 2
+
+    def test_compressed(self, tmp_path):
+        path = tmp_path / "data.csv.gz"
+        path.write_bytes(gzip.compress(b"name;age\nAlice;30\n"))
+        model = CSVDataModel(str(path))
+        assert model.get_cell(0, 0) == "Alice"
+        model.save()
+        assert gzip.decompress(path.read_bytes()) == b"name;age\nAlice;30\n"
@@ -0,0 +1,133 @@
+# pytests for the file 'diff.py': row and column differences between two frames
+import polars as pl
+import pytest
+
+from csv_ve.diff import (
+    DELETED,
+    INSERTED,
+    MODIFIED,
+    Diff,
+    column_changes,
+    diff_files,
+    diff_lazy,
+)
+
+OLD = pl.LazyFrame(
+    {"id": [1, 2, 3, 5], "name": ["a", "b", "c", "e"], "qty": [1, 2, 3, 4]}
+)
+NEW = pl.LazyFrame(
+    {"id": [2, 3, 4, 5], "name": ["b", "x", "d", "e"], "qty": [2, 3, 4, 9]}
+)
+
+
+def changes(df: pl.DataFrame) -> list[tuple]:
+    return list(df.select("change", "old_row", "new_row").iter_rows())
+
+
+class TestDiffLazy:
+    "test: diff_lazy()"
+
+    def test_with_key(self):
+        diff = diff_lazy(OLD, NEW, on=["id"]).collect()
+        assert changes(diff) == [
+            (MODIFIED, 2, 1),
+            (INSERTED, None, 2),
+            (MODIFIED, 3, 3),
+            (DELETED, 0, None),
+        ]
+        assert diff["changed_columns"].to_list() == [["name"], [], ["qty"], []]
+        # new values, old values for deleted rows
+        assert diff["name"].to_list() == ["x", "d", "e", "a"]
+
+    def test_without_key(self):
+        diff = diff_lazy(OLD, NEW).collect()
+        assert changes(diff) == [
+            (INSERTED, None, 1),
+            (INSERTED, None, 2),
+            (INSERTED, None, 3),
+            (DELETED, 0, None),
+            (DELETED, 2, None),
+            (DELETED, 3, None),
+        ]
+
+    def test_reordered_and_repeated_rows(self):
+        old = pl.LazyFrame({"a": [1, 2, 2, 3]})
+        new = pl.LazyFrame({"a": [3, 2, 1, 2, 2]})
+        assert changes(diff_lazy(old, new).collect()) == [(INSERTED, None, 4)]
+
+    def test_identical(self):
+        assert diff_lazy(OLD, OLD, on=["id"]).collect().is_empty()
+        assert diff_lazy(OLD, OLD).collect().is_empty()
+
+    def test_different_types_are_compared_as_text(self):
+        new = NEW.with_columns(pl.col("qty").cast(pl.String))
+        diff = diff_lazy(OLD, new, on=["id"]).collect()
+        assert diff["changed_columns"].to_list() == [["name"], [], ["qty"], []]
+
+    def test_only_common_columns_are_compared(self):
+        new = NEW.with_columns(pl.lit("z").alias("extra")).drop("qty")
+        diff = diff_lazy(OLD, new, on=["id"]).collect()
+        assert "extra" not in diff.columns
+        assert diff["changed_columns"].to_list() == [["name"], [], []]
+
+    def test_duplicate_key(self):
+        old = pl.LazyFrame({"id": [1, 1], "v": [1, 2]})
+        with pytest.raises(pl.exceptions.ComputeError):
+            diff_lazy(old, old, on=["id"]).collect()
+
+    def test_missing_key(self):
+        with pytest.raises(KeyError):
+            diff_lazy(OLD, NEW, on=["nope"])
+
+    def test_unordered(self):
+        for on in (["id"], None):
+            ordered = diff_lazy(OLD, NEW, on=on).collect()
+            unordered = diff_lazy(OLD, NEW, on=on, ordered=False).collect()
+            assert sorted(changes(unordered), key=str) == sorted(
+                changes(ordered), key=str
+            )
+
+    def test_streaming(self):
+        diff = diff_lazy(OLD, NEW, on=["id"]).collect(engine="streaming")
+        assert diff.height == 4
+
+
+class TestDiff:
+    "test: Diff and column_changes()"
+
+    def test_column_changes(self):
+        assert column_changes(["a", "b", "c"], ["a", "c", "d"]) == (["d"], ["b"])
+
+    def test_summary(self):
+        diff = Diff(diff_lazy(OLD, NEW, on=["id"]).collect(), ["extra"], [])
+        assert (diff.inserted, diff.deleted, diff.modified) == (1, 1, 2)
+        assert (
+            diff.summary() == "1 inserted, 1 deleted, 2 modified rows | +1 -0 columns"
+        )
+        assert not diff.is_empty()
+
+    def test_lazy_rows(self):
+        diff = Diff(diff_lazy(OLD, NEW, on=["id"]))
+        assert (diff.inserted, diff.deleted, diff.modified) == (1, 1, 2)
+        assert [diff.new_row(i) for i in range(4)] == [1, 2, 3, None]
+        assert Diff(diff_lazy(OLD, OLD)).is_empty()
+
+
+class TestDiffFiles:
+    "test: diff_files()"
+
+    def test_files_of_different_formats(self, tmp_path):
+        old, new = tmp_path / "old.csv", tmp_path / "new.parquet"
+        OLD.collect().write_csv(old)
+        NEW.with_columns(pl.lit(0).alias("extra")).collect().write_parquet(new)
+
+        rows, added, deleted = diff_files(old, new, ["id"])
+        assert isinstance(rows, pl.LazyFrame)
+        assert (added, deleted) == (["extra"], [])
+        assert rows.collect(engine="streaming").height == 4
+
+    def test_unsupported_format(self, tmp_path):
+        txt = tmp_path / "a.txt"
+        txt.write_text("hello")
+        with pytest.raises(ValueError):
+            diff_files(txt, txt)
@@ -0,0 +1,169 @@
+# pytests for the file 'edit_log.py': the write-ahead log used to recover unsaved edits
+from csv_ve.data_model import CSVDataModel
+from csv_ve.edit_log import EditLog
+
+
+class TestEditLog:
+    "test: EditLog append/ flush/ pending/ discard"
+
+    def test_log_is_next_to_the_file(self, temp_csv_with_headers):
+        log = EditLog(temp_csv_with_headers)
+
+        assert log.path.parent == temp_csv_with_headers.parent
+        assert log.path.name == ".test_data.csv.csv-ve.wal"
+
+    def test_append_is_buffered_until_flush(self, temp_csv_with_headers):
+        log = EditLog(temp_csv_with_headers, flush_interval=60)
+
+        log.append("set_cell", (0, 0, "Zoe"), {})
+        assert not log.path.exists()
+
+        log.flush()
+        assert log.pending() == [("set_cell", [0, 0, "Zoe"], {})]
+        log.close()
+
+    def test_background_flush(self, temp_csv_with_headers):
+        log = EditLog(temp_csv_with_headers, flush_interval=0.01)
+
+        log.append("delete_rows", (range(0, 2),), {})
+        log._closed.wait(0.2)
+
+        assert log.pending() == [("delete_rows", [[0, 1]], {})]
+        log.close()
+
+    def test_torn_record_is_ignored(self, temp_csv_with_headers):
+        log = EditLog(temp_csv_with_headers)
+        log.append("set_cell", (0, 0, "Zoe"), {})
+        log.append("set_cell", (1, 0, "Max"), {})
+        log.close()
+
+        # simulate a crash in the middle of the last write
+        data = log.path.read_bytes()
+        log.path.write_bytes(data[:-3])
+
+        assert log.pending() == [("set_cell", [0, 0, "Zoe"], {})]
+
+    def test_log_of_another_file_version_is_ignored(self, temp_csv_with_headers):
+        log = EditLog(temp_csv_with_headers)
+        log.append("set_cell", (0, 0, "Zoe"), {})
+        log.close()
+
+        temp_csv_with_headers.write_text("name\nSomeone else")
+
+        assert log.pending() == []
+
+    def test_discard_removes_log(self, temp_csv_with_headers):
+        log = EditLog(temp_csv_with_headers)
+        log.append("set_cell", (0, 0, "Zoe"), {})
+        log.flush()
+
+        log.append("set_cell", (1, 0, "Max"), {})
+        log.discard()
+        log.close()
+
+        assert not log.path.exists()
+        assert log.pending() == []
+
+    def test_unwritable_log_keeps_the_edits(self, temp_csv_with_headers):
+        log = EditLog(temp_csv_with_headers, flush_interval=0.01)
+        log.path.mkdir()  # can't be opened as a file
+
+        log.append("set_cell", (0, 0, "Zoe"), {})
+        log.flush()
+        assert log.failed
+        assert isinstance(log.error, OSError)
+
+        # the background flush survives the failure
+        log.append("set_cell", (1, 0, "Max"), {})
+        log._closed.wait(0.1)
+        assert log._thread.is_alive()
+
+        log.path.rmdir()
+        log.close()
+        assert not log.failed
+        assert log.pending() == [
+            ("set_cell", [0, 0, "Zoe"], {}),
+            ("set_cell", [1, 0, "Max"], {}),
+        ]
+
+
+class TestModelRecovery:
+    "test: edits are logged by CSVDataModel and replayed on the next open"
+
+    def test_edits_are_replayed(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers, edit_log=True)
+        model.set_cell(0, 1, "31")
+        model.fill_range(1, 3, 2, 3, "Rome")
+        model.delete_rows([0])
+        model.insert_column(1, "notes")
+        model.close()  # the session is killed without saving
+
+        recovered = CSVDataModel(temp_csv_with_headers, edit_log=True)
+        assert recovered.pending_edits() == 4
+
+        assert recovered.replay_edit_log() == 4
+        assert recovered.df is not None and model.df is not None
+        assert recovered.df.equals(model.df)
+        recovered.close()
+
+    def test_column_changes_are_replayed(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers, edit_log=True)
+        model.insert_computed_column(2, "next_age", "age + 1")
+        model.cast_column(1, "float")
+        model.close()
+
+        recovered = CSVDataModel(temp_csv_with_headers, edit_log=True)
+        assert recovered.replay_edit_log() == 2
+        assert recovered.df is not None and model.df is not None
+        assert recovered.df.equals(model.df)
+        assert recovered.computed_columns == {"next_age": "age + 1"}
+        recovered.close()
+
+    def test_replace_and_undo_are_replayed(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers, edit_log=True)
+        model.replace_all("i", "I", col_start=0, col_stop=1)
+        model.undo()
+        model.replace_all("[aeo]", "_", regex=True)
+        model.replace_all("Zürich", "Bern")  # nothing to replace: not logged
+        model.close()
+
+        recovered = CSVDataModel(temp_csv_with_headers, edit_log=True)
+        assert recovered.replay_edit_log() == 3
+        assert recovered.df is not None and model.df is not None
+        assert recovered.df.equals(model.df)
+        recovered.close()
+
+    def test_only_outermost_edit_is_logged(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers, edit_log=True)
+        model.set_cell(0, 0, "Zoe")  # calls paste_values internally
+        model.close()
+
+        assert model.edit_log is not None
+        assert model.edit_log.pending() == [("set_cell", [0, 0, "Zoe"], {})]
+
+    def test_failed_edit_is_not_logged(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers, edit_log=True)
+        try:
+            model.set_cell(0, 1, "not a number")
+        except ValueError:
+            pass
+        model.close()
+
+        assert model.pending_edits() == 0
+
+    def test_save_discards_log(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers, edit_log=True)
+        model.set_cell(0, 0, "Zoe")
+        model.save()
+        model.close()
+
+        assert model.edit_log is not None
+        assert not model.edit_log.path.exists()
+        assert CSVDataModel(temp_csv_with_headers, edit_log=True).pending_edits() == 0
+
+    def test_no_log_by_default(self, temp_csv_with_headers):
+        model = CSVDataModel(temp_csv_with_headers)
+        model.set_cell(0, 0, "Zoe")
+
+        assert model.edit_log is None
+        assert model.pending_edits() == 0
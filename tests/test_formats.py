@@ -0,0 +1,123 @@
+# pytests for the file 'formats.py': registry of the file formats csv-ve can open
+import gzip
+import io
+
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from csv_ve.data_model import CSVDataModel
+from csv_ve.formats import (
+    CSVFormat,
+    IPCFormat,
+    NDJSONFormat,
+    ParquetFormat,
+    format_for_path,
+    spool_stream,
+)
+
+DF = pl.DataFrame({"name": ["Alice", "Bob", "Charlie"], "age": [30, 25, 35]})
+
+
+class TestFormatForPath:
+    "test: format_for_path()"
+
+    @pytest.mark.parametrize(
+        "file_name, expected",
+        [
+            ("data.csv", CSVFormat),
+            ("data.csv.gz", CSVFormat),
+            ("data.parquet", ParquetFormat),
+            ("data.arrow", IPCFormat),
+            ("data.feather", IPCFormat),
+            ("data.ndjson", NDJSONFormat),
+            ("data.jsonl", NDJSONFormat),
+        ],
+    )
+    def test_format_from_extension(self, tmp_path, file_name, expected):
+        assert isinstance(format_for_path(tmp_path / file_name), expected)
+
+    def test_unknown_extension_without_file(self, tmp_path):
+        assert format_for_path(tmp_path / "data.txt") is None
+
+    def test_compressed_non_csv_is_not_supported(self, tmp_path):
+        assert format_for_path(tmp_path / "data.parquet.gz") is None
+
+    def test_format_from_magic_bytes(self, tmp_path):
+        parquet_file = tmp_path / "export.bin"
+        DF.write_parquet(parquet_file)
+        ipc_file = tmp_path / "export.dat"
+        DF.write_ipc(ipc_file)
+
+        assert isinstance(format_for_path(parquet_file), ParquetFormat)
+        assert isinstance(format_for_path(ipc_file), IPCFormat)
+
+    def test_plain_text_is_not_sniffed(self, temp_txt):
+        assert format_for_path(temp_txt) is None
+
+
+class TestReadWrite:
+    "test: read with pushdown, load and save through CSVDataModel"
+
+    def test_read_with_projection_and_predicate(self, tmp_path):
+        parquet_file = tmp_path / "data.parquet"
+        DF.write_parquet(parquet_file)
+
+        df = ParquetFormat().read(
+            parquet_file, columns=["name"], predicate=pl.col("age") > 28
+        )
+
+        assert df.columns == ["name"]
+        assert df["name"].to_list() == ["Alice", "Charlie"]
+
+    @pytest.mark.parametrize("suffix", [".parquet", ".arrow", ".ndjson"])
+    def test_edit_and_save_columnar_files(self, tmp_path, suffix):
+        file_path = tmp_path / f"data{suffix}"
+        file_format = format_for_path(file_path)
+        assert file_format is not None
+        file_format.write(DF, file_path)
+
+        model = CSVDataModel(file_path)
+        assert model.df is not None
+        assert_frame_equal(model.df, DF)
+
+        model.set_cell(1, 1, "26")
+        model.save()
+
+        reloaded = CSVDataModel(file_path)
+        assert reloaded.df is not None
+        assert reloaded.df["age"].to_list() == [30, 26, 35]
+
+    def test_save_is_atomic(self, temp_csv_with_headers):
+        "saving should not leave temporary files behind"
+        model = CSVDataModel(temp_csv_with_headers)
+        model.set_cell(0, 0, "Zoe")
+        model.save()
+
+        assert [p.name for p in temp_csv_with_headers.parent.iterdir()] == [
+            "test_data.csv"
+        ]
+
+
+class TestSpoolStream:
+    "test: spool_stream()"
+
+    def test_csv(self, tmp_path):
+        path = spool_stream(io.BytesIO(b"a,b\n1,2\n"), tmp_path / "stdin")
+        assert path.name == "stdin.csv"
+        assert CSVDataModel(path).df.shape == (1, 2)
+
+    def test_compressed_csv(self, tmp_path):
+        data = gzip.compress(b"a,b\n1,2\n")
+        path = spool_stream(io.BytesIO(data), tmp_path / "stdin")
+        assert path.name == "stdin"
+        assert isinstance(format_for_path(path), CSVFormat)
+        assert CSVDataModel(path).df.shape == (1, 2)
+
+    def test_parquet(self, tmp_path):
+        buffer = io.BytesIO()
+        DF.write_parquet(buffer)
+        buffer.seek(0)
+        path = spool_stream(buffer, tmp_path / "stdin")
+        assert isinstance(format_for_path(path), ParquetFormat)
+        assert_frame_equal(CSVDataModel(path).df, DF)
@@ -0,0 +1,55 @@
+# pytests for the file 'helpers.py': column labels and cell addresses
+import pytest
+
+from csv_ve.helpers import (
+    col_index_from_label,
+    col_label_spreasheet_format,
+    parse_cell_address,
+)
+
+
+class TestColumnLabels:
+    "test: col_label_spreasheet_format() and col_index_from_label()"
+
+    @pytest.mark.parametrize(
+        "index, label",
+        [(0, "A"), (25, "Z"), (26, "AA"), (51, "AZ"), (701, "ZZ"), (702, "AAA")],
+    )
+    def test_labels(self, index, label):
+        assert col_label_spreasheet_format(index) == label
+        assert col_index_from_label(label) == index
+        assert col_index_from_label(label.lower()) == index
+
+    def test_inverse(self):
+        for index in range(5000):
+            assert col_index_from_label(col_label_spreasheet_format(index)) == index
+
+    @pytest.mark.parametrize("label", ["", "A1", "É"])
+    def test_invalid_label(self, label):
+        with pytest.raises(ValueError):
+            col_index_from_label(label)
+
+
+class TestParseCellAddress:
+    "test: parse_cell_address()"
+
+    @pytest.mark.parametrize(
+        "text, address",
+        [
+            ("B12", (11, 1)),
+            ("aa3", (2, 26)),
+            ("12:3", (11, 2)),
+            ("12:B", (11, 1)),
+            ("AA:3", (2, 26)),
+            ("12:", (11, None)),
+            (":C", (None, 2)),
+            (" 4 : 5 ", (3, 4)),
+        ],
+    )
+    def test_addresses(self, text, address):
+        assert parse_cell_address(text) == address
+
+    @pytest.mark.parametrize("text", ["12", "1:2:3", "A:B", "x1:2", "B"])
+    def test_invalid_addresses(self, text):
+        with pytest.raises(ValueError):
+            parse_cell_address(text)
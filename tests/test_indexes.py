@@ -0,0 +1,268 @@
+# pytests for the file 'indexes.py': indexes kept in sync with the edits of the data model
+import polars as pl
+import pytest
+from polars.testing import assert_series_equal
+
+from csv_ve.data_model import CSVDataModel
+from csv_ve.indexes import CellVersions, ColorBins, DuplicateIndex, RowIds, ValueIndex
+
+
+@pytest.fixture
+def model(tmp_path):
+    csv_file = tmp_path / "orders.csv"
+    csv_file.write_text(
+        "id,customer,total\n1,Alice,10\n2,Bob,20\n2,Bob,20\n3,Alice,30\n4,Carol,10\n"
+    )
+    return CSVDataModel(csv_file)
+
+
+def assert_matches_rebuild(index: DuplicateIndex, df: pl.DataFrame) -> None:
+    """The incrementally maintained index equals an index built from scratch"""
+    fresh = DuplicateIndex(index.columns)
+    fresh.build(df)
+    assert_series_equal(index.duplicated(), fresh.duplicated())
+    assert index.duplicate_count() == fresh.duplicate_count()
+
+
+class TestDuplicateIndex:
+    "test: DuplicateIndex"
+
+    def test_whole_rows(self, model):
+        index = model.duplicate_index()
+        assert index.duplicated().to_list() == [False, True, True, False, False]
+        assert index.duplicate_count() == 2
+        assert index.is_duplicated(1)
+        assert not index.is_duplicated(0)
+
+    def test_key_columns(self, model):
+        index = model.duplicate_index(["customer"])
+        assert index.duplicated().to_list() == [True, True, True, True, False]
+        assert model.duplicate_index(["total"]).duplicate_count() == 4
+
+    def test_built_once(self, model):
+        assert model.duplicate_index(["id"]) is model.duplicate_index(["id"])
+        assert len([i for i in model.indexes if isinstance(i, DuplicateIndex)]) == 1
+
+    def test_unknown_column(self, model):
+        with pytest.raises(KeyError):
+            model.duplicate_index(["nope"])
+
+    def test_set_cell(self, model):
+        index = model.duplicate_index(["id"])
+        model.set_cell(2, 0, "5")
+        assert index.duplicate_count() == 0
+        model.set_cell(4, 0, "1")
+        assert index.duplicated().to_list() == [True, False, False, False, True]
+        assert_matches_rebuild(index, model.df)
+
+    def test_edit_of_other_columns_is_ignored(self, model):
+        index = model.duplicate_index(["id"])
+        hashes = index._hashes
+        model.set_cell(0, 1, "Zoe")
+        assert index._hashes is hashes
+
+    def test_ranges(self, model):
+        index = model.duplicate_index()
+        model.fill_range(0, 2, 0, 3, "7")
+        assert index.duplicated().to_list() == [True, True, False, False, False]
+        model.clear_range(3, 5, 0, 3)
+        assert_matches_rebuild(index, model.df)
+
+    def test_insert_and_delete_rows(self, model):
+        index = model.duplicate_index()
+        model.insert_rows(1, 2)  # two identical empty rows
+        assert index.duplicate_count() == 4
+        assert_matches_rebuild(index, model.df)
+
+        model.delete_rows(1, 3)
+        assert index.duplicate_count() == 2
+        model.delete_rows([0, 2])
+        assert index.duplicate_count() == 0
+        assert_matches_rebuild(index, model.df)
+
+    def test_insert_and_delete_columns(self, model):
+        rows = model.duplicate_index()
+        ids = model.duplicate_index(["id"])
+        customers = model.duplicate_index(["customer"])
+
+        model.insert_column(1)
+        assert_matches_rebuild(rows, model.df)
+        model.set_cell(0, 1, "x")  # the new column gets a type
+        assert_matches_rebuild(rows, model.df)
+
+        model.delete_column(model.column_index("customer"))
+        assert customers not in model.indexes
+        assert ids in model.indexes
+        assert_matches_rebuild(ids, model.df)
+
+    def test_reload_rebuilds(self, model):
+        index = model.duplicate_index(["id"])
+        model.set_cell(2, 0, "5")
+        model.reload()
+        assert index.duplicate_count() == 2
+
+
+class TestRowIds:
+    "test: RowIds"
+
+    def test_ids_follow_the_rows(self, model):
+        ids = model.row_ids
+        assert ids.ids.to_list() == [0, 1, 2, 3, 4]
+
+        model.insert_rows(1, 2)
+        model.delete_rows([0, 4])
+        model.set_cell(0, 0, "9")
+        assert ids.ids.to_list() == [5, 6, 1, 3, 4]
+
+    def test_standalone(self):
+        ids = RowIds()
+        ids.build(pl.DataFrame({"a": [1, 2, 3]}))
+        ids.rows_deleted(pl.DataFrame(), range(0, 2))
+        ids.rows_inserted(pl.DataFrame(), 0, 1)
+        assert ids.ids.to_list() == [3, 2]
+
+    def test_save_renumbers(self, model):
+        model.delete_row(0)
+        model.save()
+        assert model.row_ids.ids.to_list() == [0, 1, 2, 3]
+
+
+class TestCellVersions:
+    "test: CellVersions"
+
+    def test_update_bumps_the_touched_cells(self, model):
+        versions = model.cell_versions
+        before = versions.cell_version(0, 0)
+        model.set_cell(1, 2, "99")
+        assert versions.cell_version(1, 2) != before
+        assert versions.cell_version(0, 0) == before
+        assert versions.cell_version(1, 1) == before
+
+    def test_moves_bump_every_cell(self, model):
+        versions = model.cell_versions
+        for edit in (
+            lambda: model.insert_rows(1, 1),
+            lambda: model.delete_row(0),
+            lambda: model.delete_column(0),
+        ):
+            before = versions.cell_version(0, 0)
+            edit()
+            assert versions.cell_version(0, 0) != before
+
+    def test_too_many_cells(self, monkeypatch):
+        monkeypatch.setattr(CellVersions, "MAX_TRACKED_CELLS", 4)
+        versions = CellVersions()
+        df = pl.DataFrame({"a": range(10), "b": range(10)})
+        versions.build(df)
+        versions.rows_updated(df, 0, 2, ["a", "b"])
+        assert versions.cell_version(0, 0) > versions.cell_version(5, 0)
+        versions.rows_updated(df, 5, 6, ["a"])
+        # tracking a fifth cell gives every cell the new version
+        assert versions.cell_version(0, 0) == versions.cell_version(9, 1)
+        assert versions._cells == {}
+
+
+class TestColorBins:
+    "test: ColorBins"
+
+    def test_quantile_bins(self):
+        df = pl.DataFrame({"n": [1, 2, 3, 4, 5, 6, 7, 8, None, 10]})
+        bins = ColorBins("n", bin_count=4)
+        bins.build(df)
+        assert bins.edges == [3.0, 5.0, 7.0]
+        assert bins.bins.dtype == pl.UInt8
+        assert bins.bins.to_list() == [1, 1, 1, 2, 2, 3, 3, 4, 0, 4]
+        assert bins.highest_bin == 4
+
+    def test_thresholds_and_text(self):
+        df = pl.DataFrame({"n": [1, 5, 9], "s": ["a", "b", "c"]})
+        bins = ColorBins("n", thresholds=[8, 2])
+        bins.build(df)
+        assert bins.bins.to_list() == [1, 2, 3]
+        text = ColorBins("s")
+        text.build(df)
+        assert not text.is_numeric()
+
+    def test_edits_bin_the_touched_rows(self, model, monkeypatch):
+        monkeypatch.setattr(ColorBins, "REBIN_SHARE", 1.0)
+        bins = model.color_bins("total")
+        edges = bins.edges
+        model.set_cell(0, 2, "")
+        model.insert_rows(1, 1)
+        model.delete_row(3)
+        assert bins.edges == edges  # few edits: the same quantiles
+        assert_series_equal(bins.bins, bins._bin(model.df))
+        assert bins.bin(0) == 0
+
+    def test_many_edits_compute_the_quantiles_again(self, model):
+        bins = model.color_bins("total")
+        for row_idx in range(3):
+            model.set_cell(row_idx, 2, "1000")
+        expected = ColorBins("total")
+        expected.build(model.df)
+        assert bins.edges == expected.edges
+        assert_series_equal(bins.bins, expected.bins)
+
+    def test_model_reuses_the_bins(self, model):
+        assert model.color_bins("total") is model.color_bins("total")
+        with pytest.raises(KeyError):
+            model.color_bins("missing")
+        model.delete_column(2)
+        assert not any(isinstance(index, ColorBins) for index in model.indexes)
+
+
+def assert_value_index_matches(index: ValueIndex, df: pl.DataFrame) -> None:
+    """Every value of the column is found at its rows"""
+    values = df.get_column(index.columns[0])
+    for value in values.drop_nulls().unique().to_list():
+        expected = values.eq_missing(value).arg_true().to_list()
+        assert index.rows(value).to_list() == expected
+    assert index.entries.height == len(values) - values.null_count()
+
+
+class TestValueIndex:
+    "test: ValueIndex and CSVDataModel.find_value()"
+
+    def test_rows_of_a_value(self, model):
+        index = model.value_index("customer")
+        assert index.rows("Alice").to_list() == [0, 3]
+        assert index.rows("Zoe").to_list() == []
+        assert index.next_row("Alice") == 0
+        assert index.next_row("Alice", after=0) == 3
+        assert index.next_row("Alice", after=3) == 0  # from the top again
+        assert index.next_row("Zoe") is None
+
+    @pytest.mark.parametrize("max_splices", [1000, 0])  # spliced, merged
+    def test_edits_patch_the_index(self, model, monkeypatch, max_splices):
+        monkeypatch.setattr(ValueIndex, "REBUILD_SHARE", 1.0)
+        monkeypatch.setattr(ValueIndex, "MAX_SPLICES", max_splices)
+        index = model.value_index("id")
+        entries = index.entries
+        model.set_cell(0, 0, "2")
+        model.set_cell(4, 0, "")
+        model.insert_rows(1, 2)
+        model.set_cell(2, 0, "3")
+        model.delete_row(0)
+        model.delete_rows([2, 4])
+        model.fill_range(0, 3, 0, 1, "7")
+        assert index.entries is not entries
+        assert_value_index_matches(index, model.df)
+
+    def test_new_type_rebuilds(self, model):
+        index = model.value_index("total")
+        model.cast_column(2, "float")
+        assert index.dtype == pl.Float64
+        assert index.rows(10.0).to_list() == [0, 4]
+
+    def test_find_value(self, model):
+        assert model.find_value("customer", "Bob") == 1
+        assert model.find_value("customer", "Bob", after=1) == 2
+        assert model.find_value("total", "20", after=2) == 1
+        assert model.find_value("id", "9") is None
+        assert model.value_index("id") is model.value_index("id")
+        with pytest.raises(ValueError):
+            model.find_value("id", "abc")
+        with pytest.raises(ValueError):
+            model.find_value("id", "")
+        with pytest.raises(KeyError):
+            model.find_value("missing", "1")
@@ -0,0 +1,200 @@
+# pytests for the file 'memory.py': memory budget shared by the open files
+import polars as pl
+import pytest
+
+from csv_ve.data_model import CSVDataModel
+from csv_ve.memory import MemoryBudget, format_size, parse_size
+
+
+@pytest.fixture
+def models(tmp_path):
+    models = []
+    for name in ("a", "b", "c"):
+        path = tmp_path / f"{name}.csv"
+        path.write_text(f"name,value\n{name},1\n{name},2\n")
+        models.append(CSVDataModel(str(path)))
+    yield models
+    for model in models:
+        model.close()
+
+
+class TestSpill:
+    "test: CSVDataModel.spill(), rehydrate() and lazy()"
+
+    def test_spill_and_rehydrate(self, models, tmp_path):
+        model = models[0]
+        expected = model.df
+        model.spill(tmp_path)
+
+        assert model.spilled
+        assert model.estimated_size() == 0
+        assert model.lazy().collect().equals(expected)
+        assert model.spilled  # scanning doesn't read the data back
+
+        model.rehydrate()
+        assert not model.spilled
+        assert model.df.equals(expected)
+        assert list(tmp_path.glob("*.arrow")) == []
+
+    def test_access_reads_spilled_data_back(self, models, tmp_path):
+        model = models[0]
+        model.set_cell(0, 0, "z")
+        model.spill(tmp_path)
+
+        assert model.get_cell(0, 0) == "z"
+        assert model.modified
+        model.set_cell(1, 0, "y")
+        assert model.df["name"].to_list() == ["z", "y"]
+
+    def test_unmodified_ipc_file_is_not_copied(self, tmp_path):
+        path = tmp_path / "data.arrow"
+        pl.DataFrame({"a": [1, 2]}).write_ipc(path)
+        model = CSVDataModel(str(path))
+
+        spill_dir = tmp_path / "spill"
+        spill_dir.mkdir()
+        model.spill(spill_dir)
+
+        assert model.spilled
+        assert list(spill_dir.iterdir()) == []
+        assert model.get_cell(1, 0) == 2
+        assert path.exists()
+
+    def test_ranges_are_read_lazily(self, models, tmp_path):
+        model = models[0]
+        model.spill(tmp_path)
+
+        assert model.row_count() == 2
+        assert model.column_count() == 2
+        assert model.get_range(1, 2, 0, 2).rows() == [("a", 2)]
+        assert model.get_cell(0, 1) == 1
+        with pytest.raises(IndexError):
+            model.get_range(0, 3, 0, 1)
+        assert model.spilled
+
+    def test_computed_column_and_cast_of_spilled_data(self, models, tmp_path):
+        model = models[0]
+        model.insert_computed_column(2, "next", "value + 1")
+        model.spill(tmp_path)
+
+        model.cast_column(1, "float")
+        model.insert_computed_column(3, None, "upper(name)")
+        assert model.spilled
+        assert model.column_count() == 4
+        assert model.get_range(0, 2, 0, 4).rows() == [
+            ("a", 1.0, 2, "A"),
+            ("a", 2.0, 3, "A"),
+        ]
+        assert model.lazy().collect_schema()["next"] == pl.Int64
+        with pytest.raises(ValueError, match="Invalid value 'a'"):
+            model.cast_column(0, "int")
+        assert len(list(tmp_path.glob("*.arrow"))) == 1
+
+        model.set_cell(0, 1, "5")
+        assert model.get_cell(0, 2) == 6
+
+    def test_spilled_data_is_read_back_for_indexes_of_values(self, models, tmp_path):
+        model = models[0]
+        duplicates = model.duplicate_index()
+        model.spill(tmp_path)
+        model.cast_column(1, "str")
+        assert not model.spilled
+        assert duplicates.duplicate_count() == 0
+
+    def test_close_removes_the_spill_file(self, models, tmp_path):
+        models[0].spill(tmp_path)
+        models[0].close()
+        assert list(tmp_path.glob("*.arrow")) == []
+
+
+class TestMemoryBudget:
+    "test: MemoryBudget"
+
+    def test_within_budget(self, models):
+        budget = MemoryBudget(max_bytes=10**9)
+        for model in models:
+            budget.add(model)
+        assert not any(model.spilled for model in models)
+        assert budget.used() == sum(model.df.estimated_size() for model in models)
+
+    def test_least_recently_used_are_spilled(self, models, tmp_path):
+        size = models[0].estimated_size()
+        budget = MemoryBudget(max_bytes=2 * size, spill_dir=tmp_path)
+        for model in models:
+            budget.add(model)
+
+        assert [model.spilled for model in models] == [True, False, False]
+
+        budget.activate(models[0])
+        assert [model.spilled for model in models] == [False, True, False]
+        assert budget.used() <= 2 * size
+
+    def test_active_model_is_never_spilled(self, models):
+        budget = MemoryBudget(max_bytes=0)
+        for model in models:
+            budget.add(model)
+        assert [model.spilled for model in models] == [True, True, False]
+        budget.close()
+
+    def test_usage(self, models):
+        model = models[0]
+        model.replace_all("a", "x")
+        budget = MemoryBudget()
+        budget.add(model)
+
+        usage = budget.usage(caches=100)
+        assert usage.data == model.estimated_size()
+        assert usage.indexes == model.index_size() > 0
+        assert usage.undo == model.undo_size() > 0
+        assert usage.total == usage.data + usage.indexes + usage.undo + 100
+
+    def test_degrade_drops_undo_then_spills_the_active_model(self, models, tmp_path):
+        model = models[0]
+        model.replace_all("a", "x")
+        budget = MemoryBudget(max_bytes=0, spill_dir=tmp_path)
+        budget.add(model)
+
+        assert budget.degrade() == [
+            "undo history dropped",
+            "a.csv read from disk (lazy mode)",
+        ]
+        assert not model.can_undo()
+        assert model.spilled
+        assert model.get_range(0, 2, 0, 1).rows() == [("x",), ("x",)]
+        assert budget.degrade() == []
+
+    def test_degrade_within_budget(self, models):
+        models[0].replace_all("a", "x")
+        budget = MemoryBudget(max_bytes=10**9)
+        budget.add(models[0])
+
+        assert budget.degrade() == []
+        assert models[0].can_undo()
+        assert not models[0].spilled
+
+
+class TestSizes:
+    "test: parse_size() and format_size()"
+
+    @pytest.mark.parametrize(
+        "text, size",
+        [
+            ("100", 100),
+            ("10K", 10240),
+            ("512M", 512 * 1024**2),
+            ("2G", 2 * 1024**3),
+            ("1.5gb", 3 * 1024**3 // 2),
+        ],
+    )
+    def test_parse_size(self, text, size):
+        assert parse_size(text) == size
+
+    @pytest.mark.parametrize("text", ["", "abc", "-1G", "2X"])
+    def test_invalid_size(self, text):
+        with pytest.raises(ValueError):
+            parse_size(text)
+
+    def test_format_size(self):
+        assert format_size(512) == "512 B"
+        assert format_size(1536) == "1.5 KB"
+        assert format_size(2 * 1024**3) == "2.0 GB"
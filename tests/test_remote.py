@@ -0,0 +1,151 @@
+# pytests for the file 'remote.py': remote files read with HTTP range requests
+import gzip
+import io
+
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from csv_ve.data_model import CSVDataModel
+from csv_ve.diff import diff_files
+from csv_ve.remote import RemoteFile, http_url, is_url, url_path
+
+DATA = bytes(range(256)) * 40  # 10240 bytes
+
+
+@pytest.fixture
+def remote_bytes(http_server):
+    (http_server.directory / "data.bin").write_bytes(DATA)
+    return f"{http_server.url}/data.bin"
+
+
+class TestUrls:
+    "test: is_url(), url_path(), http_url()"
+
+    def test_is_url(self, tmp_path):
+        assert is_url("https://example.com/data.csv")
+        assert is_url("s3://bucket/data.csv")
+        assert not is_url("data.csv")
+        assert not is_url(tmp_path / "data.csv")
+
+    def test_url_path(self):
+        assert url_path("https://example.com/dir/data.csv.gz?x=1").name == "data.csv.gz"
+
+    def test_s3(self, monkeypatch):
+        monkeypatch.delenv("AWS_ENDPOINT_URL_S3", raising=False)
+        monkeypatch.delenv("AWS_ENDPOINT_URL", raising=False)
+        assert (
+            http_url("s3://bucket/dir/data.csv")
+            == "https://bucket.s3.amazonaws.com/dir/data.csv"
+        )
+        monkeypatch.setenv("AWS_ENDPOINT_URL", "http://localhost:9000/")
+        assert (
+            http_url("s3://bucket/data.csv") == "http://localhost:9000/bucket/data.csv"
+        )
+
+
+class TestRemoteFile:
+    "test: RemoteFile"
+
+    def test_read_and_seek(self, remote_bytes):
+        with RemoteFile(remote_bytes, block_size=1000) as remote:
+            assert remote.size == len(DATA)
+            assert remote.read(10) == DATA[:10]
+            remote.seek(2995)
+            assert remote.read(10) == DATA[2995:3005]  # across 2 blocks
+            remote.seek(-5, io.SEEK_END)
+            assert remote.read() == DATA[-5:]
+            remote.seek(0)
+            assert remote.read() == DATA
+
+    def test_only_needed_ranges(self, http_server, remote_bytes):
+        with RemoteFile(remote_bytes, block_size=1000) as remote:
+            remote.read(10)
+            remote.seek(-10, io.SEEK_END)
+            remote.read()
+        assert http_server.ranges == [
+            ("/data.bin", 0, 999),
+            ("/data.bin", 10230, 10239),
+        ]
+
+    def test_small_reads_share_a_block(self, remote_bytes):
+        with RemoteFile(remote_bytes, block_size=1000) as remote:
+            remote.read(10)
+            remote.seek(0)
+            assert remote.read(20) == DATA[:20]
+            assert remote.requests == 1
+
+    def test_large_reads_fetch_their_range(self, http_server, remote_bytes):
+        with RemoteFile(remote_bytes, block_size=1000) as remote:
+            remote.seek(500)
+            assert remote.read(5000) == DATA[500:5500]
+            assert remote.read() == DATA[5500:]
+        assert http_server.ranges == [
+            ("/data.bin", 500, 5499),
+            ("/data.bin", 5500, 10239),
+        ]
+
+    def test_refresh(self, http_server, remote_bytes):
+        with RemoteFile(remote_bytes, block_size=1000) as remote:
+            remote.read(10)
+            assert not remote.refresh()
+            (http_server.directory / "data.bin").write_bytes(b"new content")
+            assert remote.refresh()
+            remote.seek(0)
+            assert remote.read(3) == b"new"
+            remote.seek(0)
+            assert remote.read() == b"new content"
+
+    def test_missing_file(self, http_server):
+        with pytest.raises(OSError):
+            RemoteFile(f"{http_server.url}/missing.csv")
+
+
+class TestRemoteDataModel:
+    "test: CSVDataModel with URLs"
+
+    DF = pl.DataFrame({"name": ["Alice", "Bob"], "age": [30, 25]})
+
+    def test_csv(self, http_server):
+        (http_server.directory / "data.csv").write_text("name;age\nAlice;30\nBob;25\n")
+        model = CSVDataModel(f"{http_server.url}/data.csv")
+        assert_frame_equal(model.df, self.DF)
+        assert model.file_path.name == "data.csv"
+        assert model.write_options["dialect"].delimiter == ";"
+        model.close()
+
+    def test_compressed_csv(self, http_server):
+        (http_server.directory / "data.csv.gz").write_bytes(
+            gzip.compress(b"name,age\nAlice,30\nBob,25\n")
+        )
+        model = CSVDataModel(f"{http_server.url}/data.csv.gz")
+        assert_frame_equal(model.df, self.DF)
+        # the first block to sniff, then the whole file at once
+        assert model.remote.requests == 2
+        model.close()
+
+    def test_parquet(self, http_server):
+        self.DF.write_parquet(http_server.directory / "data.parquet")
+        model = CSVDataModel(f"{http_server.url}/data.parquet")
+        assert_frame_equal(model.df, self.DF)
+        model.close()
+
+    def test_read_only(self, http_server):
+        (http_server.directory / "data.csv").write_text("name,age\nAlice,30\nBob,25\n")
+        model = CSVDataModel(f"{http_server.url}/data.csv", edit_log=True)
+        assert model.read_only
+        assert model.edit_log is None
+
+        model.set_cell(0, 1, "31")
+        with pytest.raises(RuntimeError):
+            model.save()
+        assert model.diff_with_disk().modified == 1
+        model.close()
+
+    def test_diff_files(self, http_server, tmp_path):
+        (http_server.directory / "data.csv").write_text("name,age\nAlice,30\nBob,25\n")
+        local = tmp_path / "local.csv"
+        local.write_text("name,age\nAlice,30\nBob,26\n")
+
+        rows, _, _ = diff_files(f"{http_server.url}/data.csv", local, ["name"])
+        assert rows.collect()["changed_columns"].to_list() == [["age"]]
@@ -0,0 +1,128 @@
+# pytests for the file 'row_windows.py': rows read on demand by windows, with read-ahead
+import pytest
+
+from csv_ve.data_model import CSVDataModel
+from csv_ve.row_windows import RowWindows
+
+
+@pytest.fixture
+def reads():
+    """(start, stop) of every read"""
+    return []
+
+
+@pytest.fixture
+def windows(reads):
+    def fetch(start, stop):
+        reads.append((start, stop))
+        return [(i, f"row {i}") for i in range(start, stop)]
+
+    windows = RowWindows(fetch, 1050, window_size=100, max_windows=4)
+    yield windows
+    windows.close()
+
+
+class TestRowWindows:
+    "test: RowWindows"
+
+    def test_rows_are_read_by_window(self, windows, reads):
+        assert windows.row(0) == (0, "row 0")
+        assert windows.row(99) == (99, "row 99")
+        assert windows.row(1049) == (1049, "row 1049")
+        assert reads == [(0, 100), (1000, 1050)]
+        assert windows.misses == 2
+
+    def test_lru_eviction(self, windows, reads):
+        for row in (0, 100, 200, 300, 0, 400):
+            windows.row(row)
+        assert windows.cached_windows() == [2, 3, 0, 4]
+        assert len(reads) == 5
+
+    def test_read_ahead_in_scroll_direction(self, windows, reads):
+        windows.row(0)
+        for row in range(1, 50):
+            windows.visit(row)
+        windows.wait()
+        assert (100, 200) in reads
+        assert windows.row(150) == (150, "row 150")
+        assert windows.misses == 1  # only the first window
+
+    def test_read_ahead_upwards(self, windows, reads):
+        windows.visit(950)  # jump: reads the windows around
+        windows.wait()
+        for row in range(949, 900, -1):
+            windows.visit(row)
+        windows.wait()
+        assert {(800, 900), (1000, 1050)} <= set(reads)
+        windows.row(850)
+        assert windows.misses == 0
+
+    def test_faster_scroll_reads_further(self, windows):
+        windows.visit(0)
+        windows._last_time -= 0.001
+        windows.visit(90)  # ~90000 rows per second
+        windows.wait()
+        assert set(windows.cached_windows()) == {
+            1,
+            2,
+            3,
+        }  # max_read_ahead: max_windows - 1
+
+    def test_shrink(self, reads):
+        windows = RowWindows(
+            lambda start, stop: [(i,) for i in range(start, stop)],
+            1000,
+            window_size=100,
+            max_windows=4,
+            max_read_ahead=1,
+        )
+        for row in (0, 100, 200, 300):
+            windows.row(row)
+        assert windows.estimated_size() > 0
+
+        windows.shrink(1)  # the windows read ahead are kept
+        assert windows.cached_windows() == [2, 3]
+        windows.row(400)
+        assert windows.cached_windows() == [3, 4]
+        windows.close()
+
+    def test_invalidate(self, windows, reads):
+        windows.row(0)
+        windows.row(150)
+        windows.invalidate(120, 130)
+        assert windows.cached_windows() == [0]
+        windows.row(150)
+        assert reads[-1] == (100, 200)
+
+    def test_invalidated_read_ahead_is_dropped(self, reads):
+        values = {"value": "old"}
+
+        def fetch(start, stop):
+            reads.append((start, stop))
+            return [(values["value"],)] * (stop - start)
+
+        windows = RowWindows(fetch, 300, window_size=100)
+        windows.prefetch(1)
+        windows.wait()
+        values["value"] = "new"
+        windows.invalidate()
+        assert windows.row(100) == ("new",)
+        windows.close()
+
+    def test_model_edits_drop_their_windows(self, tmp_path):
+        csv_file = tmp_path / "n.csv"
+        csv_file.write_text("n\n" + "".join(f"{i}\n" for i in range(300)))
+        model = CSVDataModel(csv_file)
+        windows = RowWindows(
+            lambda start, stop: model.get_range(start, stop, 0, 1).rows(),
+            300,
+            window_size=100,
+        )
+        model.add_index(windows)
+        windows.row(0)
+        windows.row(250)
+
+        model.set_cell(260, 0, "-1")
+        assert windows.cached_windows() == [0]
+        assert windows.row(260) == (-1,)
+        windows.close()
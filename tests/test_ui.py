@@ -1,10 +1,24 @@
 import asyncio
 
+import polars as pl
+import pytest
+
 from dirty_equals import Contains, HasLen, IsStr
-from textual.widgets import DataTable, Input
+from rich.style import Style
+from textual.coordinate import Coordinate
+from textual.widgets import DataTable, Input, Tabs
 
+from csv_ve.data_model import CSVDataModel
+from csv_ve.screens.column_screen import ColumnInputScreen
+from csv_ve.screens.diff_screen import DiffScreen
 from csv_ve.screens.goto_cell_screen import CoordInputScreen
-from csv_ve.ui import CSVEditorApp
+from csv_ve.screens.query_screen import QueryScreen
+from csv_ve.screens.recover_screen import RecoverEditsScreen
+from csv_ve.screens.replace_screen import ReplaceScreen
+from csv_ve.screens.summary_screen import SummaryScreen
+from csv_ve.ui import CSVEditorApp, DiffApp
+from csv_ve.widgets.csv_table import CSVTable
+from csv_ve.widgets.result_table import ResultTable
 
 
 # temp_csv_with_headers is a 3x3 csv - First row of the table a labeled row so the row index starts at -1
@@ -103,6 +117,191 @@ class TestBasicKeybinds:
             assert app.data_model.column_count == initial_col_count - 1
 
 
+class TestRangeSelection:
+    "test: range selection, copy/ paste/ clear/ fill of ranges"
+
+    async def test_shift_arrows_extend_selection(self, temp_csv_with_headers):
+        app = CSVEditorApp(csv_path=temp_csv_with_headers, theme=None)
+
+        async with app.run_test() as pilot:
+            table = app.query_one(CSVTable)
+            table.focus()
+            await pilot.press("shift+down", "shift+right")
+            await pilot.pause()
+
+            assert table.selection == (0, 2, 0, 2)
+
+            await pilot.press("j")  # plain move drops the selection
+            await pilot.pause()
+            assert table.selection is None
+
+    async def test_copy_range_as_tsv(self, temp_csv_with_headers):
+        app = CSVEditorApp(csv_path=temp_csv_with_headers, theme=None)
+
+        async with app.run_test() as pilot:
+            app.query_one(CSVTable).focus()
+            await pilot.press("J", "L", "ctrl+c")
+            await pilot.pause()
+
+            assert app.clipboard == "Alice\t30\nBob\t25"
+
+    async def test_paste_tsv_at_cursor(self, temp_csv_with_headers):
+        app = CSVEditorApp(csv_path=temp_csv_with_headers, theme=None)
+
+        async with app.run_test() as pilot:
+            table = app.query_one(CSVTable)
+            table.focus()
+            app.copy_to_clipboard("40\tRome\n41\tOslo")
+            table.move_cursor(row=1, column=1)
+            await pilot.pause()
+
+            await pilot.press("ctrl+v")
+            await pilot.pause()
+
+            assert app.data_model.df["age"].to_list() == [30, 40, 41]
+            assert app.data_model.df["city"].to_list() == ["Paris", "Rome", "Oslo"]
+            assert table.get_cell_at(Coordinate(2, 2)) == "Oslo"
+
+    async def test_delete_clears_range(self, temp_csv_with_headers):
+        app = CSVEditorApp(csv_path=temp_csv_with_headers, theme=None)
+
+        async with app.run_test() as pilot:
+            app.query_one(CSVTable).focus()
+            await pilot.press("J", "delete")
+            await pilot.pause()
+
+            assert app.data_model.df["name"].to_list() == [None, None, "Charlie"]
+
+    async def test_edit_fills_selected_range(self, temp_csv_with_headers):
+        app = CSVEditorApp(csv_path=temp_csv_with_headers, theme=None)
+
+        async with app.run_test() as pilot:
+            table = app.query_one(CSVTable)
+            table.focus()
+            table.move_cursor(row=0, column=1)
+            await pilot.pause()
+            await pilot.press("J", "J")
+            app.action_edit_cell()
+            await pilot.pause()
+            app.query_one("#formula_bar", Input).value = "18"
+            await pilot.press("enter")
+            await pilot.pause()
+
+            assert app.data_model.df["age"].to_list() == [18, 18, 18]
+
+
+class TestNestedColumns:
+    "test: editing list and struct cells"
+
+    async def test_edit_list_cell(self, tmp_path):
+        parquet_file = tmp_path / "nested.parquet"
+        pl.DataFrame({"tags": [[1, 2], [3]]}).write_parquet(parquet_file)
+        app = CSVEditorApp(csv_path=parquet_file, theme=None)
+
+        async with app.run_test() as pilot:
+            formula_bar = app.query_one("#formula_bar", Input)
+            app.action_edit_cell()
+            await pilot.pause()
+            formula_bar.value = "[1, 2"  # invalid JSON
+            await pilot.press("enter")
+            await pilot.pause()
+            assert app.is_running
+            assert any("Invalid value" in n.message for n in app._notifications)
+
+            formula_bar.value = "[5, 6]"
+            await pilot.press("enter")
+            await pilot.pause()
+            assert app.data_model.df["tags"].to_list() == [[5, 6], [3]]
+
+    async def test_nested_values_are_shown_as_json(self, tmp_path):
+        parquet_file = tmp_path / "nested.parquet"
+        pl.DataFrame(
+            {"tags": [["a", "é"]], "point": [{"x": 1, "y": None}]}
+        ).write_parquet(parquet_file)
+        app = CSVEditorApp(csv_path=parquet_file, theme=None)
+
+        async with app.run_test() as pilot:
+            table = app.query_one(CSVTable)
+            formula_bar = app.query_one("#formula_bar", Input)
+            await pilot.pause()
+            assert formula_bar.value == '["a", "é"]'
+
+            table.move_cursor(column=1)
+            await pilot.pause()
+            assert formula_bar.value == '{"x": 1, "y": null}'
+
+            # the unchanged value is written back as is
+            app.action_edit_cell()
+            await pilot.pause()
+            await pilot.press("enter")
+            await pilot.pause()
+            assert app.data_model.df["point"].to_list() == [{"x": 1, "y": None}]
+
+
+class TestBulkRowsCols:
+    "test: insert/ delete several rows or columns from a selection"
+
+    async def test_delete_selected_rows(self, temp_csv_with_headers):
+        app = CSVEditorApp(csv_path=temp_csv_with_headers, theme=None)
+
+        async with app.run_test() as pilot:
+            table = app.query_one(CSVTable)
+            table.focus()
+            app._set_cursor_type(table, "row", row=0)
+            await pilot.press("J", "ctrl+n")
+            await pilot.pause()
+
+            assert app.data_model.df["name"].to_list() == ["Charlie"]
+            assert table.row_count == 1
+
+    async def test_insert_as_many_rows_as_selected(self, temp_csv_with_headers):
+        app = CSVEditorApp(csv_path=temp_csv_with_headers, theme=None)
+
+        async with app.run_test() as pilot:
+            table = app.query_one(CSVTable)
+            table.focus()
+            await pilot.press("J", "n")
+            await pilot.pause()
+
+            assert app.data_model.row_count() == 5
+            assert app.data_model.df["name"].to_list() == [
+                "Alice",
+                "Bob",
+                None,
+                None,
+                "Charlie",
+            ]
+            assert table.row_count == 5
+            assert table.cursor_coordinate == Coordinate(2, 0)
+
+    async def test_column_selection_inserts_one_row(self, tmp_path):
+        csv_file = tmp_path / "ten.csv"
+        csv_file.write_text("a,b\n" + "".join(f"{i},{i}\n" for i in range(10)))
+        app = CSVEditorApp(csv_path=csv_file, theme=None)
+
+        async with app.run_test() as pilot:
+            table = app.query_one(CSVTable)
+            table.focus()
+            app._set_cursor_type(table, "column", column=0)
+            await pilot.press("shift+right", "n")
+            await pilot.pause()
+
+            assert app.data_model.row_count() == 11
+            assert table.row_count == 11
+
+    async def test_delete_selected_columns(self, temp_csv_with_headers):
+        app = CSVEditorApp(csv_path=temp_csv_with_headers, theme=None)
+
+        async with app.run_test() as pilot:
+            table = app.query_one(CSVTable)
+            table.focus()
+            await pilot.press("L", "ctrl+b")
+            await pilot.pause()
+
+            assert app.data_model.df.columns == ["city"]
+            assert len(table.columns) == 1
+
+
 class TestVimKeybinds:
     "test: h j k l G and g"
 
@@ -305,6 +504,7 @@ class TestLoadData:
             assert table.row_count == 3
             assert table.columns == HasLen(3)
             assert app.sub_title == Contains("test_data.csv | 3 rows × 3 cols")
+            assert app.sub_title == Contains("/ 2.0 GB")
 
 
 class TestNotifications:
@@ -367,6 +567,655 @@ class TestEditCell:
     "test: action_edit_cell()"
 
 
+class TestEditRecovery:
+    "test: unsaved edits of a previous session are offered for replay"
+
+    async def test_replay_unsaved_edits(self, temp_csv_with_headers):
+        previous = CSVDataModel(temp_csv_with_headers, edit_log=True)
+        previous.set_cell(0, 0, "Zoe")
+        previous.close()
+
+        app = CSVEditorApp(csv_path=temp_csv_with_headers, theme=None)
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            assert isinstance(app.screen, RecoverEditsScreen)
+
+            await pilot.click("#replay")
+            await pilot.pause()
+
+            assert app.data_model.get_cell(0, 0) == "Zoe"
+            assert app.query_one(DataTable).get_cell_at(Coordinate(0, 0)) == "Zoe"
+
+    async def test_failed_replay_reloads_the_file(self, temp_csv_with_headers):
+        previous = CSVDataModel(temp_csv_with_headers, edit_log=True)
+        previous.set_cell(0, 0, "Zoe")
+        previous.edit_log.append("set_cell", (99, 0, "Max"), {})
+        previous.close()
+
+        app = CSVEditorApp(csv_path=temp_csv_with_headers, theme=None)
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            await pilot.click("#replay")
+            await pilot.pause()
+
+            assert app.data_model.get_cell(0, 0) == "Alice"
+            assert not app.data_model.modified
+            assert app.query_one(DataTable).get_cell_at(Coordinate(0, 0)) == "Alice"
+            assert [n.severity for n in app._notifications] == ["error"]
+            assert app.data_model.pending_edits() == 2
+
+    async def test_discard_unsaved_edits(self, temp_csv_with_headers):
+        previous = CSVDataModel(temp_csv_with_headers, edit_log=True)
+        previous.set_cell(0, 0, "Zoe")
+        previous.close()
+
+        app = CSVEditorApp(csv_path=temp_csv_with_headers, theme=None)
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            await pilot.click("#discard")
+            await pilot.pause()
+
+            assert app.data_model.get_cell(0, 0) == "Alice"
+            assert app.data_model.pending_edits() == 0
+
+    async def test_unwritable_edit_log_is_shown(self, temp_csv_with_headers):
+        app = CSVEditorApp(csv_path=temp_csv_with_headers, theme=None)
+        async with app.run_test() as pilot:
+            edit_log = app.data_model.edit_log
+            edit_log.path.mkdir()  # can't be opened as a file
+            app.data_model.set_cell(0, 0, "Zoe")
+            edit_log.flush()
+            app._check_edit_logs()
+            app._check_edit_logs()  # shown once
+            await pilot.pause()
+
+            failures = [
+                n for n in app._notifications if "can't be written" in n.message
+            ]
+            assert len(failures) == 1
+            assert failures[0].severity == "error"
+
+            edit_log.path.rmdir()
+            edit_log.flush()
+            app._check_edit_logs()
+            await pilot.pause()
+            assert any("logged again" in n.message for n in app._notifications)
+
+
+class TestTabs:
+    "test: several files open as tabs"
+
+    @pytest.fixture
+    def second_csv(self, tmp_path):
+        csv_file = tmp_path / "second.csv"
+        csv_file.write_text("id,value\n1,a\n2,b\n3,c\n4,d")
+        return csv_file
+
+    async def test_single_file_has_no_tabs(self, temp_csv_with_headers):
+        app = CSVEditorApp(csv_path=temp_csv_with_headers, theme=None)
+        async with app.run_test():
+            assert not app.query_one("#file_tabs", Tabs).display
+
+    async def test_switch_tabs(self, temp_csv_with_headers, second_csv):
+        app = CSVEditorApp(csv_path=[temp_csv_with_headers, second_csv], theme=None)
+        async with app.run_test() as pilot:
+            table = app.query_one(CSVTable)
+            assert app.query_one("#file_tabs", Tabs).display
+            assert table.row_count == 3
+
+            await pilot.press("j", "l")
+            await pilot.press("right_square_bracket")
+            assert app.data_model is app.data_models[1]
+            assert table.row_count == 4
+            assert table.get_cell_at(Coordinate(0, 1)) == "a"
+            assert table.cursor_coordinate == Coordinate(0, 0)
+
+            # the cursor of each tab is kept
+            await pilot.press("left_square_bracket")
+            assert app.data_model is app.data_models[0]
+            assert table.cursor_coordinate == Coordinate(1, 1)
+
+    async def test_edits_stay_in_their_tab(self, temp_csv_with_headers, second_csv):
+        app = CSVEditorApp(csv_path=[temp_csv_with_headers, second_csv], theme=None)
+        async with app.run_test() as pilot:
+            app.data_model.set_cell(0, 0, "Zoe")
+            await pilot.press("right_square_bracket", "left_square_bracket")
+
+            assert app.query_one(CSVTable).get_cell_at(Coordinate(0, 0)) == "Zoe"
+            assert not app.data_models[1].modified
+
+    async def test_inactive_tabs_are_spilled(self, temp_csv_with_headers, second_csv):
+        app = CSVEditorApp(
+            csv_path=[temp_csv_with_headers, second_csv], theme=None, memory_budget=0
+        )
+        async with app.run_test() as pilot:
+            assert app.data_models[1].spilled
+
+            await pilot.press("right_square_bracket")
+            assert app.data_models[0].spilled
+            assert not app.data_models[1].spilled
+            assert app.query_one(CSVTable).row_count == 4
+
+    def test_files_are_spilled_while_loading(
+        self, temp_csv_with_headers, second_csv, monkeypatch
+    ):
+        loaded: list[CSVDataModel] = []
+        in_memory = []
+
+        def load(path, **kwargs):
+            # files in memory when the next one is read
+            in_memory.append(sum(not model.spilled for model in loaded))
+            loaded.append(CSVDataModel(path, **kwargs))
+            return loaded[-1]
+
+        monkeypatch.setattr("csv_ve.ui.CSVDataModel", load)
+        paths = [temp_csv_with_headers, second_csv, temp_csv_with_headers]
+        app = CSVEditorApp(csv_path=paths, theme=None, memory_budget=0)
+
+        assert in_memory == [0, 1, 1]
+        assert app.data_models == loaded[::-1]  # the first tab is loaded last
+        assert not app.data_models[0].spilled
+        app.memory_budget.close()
+
+
+class TestMemoryBudget:
+    "test: _check_memory()"
+
+    async def test_over_budget_reads_the_file_from_disk(self, temp_csv_with_headers):
+        app = CSVEditorApp(csv_path=temp_csv_with_headers, theme=None, memory_budget=1)
+        async with app.run_test() as pilot:
+            model, table = app.data_model, app.query_one(CSVTable)
+            expected = table.get_cell_at(Coordinate(0, 0))
+            model.replace_all(expected, "Zoe")
+            await pilot.pause()
+
+            app._check_memory()
+            await pilot.pause()
+            assert model.spilled
+            assert not model.can_undo()
+            assert len(app._notifications) == 1
+            assert table.get_cell_at(Coordinate(0, 0)) == "Zoe"
+            assert model.spilled  # the table reads windows of the spill file
+
+            # an edit reads the data back
+            app.action_edit_cell()
+            await pilot.pause()
+            app.query_one("#formula_bar", Input).value = "Ann"
+            await pilot.press("enter")
+            await pilot.pause()
+            assert not model.spilled
+            assert table.get_cell_at(Coordinate(0, 0)) == "Ann"
+
+
+class TestMarkDuplicates:
+    "test: action_mark_duplicates()"
+
+    @pytest.fixture
+    def orders_csv(self, tmp_path):
+        csv_file = tmp_path / "orders.csv"
+        csv_file.write_text("id,customer\n1,Alice\n2,Bob\n2,Carol\n3,Alice\n")
+        return csv_file
+
+    async def test_duplicate_keys_of_the_column(self, orders_csv):
+        app = CSVEditorApp(csv_path=orders_csv, theme=None)
+        async with app.run_test() as pilot:
+            table = app.query_one(CSVTable)
+            table.cursor_type = "column"
+            await pilot.press("ctrl+d")
+
+            marked = [table.marked_rows(row) for row in range(4)]
+            assert marked == [False, True, True, False]
+
+            # edits update the marks
+            app.data_model.set_cell(2, 0, "3")
+            marked = [table.marked_rows(row) for row in range(4)]
+            assert marked == [False, False, True, True]
+
+            # toggled off
+            await pilot.press("ctrl+d")
+            assert table.marked_rows is None
+
+    async def test_duplicate_rows(self, orders_csv):
+        app = CSVEditorApp(csv_path=orders_csv, theme=None)
+        async with app.run_test() as pilot:
+            table = app.query_one(CSVTable)
+            await pilot.press("ctrl+d")
+            assert not any(table.marked_rows(row) for row in range(4))
+
+            # marks survive a reload of the table (e.g. a new row)
+            await pilot.press("n")
+            assert table.marked_rows is not None
+
+    async def test_marks_dropped_with_their_column(self, orders_csv):
+        app = CSVEditorApp(csv_path=orders_csv, theme=None)
+        async with app.run_test() as pilot:
+            table = app.query_one(CSVTable)
+            table.cursor_type = "column"
+            await pilot.press("ctrl+d")
+            await pilot.press("ctrl+b")
+            assert table.marked_rows is None
+
+
+class TestColumnChanges:
+    "test: action_computed_column() and action_cast_column()"
+
+    async def submit(self, pilot, value):
+        await pilot.pause()
+        column_input = pilot.app.screen.query_one("#column_input", Input)
+        column_input.value = value
+        await pilot.press("enter")
+        await pilot.pause()
+
+    async def test_computed_column(self, temp_csv_with_headers):
+        app = CSVEditorApp(csv_path=temp_csv_with_headers, theme=None)
+        async with app.run_test() as pilot:
+            table = app.query_one(CSVTable)
+            table.cursor_coordinate = Coordinate(0, 1)
+            await pilot.press("equals_sign")
+            assert isinstance(app.screen, ColumnInputScreen)
+
+            # errors keep the screen open
+            await self.submit(pilot, "double = height * 2")
+            assert isinstance(app.screen, ColumnInputScreen)
+
+            await self.submit(pilot, "double = age * 2")
+            assert not isinstance(app.screen, ColumnInputScreen)
+            assert app.data_model.df.columns[2] == "double"
+            assert table.cursor_coordinate == Coordinate(0, 2)
+
+            # the cells of the computed column follow the edits of its input
+            assert table.get_cell_at(Coordinate(1, 2)) == 50
+            app.data_model.set_cell(1, 1, "40")
+            app._refresh_range(1, 2, 1, 2)
+            assert table.get_cell_at(Coordinate(1, 2)) == 80
+
+    async def test_cast_column(self, temp_csv_with_headers):
+        app = CSVEditorApp(csv_path=temp_csv_with_headers, theme=None)
+        async with app.run_test() as pilot:
+            table = app.query_one(CSVTable)
+            table.cursor_coordinate = Coordinate(0, 1)
+            await pilot.press("t")
+            await self.submit(pilot, "float")
+            assert app.data_model.df.schema["age"] == pl.Float64
+            assert table.get_cell_at(Coordinate(0, 1)) == 30.0
+
+
+class TestReplace:
+    "test: action_replace() and action_undo()"
+
+    async def test_replace_in_column_and_undo(self, temp_csv_with_headers):
+        app = CSVEditorApp(csv_path=temp_csv_with_headers, theme=None)
+        async with app.run_test() as pilot:
+            table = app.query_one(CSVTable)
+            table.cursor_coordinate = Coordinate(0, 2)
+            await pilot.press("ctrl+l")
+            await pilot.pause()
+            assert isinstance(app.screen, ReplaceScreen)
+            assert app.screen.scope == "column"
+
+            app.screen.query_one("#replace_find", Input).value = "o"
+            app.screen.query_one("#replace_with", Input).value = "0"
+            await pilot.press("enter")
+            await pilot.pause()
+            assert not isinstance(app.screen, ReplaceScreen)
+            assert table.get_cell_at(Coordinate(1, 2)) == "L0nd0n"
+            assert table.get_cell_at(Coordinate(1, 0)) == "Bob"
+
+            await pilot.press("u")
+            assert table.get_cell_at(Coordinate(1, 2)) == "London"
+
+    async def test_no_matches_keep_the_dialog(self, temp_csv_with_headers):
+        app = CSVEditorApp(csv_path=temp_csv_with_headers, theme=None)
+        async with app.run_test() as pilot:
+            await pilot.press("ctrl+l")
+            await pilot.pause()
+            app.screen.query_one("#replace_find", Input).value = "zzz"
+            await pilot.press("enter")
+            await pilot.pause()
+            assert isinstance(app.screen, ReplaceScreen)
+            assert "No matches" in str(app.screen.query_one("#replace_status").render())
+
+
+class TestHeatmap:
+    "test: action_heatmap()"
+
+    async def test_toggle_heatmap(self, temp_csv_with_headers):
+        app = CSVEditorApp(csv_path=temp_csv_with_headers, theme=None)
+        async with app.run_test() as pilot:
+            table = app.query_one(CSVTable)
+            table.cursor_coordinate = Coordinate(0, 1)
+            await pilot.press("ctrl+k")
+            bins = table.colored_columns[1]
+            assert [bins.bin(row) for row in range(3)] == [2, 1, 3]
+
+            # low and high values get different backgrounds
+            low, high = (
+                table._render_cell(row, 1, Style(), 10)[0][0].style.bgcolor
+                for row in (1, 2)
+            )
+            assert low != high
+
+            # the bins follow the edits and survive a reload of the table
+            app.data_model.set_cell(1, 1, "")
+            assert bins.bin(1) == 0
+            await pilot.press("n")
+            assert 1 in table.colored_columns
+
+            await pilot.press("ctrl+k")
+            assert table.colored_columns == {}
+            assert bins not in app.data_model.indexes
+
+    async def test_text_column(self, temp_csv_with_headers):
+        app = CSVEditorApp(csv_path=temp_csv_with_headers, theme=None)
+        async with app.run_test() as pilot:
+            await pilot.press("ctrl+k")
+            assert app.query_one(CSVTable).colored_columns == {}
+
+
+class TestFreeze:
+    "test: action_freeze()"
+
+    @pytest.fixture
+    def wide_csv(self, tmp_path):
+        csv_file = tmp_path / "wide.csv"
+        header = ",".join(["id"] + [f"c{j}" for j in range(20)])
+        rows = [
+            ",".join([f"id{i}"] + [f"v{i}_{j}" for j in range(20)]) for i in range(2000)
+        ]
+        csv_file.write_text("\n".join([header, *rows]) + "\n")
+        return csv_file
+
+    async def test_frozen_column_stays_in_view(self, wide_csv):
+        app = CSVEditorApp(csv_path=wide_csv, theme=None)
+        async with app.run_test() as pilot:
+            table = app.query_one(CSVTable)
+            await pilot.press("ctrl+f")
+            assert table.fixed_columns == 1
+
+            # scroll to the bottom right corner
+            table.cursor_coordinate = Coordinate(1999, 20)
+            await pilot.pause()
+            assert table.scroll_x > 0
+            lines = [strip.text for strip in table.render_lines(table.region)]
+            assert any("id1999" in line and "v1999_19" in line for line in lines)
+            # the frozen cells are read from the same row windows (no copy of the data)
+            assert len(app.query(CSVTable)) == 1
+            assert 1999 // table.row_windows.window_size in (
+                table.row_windows.cached_windows()
+            )
+
+            # kept when the table is loaded again, removed by the same action
+            await pilot.press("n")
+            assert table.fixed_columns == 1
+            await pilot.press("ctrl+f")
+            assert table.fixed_columns == 0
+
+    async def test_freeze_selection(self, wide_csv):
+        app = CSVEditorApp(csv_path=wide_csv, theme=None)
+        async with app.run_test() as pilot:
+            table = app.query_one(CSVTable)
+            await pilot.press("J", "L", "ctrl+f")
+            assert (table.fixed_rows, table.fixed_columns) == (2, 2)
+            assert table.selection is None
+
+
+class TestRowsOnDemand:
+    "test: the table reads its cells from the model by windows"
+
+    async def test_cells_come_from_the_model(self, tmp_path):
+        csv_file = tmp_path / "big.csv"
+        csv_file.write_text("n,s\n" + "".join(f"{i},x{i}\n" for i in range(3000)))
+        app = CSVEditorApp(csv_path=csv_file, theme=None)
+        async with app.run_test() as pilot:
+            table = app.query_one(CSVTable)
+            assert table.row_count == 3000
+            assert table.row_windows.cached_windows() == [0]  # the visible rows
+
+            await pilot.press("G")
+            await pilot.pause()
+            assert table.get_cell_at(Coordinate(2999, 1)) == "x2999"
+            assert 2999 // table.row_windows.window_size in (
+                table.row_windows.cached_windows()
+            )
+
+            app.data_model.set_cell(2999, 1, "edited")
+            app._refresh_range(2999, 3000, 1, 2)
+            assert table.get_cell_at(Coordinate(2999, 1)) == "edited"
+
+    async def test_rendered_cells_survive_edits(self, temp_csv_with_headers):
+        app = CSVEditorApp(csv_path=temp_csv_with_headers, theme=None)
+        async with app.run_test() as pilot:
+            table = app.query_one(CSVTable)
+            await pilot.pause()
+            rendered = set(table._rendered_cells.keys())
+            assert rendered
+
+            app.data_model.set_cell(0, 0, "Zoe")
+            app._refresh_range(0, 1, 0, 1)
+            await pilot.pause()
+            # the other cells are not rendered again
+            kept = [key for key in rendered if key[:2] != (0, 0)]
+            assert all(key in table._rendered_cells for key in kept)
+            edited = [
+                key
+                for key in table._rendered_cells.keys()
+                if key[:2] == (0, 0) and key not in rendered
+            ]
+            assert edited
+            assert "Zoe" in "".join(
+                segment.text
+                for line in table._rendered_cells.get(edited[0])
+                for segment in line
+            )
+
+    async def test_rows_are_virtual(self, tmp_path):
+        csv_file = tmp_path / "big.csv"
+        csv_file.write_text("n\n" + "".join(f"{i}\n" for i in range(100_000)))
+        app = CSVEditorApp(csv_path=csv_file, theme=None)
+        async with app.run_test() as pilot:
+            table = app.query_one(CSVTable)
+            await pilot.pause()
+            assert not isinstance(table.rows, dict)
+            assert table.virtual_size.height == 100_000 + table.header_height
+
+            app.data_model.insert_rows(0, 5)
+            table.refresh_data()
+            assert table.row_count == 100_005
+            assert table.get_cell_at(Coordinate(5, 0)) == 0
+
+            await pilot.press("G")
+            await pilot.pause()
+            app.data_model.delete_rows(100_000, 100_005)
+            table.refresh_data()
+            assert table.row_count == 100_000
+            assert table.cursor_row == 99_999
+            assert table.get_cell_at(Coordinate(99_999, 0)) == 99_994
+
+
+class TestDiffScreen:
+    "test: action_diff() and DiffScreen"
+
+    async def open_diff(self, app, pilot):
+        await pilot.press("ctrl+t")
+        await pilot.pause()
+        await app.workers.wait_for_complete()
+        await pilot.pause()
+
+    async def test_changes_and_jump(self, temp_csv_with_headers):
+        app = CSVEditorApp(csv_path=temp_csv_with_headers, theme=None)
+        async with app.run_test() as pilot:
+            app.data_model.set_cell(2, 0, "Zoe")
+            await self.open_diff(app, pilot)
+            assert isinstance(app.screen, DiffScreen)
+
+            result = app.screen.query_one(ResultTable)
+            assert result.row_count == 1
+            assert result.get_cell_at(Coordinate(0, 0)) == "modified"
+
+            await pilot.press("enter")
+            await pilot.pause()
+            assert not isinstance(app.screen, DiffScreen)
+            assert app.query_one(CSVTable).cursor_row == 2
+
+    async def test_save_from_diff(self, temp_csv_with_headers):
+        app = CSVEditorApp(csv_path=temp_csv_with_headers, theme=None)
+        async with app.run_test() as pilot:
+            app.data_model.set_cell(0, 0, "Zoe")
+            await self.open_diff(app, pilot)
+            await pilot.press("ctrl+s")
+            await pilot.pause()
+
+            assert not app.data_model.modified
+            assert "Zoe" in temp_csv_with_headers.read_text()
+
+    async def test_no_changes(self, temp_csv_with_headers):
+        app = CSVEditorApp(csv_path=temp_csv_with_headers, theme=None)
+        async with app.run_test() as pilot:
+            await self.open_diff(app, pilot)
+            assert "No changes" in str(app.screen.query_one("#diff_status").render())
+
+
+class TestDiffApp:
+    "test: DiffApp, the tui of `csv-ve diff`"
+
+    async def test_read_only_diff(self, tmp_path):
+        old, new = tmp_path / "old.csv", tmp_path / "new.csv"
+        old.write_text("id,name\n1,a\n2,b\n")
+        new.write_text("id,name\n1,a\n2,x\n3,c\n")
+        app = DiffApp(old, new, ["id"])
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            assert isinstance(app.screen, DiffScreen)
+            assert app.screen.query_one(ResultTable).row_count == 2
+
+            # no row to jump to, no file to save
+            await pilot.press("enter", "ctrl+s")
+            await pilot.pause()
+            assert isinstance(app.screen, DiffScreen)
+
+    async def test_diff_is_paged(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(ResultTable, "PAGE_SIZE", 10)
+        old, new = tmp_path / "old.csv", tmp_path / "new.csv"
+        old.write_text("id,name\n" + "".join(f"{i},a\n" for i in range(100)))
+        new.write_text("id,name\n" + "".join(f"{i},b\n" for i in range(100)))
+        app = DiffApp(old, new, ["id"])
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            result = app.screen.query_one(ResultTable)
+            assert isinstance(result.result, pl.LazyFrame)
+            assert result.row_count == 10
+            assert "100 modified" in str(app.screen.query_one("#diff_status").render())
+
+            result.move_cursor(row=9)  # the next page is read
+            await pilot.pause()
+            assert result.row_count == 20
+            diff_dir = app._diff_dir
+        assert not diff_dir.exists()
+
+
+class TestQueryScreen:
+    "test: action_query() and QueryScreen"
+
+    async def run_query(self, app, pilot, sql):
+        await pilot.press("ctrl+e")
+        await pilot.pause()
+        app.screen.query_one("#query_input", Input).value = sql
+        await pilot.press("enter")
+        await app.workers.wait_for_complete()
+        await pilot.pause()
+
+    async def test_ctrl_e_opens_query_screen(self, temp_csv_with_headers):
+        app = CSVEditorApp(csv_path=temp_csv_with_headers, theme=None)
+        async with app.run_test() as pilot:
+            await pilot.press("ctrl+e")
+            await pilot.pause()
+            assert isinstance(app.screen, QueryScreen)
+
+            await pilot.press("escape")
+            await pilot.pause()
+            assert not isinstance(app.screen, QueryScreen)
+
+    async def test_query_result(self, temp_csv_with_headers):
+        app = CSVEditorApp(csv_path=temp_csv_with_headers, theme=None)
+        async with app.run_test() as pilot:
+            await self.run_query(
+                app, pilot, "SELECT name, age FROM data WHERE age >= 30"
+            )
+
+            result = app.screen.query_one(ResultTable)
+            assert result.row_count == 2
+            assert result.get_cell_at(Coordinate(1, 0)) == "Charlie"
+            assert "2 rows" in str(app.screen.query_one("#query_status").render())
+
+    async def test_invalid_query(self, temp_csv_with_headers):
+        app = CSVEditorApp(csv_path=temp_csv_with_headers, theme=None)
+        async with app.run_test() as pilot:
+            await self.run_query(app, pilot, "SELECT nope FROM data")
+
+            status = app.screen.query_one("#query_status")
+            assert status.has_class("error")
+            assert app.screen.query_one(ResultTable).row_count == 0
+
+    async def test_large_result_is_paged(self, tmp_path):
+        csv_file = tmp_path / "big.csv"
+        csv_file.write_text("n\n" + "\n".join(str(i) for i in range(2000)))
+        app = CSVEditorApp(csv_path=csv_file, theme=None)
+        async with app.run_test() as pilot:
+            await self.run_query(app, pilot, "SELECT n FROM data")
+
+            result = app.screen.query_one(ResultTable)
+            assert result.row_count == ResultTable.PAGE_SIZE
+            result.move_cursor(row=result.row_count - 1)
+            await pilot.pause()
+            assert result.row_count == 2 * ResultTable.PAGE_SIZE
+
+
+class TestSummaryScreen:
+    "test: action_summary() and SummaryScreen"
+
+    async def test_summary_and_jump_to_group(self, tmp_path):
+        csv_file = tmp_path / "sales.csv"
+        csv_file.write_text("city,qty\nParis,1\nBerlin,2\nParis,3\nRome,4\n")
+        app = CSVEditorApp(csv_path=csv_file, theme=None)
+        async with app.run_test() as pilot:
+            await pilot.press("ctrl+o")
+            await pilot.pause()
+            assert isinstance(app.screen, SummaryScreen)
+            # grouped by the column under the cursor
+            assert app.screen.query_one("#summary_by", Input).value == "city"
+
+            app.screen.query_one("#summary_aggregations", Input).value = "qty:sum"
+            await pilot.press("enter")
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+
+            result = app.screen.query_one(ResultTable)
+            assert result.row_count == 3
+            assert result.get_cell_at(Coordinate(1, 2)) == 4  # Paris qty_sum
+
+            # Rome
+            await pilot.press("down", "down", "enter")
+            await pilot.pause()
+            assert not isinstance(app.screen, SummaryScreen)
+            assert app.query_one(CSVTable).cursor_row == 3
+
+    async def test_invalid_aggregation(self, temp_csv_with_headers):
+        app = CSVEditorApp(csv_path=temp_csv_with_headers, theme=None)
+        async with app.run_test() as pilot:
+            await pilot.press("ctrl+o")
+            await pilot.pause()
+            app.screen.query_one("#summary_aggregations", Input).value = "age"
+            await pilot.press("enter")
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+
+            assert app.screen.query_one("#summary_status").has_class("error")
+
+
 class TestGotocell:
     "test: action_goto_cell()"
 
@@ -452,3 +1301,57 @@ class TestGotocell:
             # row should change, column should remain the same
             assert table.cursor_row == initial_row
             assert table.cursor_column == 2
+
+    @pytest.mark.parametrize("address", ["C2", "c2", "2:C", "C:2"])
+    async def test_goto_spreadsheet_address(self, temp_csv_with_headers, address):
+        app = CSVEditorApp(csv_path=temp_csv_with_headers, theme=None)
+
+        async with app.run_test() as pilot:
+            table = app.query_one(DataTable)
+            await pilot.press("ctrl+g")
+            await pilot.pause()
+            app.screen.query_one("#coord_input", Input).value = address
+            await pilot.press("enter")
+            await pilot.pause()
+
+            assert table.cursor_coordinate == Coordinate(1, 2)
+
+    async def test_goto_value(self, temp_csv_with_headers) -> None:
+        """column=value goes to the next row with the value"""
+        app = CSVEditorApp(csv_path=temp_csv_with_headers, theme=None)
+
+        async with app.run_test() as pilot:
+            table = app.query_one(CSVTable)
+            column = app.data_model.df.columns[0]
+            values = app.data_model.df[column].to_list()
+            table.move_cursor(row=0, column=2)
+
+            await pilot.press("ctrl+g")
+            await pilot.pause()
+            app.screen.query_one("#coord_input", Input).value = f"{column}={values[1]}"
+            await pilot.press("enter")
+            await pilot.pause()
+
+            assert not isinstance(app.screen, CoordInputScreen)
+            assert table.cursor_coordinate == Coordinate(1, 0)
+
+            # the last value is filled in again
+            await pilot.press("ctrl+g")
+            await pilot.pause()
+            assert app.screen.query_one("#coord_input", Input).value == (
+                f"{column}={values[1]}"
+            )
+
+    async def test_goto_missing_value(self, temp_csv_with_headers) -> None:
+        app = CSVEditorApp(csv_path=temp_csv_with_headers, theme=None)
+
+        async with app.run_test() as pilot:
+            await pilot.press("ctrl+g")
+            await pilot.pause()
+            coord_input = app.screen.query_one("#coord_input", Input)
+            for query, error in (("nope=1", "not found"), ("name=Zoe", "No row")):
+                coord_input.value = query
+                await pilot.press("enter")
+                await pilot.pause()
+                assert isinstance(app.screen, CoordInputScreen)
+                assert error in str(app.screen.query_one("#error_message").render())